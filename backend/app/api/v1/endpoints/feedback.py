@@ -1,19 +1,47 @@
 """
 Feedback translation endpoints - THE CORE FEATURE
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, tuple_
 from pydantic import BaseModel
-from typing import List
+from typing import AsyncIterator, List, Dict, Optional, Union
 from uuid import UUID
+from datetime import datetime
+import json
+import os
 
-from app.database.session import get_db
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.database.session import get_db, AsyncSessionLocal, release_connection
 from app.services.auth_service import get_current_user
-from app.services.translator_service import TranslatorService
+from app.services.rate_limiter import check_rate_limit, translate_rate_limit
+from app.services.translator_service import TranslatorService, translation_window
+from app.services.llm_scheduler import BATCH
+from app.services.feedback_index import find_similar_tasks, index_feedback
+from app.services.job_store import enqueue_job, job_result, load_job_tasks
+from app.services.job_worker import translation_worker
+from app.services.callback_url import UnsafeCallbackURL, check_callback_url
+from app.services.image_processing import ScreenshotError
+from app.services.screenshot_service import (
+    UploadTooLarge,
+    discard_screenshot,
+    find_duplicate_screenshot,
+    stage_upload,
+    store_screenshot,
+)
+from app.services.usage_store import monthly_token_quota, usage_totals
+from app.services.feedback_service import (
+    build_feedback_row,
+    build_task_row,
+    save_feedback_with_tasks,
+)
 from app.models.user import User
 from app.models.project import Project
-from app.models.feedback import FeedbackInput, GeneratedTask
+from app.models.feedback import FeedbackInput, GeneratedTask, SourceType
+from app.models.translation_job import TranslationJob
 
 router = APIRouter()
 
@@ -21,6 +49,10 @@ router = APIRouter()
 class FeedbackTranslateRequest(BaseModel):
     project_id: str
     input_text: str
+    bypass_cache: bool = False
+    # Queue the translation and return 202 with a job id (implied by callback_url)
+    async_job: bool = False
+    callback_url: str | None = None
 
 
 class GeneratedTaskResponse(BaseModel):
@@ -41,7 +73,58 @@ class FeedbackTranslateResponse(BaseModel):
     tasks: List[GeneratedTaskResponse]
 
 
-@router.post("/translate", response_model=FeedbackTranslateResponse)
+class ScreenshotFeedbackResponse(FeedbackTranslateResponse):
+    screenshot: Dict
+    duplicate_of: str | None = None
+
+
+class TranslationJobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class TranslationJobResponse(BaseModel):
+    job_id: str
+    status: str
+    project_id: str
+    original_text: str
+    attempts: int
+    feedback_id: str | None
+    tasks: List[GeneratedTaskResponse]
+    error: str | None
+    created_at: str
+    finished_at: str | None
+
+
+class FeedbackBatchItem(BaseModel):
+    input_text: str
+
+
+class FeedbackBatchTranslateRequest(BaseModel):
+    project_id: str
+    items: List[FeedbackBatchItem]
+    bypass_cache: bool = False
+
+
+class FeedbackBatchItemResult(BaseModel):
+    index: int
+    feedback_id: str | None = None
+    original_text: str
+    tasks: List[GeneratedTaskResponse] = []
+    error: str | None = None
+
+
+class FeedbackBatchTranslateResponse(BaseModel):
+    project_id: str
+    results: List[FeedbackBatchItemResult]
+
+
+@router.post(
+    "/translate",
+    response_model=FeedbackTranslateResponse,
+    dependencies=[Depends(translate_rate_limit)]
+)
 async def translate_feedback(
     request: FeedbackTranslateRequest,
     db: AsyncSession = Depends(get_db),
@@ -50,7 +133,14 @@ async def translate_feedback(
     """
     THE MAGIC ENDPOINT
     Translate vague client feedback into actionable design tasks
+
+    With async_job (or a callback_url) the translation is queued instead:
+    the response is 202 with a job id to poll at /feedback/jobs/{job_id},
+    and the result is also POSTed to callback_url when given.
     """
+    if request.async_job or request.callback_url:
+        await _validate_callback_url(request.callback_url)
+
     # Verify project belongs to user
     result = await db.execute(
         select(Project).where(
@@ -73,71 +163,283 @@ async def translate_feedback(
             detail="Active subscription required"
         )
     
-    # Create feedback input record
-    feedback_input = FeedbackInput(
-        project_id=project.id,
-        original_text=request.input_text,
-        source_type="text"
-    )
-    db.add(feedback_input)
-    await db.commit()
-    await db.refresh(feedback_input)
+    await _enforce_token_quota(db, current_user)
+
+    if request.async_job or request.callback_url:
+        # Persisted before we answer, so a crash cannot lose it; a worker writes the rows
+        job = await enqueue_job(
+            db,
+            current_user.id,
+            project.id,
+            request.input_text,
+            bypass_cache=request.bypass_cache,
+            callback_url=request.callback_url
+        )
+        translation_worker.notify()
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=TranslationJobAccepted(
+                job_id=str(job.id),
+                status=job.status.value,
+                status_url=f"/api/v1/feedback/jobs/{job.id}"
+            ).model_dump()
+        )
+
+    # Reuse tasks from a close paraphrase already translated in this project
+    tasks_data = None
+    if not request.bypass_cache:
+        tasks_data = await find_similar_tasks(db, request.input_text, project.id)
+
+    # Read phase done: no pooled connection is held during the LLM call
+    await release_connection(db)
     
     # Call AI translator service
-    translator = TranslatorService()
+    if tasks_data is None:
+        translator = TranslatorService(user_id=current_user.id, endpoint="/feedback/translate")
+        try:
+            if settings.TRANSLATION_PACK_WINDOW_MS > 0 and translator.packable(request.input_text):
+                # Short comments for this project arriving together share one model call
+                tasks_data = await translation_window.submit(
+                    (current_user.id, project.id, not request.bypass_cache),
+                    request.input_text
+                )
+            else:
+                tasks_data = await translator.translate_feedback(
+                    request.input_text,
+                    use_cache=not request.bypass_cache
+                )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Translation failed: {str(e)}"
+            )
+
+    # Save the input and all its tasks in one transaction (ids are generated client-side)
+    feedback_row = build_feedback_row(project.id, request.input_text)
+    task_rows = [
+        build_task_row(feedback_row, task_data, feedback_row["created_at"])
+        for task_data in tasks_data
+    ]
+    generated_tasks = await save_feedback_with_tasks(db, [feedback_row], task_rows)
+
+    index_feedback(feedback_row["id"], request.input_text, project.id)
+
+    return FeedbackTranslateResponse(
+        feedback_id=str(feedback_row["id"]),
+        original_text=request.input_text,
+        tasks=[_task_response(task) for task in generated_tasks]
+    )
+
+
+async def _validate_callback_url(url: Optional[str]) -> None:
+    if url is None:
+        return
+    # Plain http and private addresses only when explicitly allowed (local receivers);
+    # the worker checks again before sending in case the host was re-pointed
     try:
-        tasks_data = await translator.translate_feedback(request.input_text)
-    except Exception as e:
+        await check_callback_url(url, allow_local=settings.TRANSLATION_JOB_ALLOW_PRIVATE_CALLBACKS)
+    except UnsafeCallbackURL as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Translation failed: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=TranslationJobResponse)
+async def get_translation_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Poll a background translation; tasks are included once it has succeeded
+    """
+    result = await db.execute(
+        select(TranslationJob).where(
+            TranslationJob.id == job_id,
+            TranslationJob.user_id == current_user.id
+        )
+    )
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
         )
     
-    # Save generated tasks
-    generated_tasks = []
-    for task_data in tasks_data:
-        task = GeneratedTask(
-            input_id=feedback_input.id,
-            task_description=task_data["task"],
-            estimated_time_minutes=task_data.get("estimated_time_minutes"),
-            difficulty_level=task_data.get("difficulty_level")
-        )
-        db.add(task)
-        generated_tasks.append(task)
+    return job_result(job, await load_job_tasks(db, job))
+
+
+@router.post(
+    "/screenshots",
+    response_model=ScreenshotFeedbackResponse,
+    dependencies=[Depends(translate_rate_limit)]
+)
+async def upload_screenshot_feedback(
+    http_request: Request,
+    project_id: UUID,
+    comment: str = Query(..., min_length=1),
+    bypass_cache: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Translate a client's screenshot and the comment that came with it
+
+    The body is the raw image (PNG, JPEG, GIF or WebP), not a multipart
+    form, so it is streamed to disk as it arrives. The stored copy is
+    downscaled and recompressed. If the project already has a screenshot
+    that looks the same with the same comment, its tasks are reused.
+
+    Tasks are generated from the comment; the image is kept for
+    reference but not read by the model.
+    """
+    declared_size = http_request.headers.get("content-length", "")
+    if declared_size.isdigit() and int(declared_size) > settings.SCREENSHOT_MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Screenshot is too large"
+        )
     
-    await db.commit()
+    result = await db.execute(
+        select(Project).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
+    project = result.scalar_one_or_none()
     
-    # Refresh all tasks to get their IDs
-    for task in generated_tasks:
-        await db.refresh(task)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
     
-    return FeedbackTranslateResponse(
-        feedback_id=str(feedback_input.id),
-        original_text=feedback_input.original_text,
-        tasks=[GeneratedTaskResponse(
-            id=str(task.id),
-            task_description=task.task_description,
-            is_completed=task.is_completed,
-            estimated_time_minutes=task.estimated_time_minutes,
-            difficulty_level=task.difficulty_level,
-            created_at=str(task.created_at)
-        ) for task in generated_tasks]
+    if current_user.subscription_status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Active subscription required"
+        )
+
+    await _enforce_token_quota(db, current_user)
+
+    # No pooled connection is held while a slow client uploads
+    await release_connection(db)
+
+    feedback_row = build_feedback_row(project.id, comment, SourceType.SCREENSHOT)
+    try:
+        staged = await stage_upload(
+            http_request.stream(),
+            os.path.join(settings.SCREENSHOT_UPLOAD_DIR, "incoming"),
+            settings.SCREENSHOT_MAX_UPLOAD_BYTES
+        )
+        screenshot = await store_screenshot(staged, project.id, feedback_row["id"])
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ScreenshotError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+
+    tasks_data = None
+    duplicate_of = None
+    if not bypass_cache:
+        try:
+            duplicate = await find_duplicate_screenshot(
+                db, project.id, screenshot["phash"], comment
+            )
+        except BaseException:
+            discard_screenshot(screenshot)
+            raise
+        if duplicate is not None:
+            # Point at the copy already on disk rather than keeping a second one
+            duplicate_of, earlier_screenshot, tasks_data = duplicate
+            discard_screenshot(screenshot)
+            screenshot = {**earlier_screenshot, "original": screenshot["original"]}
+        await release_connection(db)
+
+    if tasks_data is None:
+        translator = TranslatorService(user_id=current_user.id, endpoint="/feedback/screenshots")
+        try:
+            tasks_data = await translator.translate_feedback(comment, use_cache=not bypass_cache)
+        except Exception as e:
+            discard_screenshot(screenshot)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Translation failed: {str(e)}"
+            )
+
+    feedback_row["input_metadata"] = {"screenshot": screenshot}
+    if duplicate_of is not None:
+        feedback_row["input_metadata"]["duplicate_of"] = str(duplicate_of)
+    task_rows = [
+        build_task_row(feedback_row, task_data, feedback_row["created_at"])
+        for task_data in tasks_data
+    ]
+    try:
+        generated_tasks = await save_feedback_with_tasks(db, [feedback_row], task_rows)
+    except BaseException:
+        # Nothing references the new file; a duplicate's file belongs to the earlier row
+        if duplicate_of is None:
+            discard_screenshot(screenshot)
+        raise
+
+    return ScreenshotFeedbackResponse(
+        feedback_id=str(feedback_row["id"]),
+        original_text=comment,
+        tasks=[_task_response(task) for task in generated_tasks],
+        screenshot=screenshot,
+        duplicate_of=str(duplicate_of) if duplicate_of else None
     )
 
 
-@router.get("/project/{project_id}/history")
-async def get_project_feedback_history(
-    project_id: UUID,
+async def _enforce_token_quota(db: AsyncSession, user: User) -> None:
+    """
+    Reject the request once this month's rollup reaches the plan's quota
+
+    Rollups trail live usage by up to one meter flush, so a burst can go
+    slightly over before it is refused.
+    """
+    quota = monthly_token_quota(user.subscription_plan)
+    if quota is None:
+        return
+    totals = await usage_totals(db, user.id, "month")
+    if totals["tokens_used"] >= quota:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Monthly token quota exceeded"
+        )
+
+
+def _task_response(task: GeneratedTask) -> GeneratedTaskResponse:
+    return GeneratedTaskResponse(
+        id=str(task.id),
+        task_description=task.task_description,
+        is_completed=task.is_completed,
+        estimated_time_minutes=task.estimated_time_minutes,
+        difficulty_level=task.difficulty_level,
+        created_at=str(task.created_at)
+    )
+
+
+@router.post(
+    "/translate/stream",
+    dependencies=[Depends(translate_rate_limit)]
+)
+async def translate_feedback_stream(
+    request: FeedbackTranslateRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all feedback translations for a project
+    Streaming variant of /translate (NDJSON, one event per line)
+
+    Emits a "feedback" event, then a "task" event as soon as the model
+    completes each task, then "done". Rows are saved after the stream ends.
     """
     # Verify project belongs to user
     result = await db.execute(
         select(Project).where(
-            Project.id == project_id,
+            Project.id == UUID(request.project_id),
             Project.user_id == current_user.id
         )
     )
@@ -149,21 +451,297 @@ async def get_project_feedback_history(
             detail="Project not found"
         )
     
-    # Get all feedback inputs with their tasks
+    # Check subscription status
+    if current_user.subscription_status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Active subscription required"
+        )
+
+    await _enforce_token_quota(db, current_user)
+
+    similar_tasks = None
+    if not request.bypass_cache:
+        similar_tasks = await find_similar_tasks(db, request.input_text, project.id)
+
+    # The stream outlives this handler; don't keep the request's connection for it
+    await release_connection(db)
+
+    feedback_row = build_feedback_row(project.id, request.input_text)
+    task_rows: List[Dict] = []
+
+    async def task_source() -> AsyncIterator[Dict]:
+        if similar_tasks is not None:
+            for task_data in similar_tasks:
+                yield task_data
+            return
+        translator = TranslatorService(
+            user_id=current_user.id,
+            endpoint="/feedback/translate/stream"
+        )
+        async for task_data in translator.stream_translate_feedback(
+            request.input_text,
+            use_cache=not request.bypass_cache
+        ):
+            yield task_data
+
+    async def event_stream() -> AsyncIterator[str]:
+        yield _ndjson({
+            "type": "feedback",
+            "feedback_id": str(feedback_row["id"]),
+            "original_text": request.input_text
+        })
+        async for task_data in task_source():
+            task_row = build_task_row(feedback_row, task_data, feedback_row["created_at"])
+            task_rows.append(task_row)
+            yield _ndjson({
+                "type": "task",
+                "task": GeneratedTaskResponse(
+                    id=str(task_row["id"]),
+                    task_description=task_row["task_description"],
+                    is_completed=False,
+                    estimated_time_minutes=task_row["estimated_time_minutes"],
+                    difficulty_level=task_row["difficulty_level"],
+                    created_at=str(task_row["created_at"])
+                ).model_dump()
+            })
+        yield _ndjson({"type": "done", "task_count": len(task_rows)})
+
+    async def persist() -> None:
+        # Runs after the stream ends (or the client disconnects) with its own session
+        async with AsyncSessionLocal() as session:
+            await save_feedback_with_tasks(session, [feedback_row], task_rows)
+        index_feedback(feedback_row["id"], request.input_text, project.id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(persist)
+    )
+
+
+def _ndjson(payload: Dict) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+
+@router.post("/translate/batch", response_model=FeedbackBatchTranslateResponse)
+async def translate_feedback_batch(
+    request: FeedbackBatchTranslateRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Translate many comments for one project (e.g. a whole client email)
+    Short comments are packed several to a model call, calls run
+    concurrently, and all rows are written in one transaction
+    """
+    if not request.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one feedback item is required"
+        )
+    if len(request.items) > settings.BATCH_TRANSLATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_TRANSLATE_MAX_ITEMS} feedback items per batch"
+        )
+
+    # Each item is one translation, so each counts against the rate limit;
+    # a batch above the plan's burst runs once the bucket is full and leaves
+    # it in debt rather than being charged only the burst
+    await check_rate_limit(current_user, cost=len(request.items), allow_debt=True)
+
+    # Verify project belongs to user (once for the whole batch)
     result = await db.execute(
-        select(FeedbackInput).where(FeedbackInput.project_id == project_id)
+        select(Project).where(
+            Project.id == UUID(request.project_id),
+            Project.user_id == current_user.id
+        )
+    )
+    project = result.scalar_one_or_none()
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    # Check subscription status
+    if current_user.subscription_status != "active":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Active subscription required"
+        )
+
+    await _enforce_token_quota(db, current_user)
+
+    # Near-duplicate reuse shares the request session, so it runs before the fan-out
+    tasks_by_index: Dict[int, List[Dict]] = {}
+    if not request.bypass_cache:
+        for index, item in enumerate(request.items):
+            similar = await find_similar_tasks(db, item.input_text, project.id)
+            if similar is not None:
+                tasks_by_index[index] = similar
+
+    # Read phase done: no pooled connection is held during the LLM calls
+    await release_connection(db)
+
+    # Pack and fan the remaining translations out, a bounded number of calls at a time
+    translator = TranslatorService(
+        user_id=current_user.id,
+        endpoint="/feedback/translate/batch",
+        lane=BATCH
+    )
+    pending = [index for index in range(len(request.items)) if index not in tasks_by_index]
+    # A comment the model could not translate is reported, not saved with placeholder tasks
+    outcomes: List[Union[List[Dict], Exception]]
+    try:
+        outcomes = await translator.translate_many(
+            [request.items[index].input_text for index in pending],
+            use_cache=not request.bypass_cache,
+            max_concurrency=settings.BATCH_TRANSLATE_CONCURRENCY,
+            return_exceptions=True
+        )
+    except Exception as e:
+        outcomes = [e for _ in pending]
+
+    # Build every row client-side and insert them in bulk
+    now = datetime.utcnow()
+    feedback_rows: List[Dict] = []
+    task_rows: List[Dict] = []
+    failures: Dict[int, Exception] = {}
+    feedback_ids: Dict[int, UUID] = {}
+    outcomes_by_index = dict(zip(pending, outcomes))
+
+    for index, item in enumerate(request.items):
+        outcome = tasks_by_index[index] if index in tasks_by_index else outcomes_by_index[index]
+        if isinstance(outcome, Exception):
+            failures[index] = outcome
+            continue
+
+        feedback_row = build_feedback_row(project.id, item.input_text, created_at=now)
+        feedback_rows.append(feedback_row)
+        feedback_ids[index] = feedback_row["id"]
+        task_rows.extend(
+            build_task_row(feedback_row, task_data, now) for task_data in outcome
+        )
+
+    generated_tasks = await save_feedback_with_tasks(db, feedback_rows, task_rows)
+
+    tasks_by_feedback: Dict[UUID, List[GeneratedTaskResponse]] = {}
+    for task in generated_tasks:
+        tasks_by_feedback.setdefault(task.input_id, []).append(_task_response(task))
+
+    results = []
+    for index, item in enumerate(request.items):
+        if index in failures:
+            results.append(FeedbackBatchItemResult(
+                index=index,
+                original_text=item.input_text,
+                error=f"Translation failed: {str(failures[index])}"
+            ))
+        else:
+            results.append(FeedbackBatchItemResult(
+                index=index,
+                feedback_id=str(feedback_ids[index]),
+                original_text=item.input_text,
+                tasks=tasks_by_feedback.get(feedback_ids[index], [])
+            ))
+
+    for row in feedback_rows:
+        index_feedback(row["id"], row["original_text"], project.id)
+
+    return FeedbackBatchTranslateResponse(
+        project_id=str(project.id),
+        results=results
     )
-    feedback_inputs = result.scalars().all()
+
+
+@router.get("/project/{project_id}/history")
+async def get_project_feedback_history(
+    project_id: UUID,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a page of feedback translations for a project, newest first
+
+    Task counts come from one GROUP BY query, so the number of queries does
+    not grow with the page. Pass next_cursor back as cursor for the next page.
+    """
+    task_count = func.count(GeneratedTask.id)
+    completed_count = func.count(GeneratedTask.id).filter(GeneratedTask.is_completed.is_(True))
+    query = (
+        select(
+            FeedbackInput.id,
+            FeedbackInput.original_text,
+            FeedbackInput.created_at,
+            task_count.label("task_count"),
+            completed_count.label("completed_task_count"),
+        )
+        .join(Project, FeedbackInput.project_id == Project.id)
+        .outerjoin(GeneratedTask, GeneratedTask.input_id == FeedbackInput.id)
+        .where(
+            FeedbackInput.project_id == project_id,
+            Project.user_id == current_user.id
+        )
+        .group_by(FeedbackInput.id)
+        .order_by(FeedbackInput.created_at.desc(), FeedbackInput.id.desc())
+        .limit(limit + 1)
+    )
+
+    if created_after is not None:
+        query = query.where(FeedbackInput.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(FeedbackInput.created_at < created_before)
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.where(
+            tuple_(FeedbackInput.created_at, FeedbackInput.id) < (cursor_created_at, cursor_id)
+        )
+
+    rows = (await db.execute(query)).all()
+
+    if not rows and not cursor:
+        # Only an empty first page needs the ownership check on its own
+        result = await db.execute(
+            select(Project.id).where(
+                Project.id == project_id,
+                Project.user_id == current_user.id
+            )
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
     
     return {
         "project_id": str(project_id),
         "feedback_history": [
             {
-                "id": str(f.id),
-                "original_text": f.original_text,
-                "created_at": str(f.created_at),
-                "task_count": len(f.generated_tasks)
+                "id": str(row.id),
+                "original_text": row.original_text,
+                "created_at": str(row.created_at),
+                "task_count": row.task_count,
+                "completed_task_count": row.completed_task_count
             }
-            for f in feedback_inputs
-        ]
+            for row in rows
+        ],
+        "next_cursor": next_cursor
     }
@@ -4,9 +4,10 @@ Project management endpoints
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import List
 from uuid import UUID
+from datetime import datetime
 
 from app.database.session import get_db
 from app.services.auth_service import get_current_user
@@ -27,6 +28,17 @@ class ProjectResponse(BaseModel):
     description: str | None
     created_at: str
     updated_at: str
+    feedback_count: int = 0
+    task_count: int = 0
+    completed_task_count: int = 0
+    last_feedback_at: datetime | None = None
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def completion_percentage(self) -> float:
+        if not self.task_count:
+            return 0.0
+        return round(self.completed_task_count / self.task_count * 100, 1)
     
     class Config:
         from_attributes = True
@@ -38,7 +50,10 @@ async def list_projects(
     current_user: User = Depends(get_current_user)
 ):
     """
-    List all projects for the current user
+    List all projects for the current user, with their stats
+
+    Stats are read from the denormalized counters on each project row, so
+    this is a single query with no aggregation.
     """
     result = await db.execute(
         select(Project).where(Project.user_id == current_user.id)
@@ -10,6 +10,7 @@ import logging
 from app.core.config import settings
 from app.database.session import get_db
 from app.models.user import User, SubscriptionStatus
+from app.services.auth_service import invalidate_user
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -68,6 +69,7 @@ async def handle_checkout_completed(session, db: AsyncSession):
     if user:
         user.subscription_status = SubscriptionStatus.ACTIVE
         await db.commit()
+        invalidate_user(user)
         logger.info(f"Activated subscription for user {user.email}")
 
 
@@ -91,6 +93,7 @@ async def handle_subscription_updated(subscription, db: AsyncSession):
             user.subscription_status = SubscriptionStatus.CANCELLED
         
         await db.commit()
+        invalidate_user(user)
         logger.info(f"Updated subscription status for user {user.email}: {status}")
 
 
@@ -106,6 +109,7 @@ async def handle_subscription_deleted(subscription, db: AsyncSession):
     if user:
         user.subscription_status = SubscriptionStatus.CANCELLED
         await db.commit()
+        invalidate_user(user)
         logger.info(f"Cancelled subscription for user {user.email}")
 
 
@@ -121,4 +125,5 @@ async def handle_payment_failed(invoice, db: AsyncSession):
     if user:
         user.subscription_status = SubscriptionStatus.PAST_DUE
         await db.commit()
+        invalidate_user(user)
         logger.warning(f"Payment failed for user {user.email}")
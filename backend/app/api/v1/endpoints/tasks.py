@@ -0,0 +1,114 @@
+"""
+Task management endpoints
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from uuid import UUID
+from datetime import datetime
+
+from app.core.config import settings
+from app.database.session import get_db
+from app.services.auth_service import get_current_user
+from app.services.project_counters import record_completions
+from app.models.user import User
+from app.models.project import Project
+from app.models.feedback import FeedbackInput, GeneratedTask
+
+router = APIRouter()
+
+
+class TaskBulkCompleteRequest(BaseModel):
+    task_ids: List[UUID] = []
+    feedback_id: Optional[UUID] = None
+    completed: bool = True
+
+
+class ProjectTaskCounts(BaseModel):
+    project_id: str
+    task_count: int
+    completed_task_count: int
+
+
+class TaskBulkCompleteResponse(BaseModel):
+    updated: int
+    projects: List[ProjectTaskCounts]
+
+
+@router.post("/complete", response_model=TaskBulkCompleteResponse)
+async def bulk_complete_tasks(
+    request: TaskBulkCompleteRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Mark many tasks completed or not completed in one UPDATE
+
+    Targets either explicit task_ids or every task of feedback_id. Tasks
+    outside the user's projects, and tasks already in the requested state,
+    are left untouched. Returns how many tasks changed and the new counts
+    of each affected project.
+    """
+    if bool(request.task_ids) == (request.feedback_id is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either task_ids or feedback_id"
+        )
+    if len(request.task_ids) > settings.TASK_BULK_UPDATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.TASK_BULK_UPDATE_MAX_ITEMS} tasks per request"
+        )
+
+    # Core UPDATE ... FROM: nothing in the session needs synchronizing
+    tasks = GeneratedTask.__table__
+    if request.task_ids:
+        # One array parameter however many ids there are: WHERE id = ANY(:ids)
+        ids = bindparam("task_ids", request.task_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+        target = tasks.c.id == any_(ids)
+    else:
+        target = tasks.c.input_id == request.feedback_id
+
+    statement = (
+        update(tasks)
+        .where(
+            target,
+            tasks.c.input_id == FeedbackInput.id,
+            FeedbackInput.project_id == Project.id,
+            Project.user_id == current_user.id,
+            tasks.c.is_completed.is_not(request.completed)
+        )
+        .values(
+            is_completed=request.completed,
+            completed_at=datetime.utcnow() if request.completed else None
+        )
+        .returning(FeedbackInput.project_id)
+    )
+    changed_projects = (await db.execute(statement)).scalars().all()
+
+    deltas: Dict[UUID, int] = {}
+    for project_id in changed_projects:
+        deltas[project_id] = deltas.get(project_id, 0) + (1 if request.completed else -1)
+    await record_completions(db, deltas)
+
+    projects = []
+    if deltas:
+        result = await db.execute(
+            select(Project.id, Project.task_count, Project.completed_task_count)
+            .where(Project.id.in_(list(deltas)))
+        )
+        projects = [
+            ProjectTaskCounts(
+                project_id=str(row.id),
+                task_count=row.task_count,
+                completed_task_count=row.completed_task_count
+            )
+            for row in result
+        ]
+
+    await db.commit()
+
+    return TaskBulkCompleteResponse(updated=len(changed_projects), projects=projects)
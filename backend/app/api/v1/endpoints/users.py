@@ -1,13 +1,19 @@
 """
 User management endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime, timedelta
 
 from app.database.session import get_db
 from app.services.auth_service import get_current_user
+from app.services.usage_meter import ROLLUP_PERIODS, bucket_start
+from app.services.usage_store import monthly_token_quota, usage_totals
 from app.models.user import User
+from app.models.api_usage import APIUsageRollup
 
 router = APIRouter()
 
@@ -23,6 +29,30 @@ class UserProfileResponse(BaseModel):
         from_attributes = True
 
 
+class UsageBucketResponse(BaseModel):
+    bucket_start: str
+    endpoint: str
+    request_count: int
+    tokens_used: int
+    cost_cents: int
+
+
+class UsageSummaryResponse(BaseModel):
+    period: str
+    month_tokens_used: int
+    month_cost_cents: int
+    monthly_token_quota: int | None
+    buckets: List[UsageBucketResponse]
+
+
+# Default look-back per granularity when no start is given
+_USAGE_LOOKBACK = {
+    "hour": timedelta(hours=24),
+    "day": timedelta(days=30),
+    "month": timedelta(days=365),
+}
+
+
 @router.get("/profile", response_model=UserProfileResponse)
 async def get_user_profile(
     current_user: User = Depends(get_current_user)
@@ -31,3 +61,59 @@ async def get_user_profile(
     Get user profile information
     """
     return current_user
+
+
+@router.get("/usage", response_model=UsageSummaryResponse)
+async def get_usage_summary(
+    period: str = Query("day"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    LLM usage per endpoint and hour/day/month bucket, plus this month's quota
+
+    Reads only the pre-aggregated rollups, never api_usage itself.
+    """
+    if period not in ROLLUP_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"period must be one of: {', '.join(ROLLUP_PERIODS)}"
+        )
+
+    now = datetime.utcnow()
+    if start is None:
+        start = now - _USAGE_LOOKBACK[period]
+
+    query = (
+        select(APIUsageRollup)
+        .where(
+            APIUsageRollup.user_id == current_user.id,
+            APIUsageRollup.period == period,
+            APIUsageRollup.bucket_start >= bucket_start(start, period)
+        )
+        .order_by(APIUsageRollup.bucket_start, APIUsageRollup.endpoint)
+    )
+    if end is not None:
+        query = query.where(APIUsageRollup.bucket_start < end)
+
+    rollups = (await db.execute(query)).scalars().all()
+    month = await usage_totals(db, current_user.id, "month", now)
+
+    return UsageSummaryResponse(
+        period=period,
+        month_tokens_used=month["tokens_used"],
+        month_cost_cents=month["cost_cents"],
+        monthly_token_quota=monthly_token_quota(current_user.subscription_plan),
+        buckets=[
+            UsageBucketResponse(
+                bucket_start=str(rollup.bucket_start),
+                endpoint=rollup.endpoint,
+                request_count=rollup.request_count,
+                tokens_used=rollup.tokens_used,
+                cost_cents=rollup.cost_cents
+            )
+            for rollup in rollups
+        ]
+    )
@@ -3,7 +3,7 @@ Application Configuration
 Uses Pydantic Settings for environment variable management
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -22,9 +22,112 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
     OPENAI_FALLBACK_MODEL: str = "gpt-3.5-turbo"
+    OPENAI_BASE_URL: str = ""
+    OPENAI_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_MAX_CONCURRENCY: int = 16
+    OPENAI_MAX_CONNECTIONS: int = 32
+    # Tokens-per-minute budgets for our OpenAI tier; the scheduler routes to
+    # the fallback model once the primary's budget is spent
+    OPENAI_TOKENS_PER_MINUTE: int = 300000
+    OPENAI_FALLBACK_TOKENS_PER_MINUTE: int = 1000000
+    LLM_SCHEDULER_INTERACTIVE_WEIGHT: int = 4
+    LLM_SCHEDULER_BATCH_WEIGHT: int = 1
+
+    # Model call resilience: overall deadline, jittered retries, hedging
+    # (off unless a percentile is set) and a circuit breaker
+    OPENAI_DEADLINE_SECONDS: float = 45.0
+    OPENAI_RETRY_ATTEMPTS: int = 3
+    OPENAI_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    OPENAI_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    OPENAI_HEDGE_PERCENTILE: Optional[float] = None
+    OPENAI_HEDGE_MIN_SAMPLES: int = 50
+    OPENAI_BREAKER_FAILURE_THRESHOLD: int = 5
+    OPENAI_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Translation cache
+    TRANSLATION_CACHE_MAX_ENTRIES: int = 10000
+    TRANSLATION_CACHE_TTL_SECONDS: int = 86400
+    TRANSLATION_CACHE_SHARED: bool = False
+
+    # Completion budget: max_tokens allows this many tokens per expected task
+    # (3 for short feedback, more for longer input, up to TRANSLATION_MAX_TASKS)
+    TRANSLATION_TOKENS_PER_TASK: int = 100
+    TRANSLATION_MAX_TASKS: int = 5
+
+    # Packing: up to this many short comments (by token count) share one
+    # completion; /translate waits up to the window for company (0 turns it off)
+    TRANSLATION_PACK_MAX_ITEMS: int = 8
+    TRANSLATION_PACK_MAX_ITEM_TOKENS: int = 60
+    TRANSLATION_PACK_WINDOW_MS: float = 0
+
+    # Background translation jobs (async mode of /feedback/translate). The API
+    # runs TRANSLATION_JOB_CONCURRENCY jobs itself unless TRANSLATION_JOBS_IN_API
+    # is off; python -m app.worker runs more in separate processes
+    TRANSLATION_JOBS_IN_API: bool = True
+    TRANSLATION_JOB_CONCURRENCY: int = 2
+    TRANSLATION_JOB_POLL_SECONDS: float = 1.0
+    TRANSLATION_JOB_LEASE_SECONDS: float = 120.0
+    TRANSLATION_JOB_MAX_ATTEMPTS: int = 3
+    TRANSLATION_JOB_CALLBACK_SECRET: str = ""
+    TRANSLATION_JOB_CALLBACK_TIMEOUT_SECONDS: float = 10.0
+    # Plain http and private/loopback callback addresses, for local receivers only
+    TRANSLATION_JOB_ALLOW_PRIVATE_CALLBACKS: bool = False
+
+    # Near-duplicate reuse of earlier translations within a project: Jaccard
+    # similarity (0-1) of word-pair shingles, checked exactly before reuse
+    SIMILARITY_INDEX_ENABLED: bool = False
+    SIMILARITY_THRESHOLD: float = 0.9
+
+    # Screenshot feedback (/feedback/screenshots): uploads are streamed to
+    # disk, downscaled to fit SCREENSHOT_MAX_DIMENSION and stored as WebP by
+    # SCREENSHOT_WORKERS processes. A screenshot within SCREENSHOT_HASH_MAX_DISTANCE
+    # bits (of 64) of an earlier one with the same comment reuses its tasks
+    SCREENSHOT_UPLOAD_DIR: str = "uploads/screenshots"
+    SCREENSHOT_MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024
+    SCREENSHOT_MAX_PIXELS: int = 50_000_000
+    SCREENSHOT_MAX_DIMENSION: int = 1600
+    SCREENSHOT_QUALITY: int = 80
+    SCREENSHOT_WORKERS: int = 2
+    SCREENSHOT_HASH_MAX_DISTANCE: int = 4
+    SCREENSHOT_DEDUP_SCAN_LIMIT: int = 500
+
+    # Batch translation
+    BATCH_TRANSLATE_MAX_ITEMS: int = 50
+    BATCH_TRANSLATE_CONCURRENCY: int = 8
+
+    # Usage metering (write-behind to api_usage)
+    USAGE_METER_QUEUE_SIZE: int = 10000
+    USAGE_METER_BATCH_SIZE: int = 500
+    USAGE_METER_FLUSH_SECONDS: float = 2.0
+
+    # Monthly LLM token quota per subscription plan (0 = unlimited)
+    USAGE_QUOTA_MONTHLY_TOKENS: int = 2000000
+    USAGE_QUOTA_PER_PROJECT_TOKENS: int = 500000
+    USAGE_QUOTA_ENTERPRISE_TOKENS: int = 0
+
+    # Per-user rate limiting on translate (token bucket per plan)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_SHARED: bool = False
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_MONTHLY_PER_MINUTE: float = 20
+    RATE_LIMIT_MONTHLY_BURST: float = 10
+    RATE_LIMIT_PER_PROJECT_PER_MINUTE: float = 10
+    RATE_LIMIT_PER_PROJECT_BURST: float = 5
+    RATE_LIMIT_ENTERPRISE_PER_MINUTE: float = 120
+    RATE_LIMIT_ENTERPRISE_BURST: float = 60
+
+    # Bulk task completion
+    TASK_BULK_UPDATE_MAX_ITEMS: int = 1000
     
     # Clerk Authentication
     CLERK_SECRET_KEY: str
+    CLERK_JWKS_URL: str = "https://api.clerk.com/v1/jwks"
+    CLERK_ISSUER: str = ""
+    CLERK_AUTHORIZED_PARTIES: List[str] = []
+    JWKS_CACHE_TTL_SECONDS: int = 3600
+    VERIFIED_TOKEN_CACHE_SIZE: int = 10000
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 30
     
     # Stripe
     STRIPE_SECRET_KEY: str
@@ -0,0 +1,87 @@
+"""
+In-process token-bucket rate limiter
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+
+class TokenBucketLimiter:
+    """
+    One token bucket per key, refilled continuously at ``rate`` tokens/second
+
+    A bucket holds at most ``burst`` tokens and starts full. Buckets are
+    kept in LRU order and the least recently used is dropped once
+    ``max_keys`` is reached; a dropped key simply starts full again.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(
+        self,
+        key: Hashable,
+        rate: float,
+        burst: float,
+        cost: float = 1.0,
+        allow_debt: bool = False,
+    ) -> float:
+        """
+        Take ``cost`` tokens from the key's bucket if it has them
+
+        A cost above ``burst`` only needs a full bucket, so oversized requests
+        are not refused forever. By default the charge is clamped to
+        ``burst`` too; with ``allow_debt`` the full cost is taken and the
+        bucket goes negative, so the caller pays it off before the next
+        request instead of being undercharged.
+
+        Returns:
+            0.0 when allowed, otherwise seconds until the tokens are available
+        """
+        now = self.clock()
+        need = min(cost, burst)
+        if not allow_debt:
+            cost = need
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= need:
+            bucket[0] -= cost
+            self.allowed += 1
+            return 0.0
+
+        self.limited += 1
+        return (need - bucket[0]) / rate
+
+    def credit(self, key: Hashable, amount: float, burst: float) -> None:
+        """
+        Give back tokens taken for work that turned out cheaper than charged
+        """
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket[0] = min(burst, bucket[0] + amount)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for monitoring
+        """
+        return {
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
@@ -1,12 +1,22 @@
 """
 Base class for SQLAlchemy models
 """
-from sqlalchemy.orm import declarative_base
+from typing import ClassVar
+
+from sqlalchemy import Table
+from sqlalchemy.orm import DeclarativeBase
+
+
+class Base(DeclarativeBase):
+    # Every model is mapped to a Table (used directly for Core statements)
+    __table__: ClassVar[Table]
 
-Base = declarative_base()
 
 # Import all models here for Alembic to detect them
 from app.models.user import User  # noqa
 from app.models.project import Project  # noqa
 from app.models.feedback import FeedbackInput, GeneratedTask  # noqa
-from app.models.api_usage import APIUsage  # noqa
+from app.models.api_usage import APIUsage, APIUsageRollup  # noqa
+from app.models.translation_cache import TranslationCacheEntry  # noqa
+from app.models.rate_limit import RateLimitBucket  # noqa
+from app.models.translation_job import TranslationJob  # noqa
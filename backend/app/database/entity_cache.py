@@ -0,0 +1,67 @@
+"""
+Short-lived cache of ORM rows that are read on almost every request
+Hits are re-attached to the caller's session without a SELECT
+"""
+from typing import Any, Dict, Hashable, Optional, Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.lru import TTLCache
+
+
+class EntityCache:
+    """
+    TTL cache of one model's column values
+
+    Column values are stored rather than instances, so a cached row is never
+    shared between sessions. ``get`` rebuilds the instance and adds it to the
+    caller's session as if it had just been loaded. The cache is per
+    process: writers call ``invalidate`` locally and the TTL bounds how stale
+    other workers can be.
+    """
+
+    def __init__(self, model: Type, max_entries: int = 10000, ttl_seconds: float = 30):
+        mapper = inspect(model)
+        self.model = model
+        self._columns = [attr.key for attr in mapper.column_attrs]
+        self._primary_key = [mapper.get_property_by_column(col).key for col in mapper.primary_key]
+        self._entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, key: Hashable, session) -> Optional[Any]:
+        """
+        Cached instance attached to ``session``, or None on a miss
+
+        Works with both ``Session`` and ``AsyncSession``.
+        """
+        values = self._entries.get(key)
+        if values is None:
+            return None
+
+        identity = inspect(self.model).identity_key_from_primary_key(
+            [values[name] for name in self._primary_key]
+        )
+        loaded = session.identity_map.get(identity)
+        if loaded is not None:
+            return loaded
+
+        instance = self.model(**values)
+        make_transient_to_detached(instance)
+        session.add(instance)
+        return instance
+
+    def set(self, key: Hashable, instance: Any) -> None:
+        """
+        Remember an instance's current column values
+        """
+        values: Dict[str, Any] = {name: getattr(instance, name) for name in self._columns}
+        self._entries.set(key, values)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.delete(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        return self._entries.stats()
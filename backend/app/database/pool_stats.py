@@ -0,0 +1,75 @@
+"""
+Connection pool occupancy metrics
+Records how many connections are checked out and for how long
+"""
+import time
+from typing import Dict, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolStats:
+    """
+    Tracks checkouts on a SQLAlchemy pool
+
+    Hold times are the useful signal: a connection held across an LLM call
+    shows up as a multi-second hold, so ``long_holds`` should stay at zero.
+    """
+
+    def __init__(self, long_hold_seconds: float = 1.0):
+        self.long_hold_seconds = long_hold_seconds
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.checkouts = 0
+        self.long_holds = 0
+        self.max_hold_seconds = 0.0
+        self.total_hold_seconds = 0.0
+        self._pool: Optional[Pool] = None
+
+    def attach(self, target: Union[Engine, Pool]) -> None:
+        """
+        Listen to checkout/checkin events on an engine's pool
+        """
+        self._pool = target.pool if isinstance(target, Engine) else target
+        event.listen(self._pool, "checkout", self._on_checkout)
+        event.listen(self._pool, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["checked_out_at"] = time.monotonic()
+        self.checkouts += 1
+        self.checked_out += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is None:
+            return
+        held = time.monotonic() - checked_out_at
+        self.checked_out -= 1
+        self.total_hold_seconds += held
+        self.max_hold_seconds = max(self.max_hold_seconds, held)
+        if held >= self.long_hold_seconds:
+            self.long_holds += 1
+
+    def snapshot(self) -> Dict:
+        """
+        Current counters for /metrics
+        """
+        completed = self.checkouts - self.checked_out
+        stats = {
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts": self.checkouts,
+            "long_holds": self.long_holds,
+            "long_hold_threshold_seconds": self.long_hold_seconds,
+            "max_hold_ms": round(self.max_hold_seconds * 1000, 2),
+            "avg_hold_ms": (
+                round(self.total_hold_seconds / completed * 1000, 2) if completed else 0.0
+            ),
+        }
+        if isinstance(self._pool, QueuePool):
+            stats["pool_size"] = self._pool.size()
+            stats["overflow"] = self._pool.overflow()
+        return stats
@@ -4,6 +4,7 @@ Database session management
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.database.pool_stats import PoolStats
 
 # Convert postgresql:// to postgresql+asyncpg://
 database_url = settings.DATABASE_URL.replace(
@@ -18,6 +19,10 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
+# Pool occupancy metrics (served from /metrics)
+pool_stats = PoolStats()
+pool_stats.attach(engine.sync_engine)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -41,3 +46,15 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """
+    End the session's transaction so its connection goes back to the pool
+
+    Call before slow external I/O (LLM calls, webhooks). Loaded objects stay
+    usable (expire_on_commit=False) and the session checks out a fresh
+    connection on its next query.
+    """
+    if session.in_transaction():
+        await session.commit()
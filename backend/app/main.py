@@ -4,12 +4,28 @@ Freedback FastAPI Main Application
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.core.config import settings
 from app.api.v1.router import api_router
-from app.database.session import engine
+from app.database.session import engine, AsyncSessionLocal, pool_stats
 from app.database.base import Base
+from app.services.translator_service import (
+    llm_client,
+    llm_scheduler,
+    model_call,
+    packed_translation_prompts,
+    translation_cache,
+    translation_prompts,
+    translation_window,
+    usage_meter,
+)
+from app.services.feedback_index import feedback_index, load_feedback_index
+from app.services.job_worker import translation_worker
+from app.services.screenshot_service import screenshot_processor
+from app.services.auth_service import jwks_cache, user_cache
+from app.services.rate_limiter import rate_limiter
 
 # Configure logging
 logging.basicConfig(
@@ -35,10 +51,31 @@ async def lifespan(app: FastAPI):
             await conn.run_sync(Base.metadata.create_all)
             logger.info("Database tables created")
     
+    # Background writer for api_usage rows
+    usage_meter.start()
+
+    # Background translation jobs (separate workers: python -m app.worker)
+    if settings.TRANSLATION_JOBS_IN_API:
+        translation_worker.start()
+
+    # Warm the similarity index without delaying startup
+    index_loader = None
+    if settings.SIMILARITY_INDEX_ENABLED:
+        index_loader = asyncio.create_task(load_feedback_index(AsyncSessionLocal))
+
     yield
     
     # Shutdown
     logger.info("Shutting down Freedback API...")
+    if index_loader:
+        index_loader.cancel()
+    # Unfinished jobs are picked up again by any worker once their lease runs out
+    await translation_worker.close()
+    screenshot_processor.close()
+    # Drain queued usage rows before the engine goes away
+    await usage_meter.close()
+    await llm_client.aclose()
+    await jwks_cache.aclose()
     await engine.dispose()
 
 
@@ -77,6 +114,29 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Internal performance counters
+    """
+    return {
+        "translation_cache": translation_cache.stats(),
+        "similarity_index": {"size": len(feedback_index)},
+        "user_cache": user_cache.stats(),
+        "db_pool": pool_stats.snapshot(),
+        "usage_meter": usage_meter.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "llm": {"in_flight": llm_client.in_flight, "max_concurrency": llm_client.max_concurrency},
+        "llm_scheduler": llm_scheduler.stats(),
+        "llm_resilience": model_call.stats(),
+        "llm_prompts": translation_prompts.stats(),
+        "llm_packed_prompts": packed_translation_prompts.stats(),
+        "translation_window": translation_window.stats(),
+        "translation_jobs": translation_worker.stats(),
+        "screenshots": screenshot_processor.stats()
+    }
+
+
 @app.get("/")
 async def root():
     """
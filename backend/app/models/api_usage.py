@@ -1,10 +1,11 @@
 """
 API Usage tracking model
 """
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from sqlalchemy import String, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
+from typing import Optional
 import uuid
 
 from app.database.base import Base
@@ -13,15 +14,48 @@ from app.database.base import Base
 class APIUsage(Base):
     __tablename__ = "api_usage"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    endpoint = Column(String(255), nullable=False)
-    tokens_used = Column(Integer)
-    cost_cents = Column(Integer)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    endpoint: Mapped[str] = mapped_column(String(255), nullable=False)
+    tokens_used: Mapped[Optional[int]] = mapped_column(Integer)
+    cost_cents: Mapped[Optional[int]] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
     
     # Relationships
     user = relationship("User", back_populates="api_usage")
     
+    __table_args__ = (
+        # Per-user time ranges; also serves lookups by user_id alone
+        Index("idx_api_usage_user_created", "user_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<APIUsage {self.endpoint} at {self.created_at}>"
+
+
+class APIUsageRollup(Base):
+    """
+    api_usage pre-aggregated per user, endpoint and hour/day/month bucket
+
+    Upserted in the same transaction as the api_usage rows it summarizes.
+    """
+    __tablename__ = "api_usage_rollups"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    period: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    endpoint: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    tokens_used: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    cost_cents: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<APIUsageRollup {self.period} {self.bucket_start} {self.endpoint}>"
@@ -1,10 +1,11 @@
 """
 Feedback and Task models
 """
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Boolean, Integer, Enum
+from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, Integer, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
+from typing import Any, Dict, Optional
 import uuid
 import enum
 
@@ -26,17 +27,30 @@ class DifficultyLevel(str, enum.Enum):
 class FeedbackInput(Base):
     __tablename__ = "feedback_inputs"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
-    original_text = Column(Text, nullable=False)
-    source_type = Column(Enum(SourceType), default=SourceType.TEXT, nullable=False)
-    metadata = Column(JSONB)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("projects.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    original_text: Mapped[str] = mapped_column(Text, nullable=False)
+    source_type: Mapped[SourceType] = mapped_column(
+        Enum(SourceType), default=SourceType.TEXT, nullable=False
+    )
+    # "metadata" is reserved on declarative models, so the attribute is named differently
+    input_metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column("metadata", JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     project = relationship("Project", back_populates="feedback_inputs")
     generated_tasks = relationship("GeneratedTask", back_populates="feedback_input", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Backs the history listing: keyset on (created_at, id) within a project
+        Index("idx_feedback_inputs_project_created", "project_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<FeedbackInput {self.id}>"
 
@@ -44,17 +58,31 @@ class FeedbackInput(Base):
 class GeneratedTask(Base):
     __tablename__ = "generated_tasks"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    input_id = Column(UUID(as_uuid=True), ForeignKey("feedback_inputs.id", ondelete="CASCADE"), nullable=False, index=True)
-    task_description = Column(Text, nullable=False)
-    is_completed = Column(Boolean, default=False, nullable=False)
-    estimated_time_minutes = Column(Integer)
-    difficulty_level = Column(Enum(DifficultyLevel))
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    completed_at = Column(DateTime)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    input_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("feedback_inputs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    # Copied from the feedback input so project-wide task listings need no join
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    task_description: Mapped[str] = mapped_column(Text, nullable=False)
+    is_completed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    estimated_time_minutes: Mapped[Optional[int]] = mapped_column(Integer)
+    difficulty_level: Mapped[Optional[DifficultyLevel]] = mapped_column(Enum(DifficultyLevel))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
     # Relationships
     feedback_input = relationship("FeedbackInput", back_populates="generated_tasks")
     
+    __table_args__ = (
+        # Backs the project task listing: keyset on (created_at, id) within a project
+        Index("idx_generated_tasks_project_created", "project_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<GeneratedTask {self.task_description[:50]}>"
@@ -0,0 +1,20 @@
+"""
+Shared rate limit bucket model
+"""
+from sqlalchemy import String, DateTime, Float, Boolean
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+from app.database.base import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+
+    def __repr__(self):
+        return f"<RateLimitBucket {self.key} {self.tokens:.2f}>"
@@ -0,0 +1,61 @@
+"""
+Background translation job model
+"""
+from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, Integer, Enum, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+import uuid
+import enum
+
+from app.database.base import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class TranslationJob(Base):
+    __tablename__ = "translation_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    input_text: Mapped[str] = mapped_column(Text, nullable=False)
+    bypass_cache: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    callback_url: Mapped[Optional[str]] = mapped_column(String(2048))
+    status: Mapped[JobStatus] = mapped_column(
+        Enum(JobStatus), default=JobStatus.QUEUED, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Not claimable before this (retry backoff)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # A running job whose lease has passed is reclaimed (its worker died)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    worker_id: Mapped[Optional[str]] = mapped_column(String(255))
+    # Deferred so a worker can mark the job done before inserting its feedback row
+    feedback_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("feedback_inputs.id", ondelete="SET NULL", deferrable=True, initially="DEFERRED")
+    )
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    callback_sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        # Backs the claim query: queued jobs that are due, running jobs past their lease
+        Index("idx_translation_jobs_status_run_after", "status", "run_after"),
+    )
+
+    def __repr__(self):
+        return f"<TranslationJob {self.id} {self.status}>"
@@ -1,10 +1,11 @@
 """
 User model
 """
-from sqlalchemy import Column, String, DateTime, Enum
+from sqlalchemy import String, DateTime, Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
+from typing import Optional
 import uuid
 import enum
 
@@ -27,18 +28,24 @@ class SubscriptionPlan(str, enum.Enum):
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    email = Column(String(255), unique=True, nullable=False, index=True)
-    clerk_user_id = Column(String(255), unique=True, nullable=False, index=True)
-    stripe_customer_id = Column(String(255), unique=True, index=True)
-    subscription_status = Column(
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    clerk_user_id: Mapped[str] = mapped_column(
+        String(255), unique=True, nullable=False, index=True
+    )
+    stripe_customer_id: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True)
+    subscription_status: Mapped[SubscriptionStatus] = mapped_column(
         Enum(SubscriptionStatus),
         default=SubscriptionStatus.INACTIVE,
         nullable=False
     )
-    subscription_plan = Column(Enum(SubscriptionPlan), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    subscription_plan: Mapped[Optional[SubscriptionPlan]] = mapped_column(
+        Enum(SubscriptionPlan), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
     
     # Relationships
     projects = relationship("Project", back_populates="user", cascade="all, delete-orphan")
@@ -4,19 +4,48 @@ Authentication service using Clerk
 from fastapi import Depends, HTTPException, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import httpx
 import logging
 
 from app.core.config import settings
+from app.database.entity_cache import EntityCache
 from app.database.session import get_db
 from app.models.user import User
+from app.services.jwks import JWKSCache, ClerkTokenVerifier, TokenVerificationError
 
 logger = logging.getLogger(__name__)
 
 
+# Clerk signing keys are fetched once and refreshed in the background
+jwks_cache = JWKSCache(
+    settings.CLERK_JWKS_URL,
+    headers={"Authorization": f"Bearer {settings.CLERK_SECRET_KEY}"},
+    ttl_seconds=settings.JWKS_CACHE_TTL_SECONDS,
+)
+token_verifier = ClerkTokenVerifier(
+    jwks_cache,
+    issuer=settings.CLERK_ISSUER,
+    authorized_parties=settings.CLERK_AUTHORIZED_PARTIES,
+    cache_size=settings.VERIFIED_TOKEN_CACHE_SIZE,
+)
+
+# Users keyed by clerk_user_id; writers to a user row call invalidate_user
+user_cache = EntityCache(
+    User,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user(user: User) -> None:
+    """
+    Drop a user from the cache after changing their row
+    """
+    user_cache.invalidate(user.clerk_user_id)
+
+
 async def verify_clerk_token(authorization: str = Header(None)) -> dict:
     """
-    Verify Clerk JWT token
+    Verify Clerk JWT token locally against the cached JWKS
     """
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -26,30 +55,14 @@ async def verify_clerk_token(authorization: str = Header(None)) -> dict:
     
     token = authorization.replace("Bearer ", "")
     
-    # Verify token with Clerk
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                "https://api.clerk.com/v1/tokens/verify",
-                headers={
-                    "Authorization": f"Bearer {settings.CLERK_SECRET_KEY}",
-                },
-                params={"token": token}
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token"
-                )
-            
-            return response.json()
-        except httpx.HTTPError as e:
-            logger.error(f"Error verifying Clerk token: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token verification failed"
-            )
+    try:
+        return await token_verifier.verify(token)
+    except TokenVerificationError as e:
+        logger.warning(f"Rejected Clerk token: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
 
 
 async def get_current_user(
@@ -59,6 +72,7 @@ async def get_current_user(
     """
     Get current authenticated user from database
     Creates user if doesn't exist (first-time login)
+    Served from user_cache when possible, so most requests skip the SELECT
     """
     clerk_user_id = token_data.get("sub")
     email = token_data.get("email")
@@ -69,6 +83,10 @@ async def get_current_user(
             detail="Invalid token data"
         )
     
+    user = user_cache.get(clerk_user_id, db)
+    if user is not None:
+        return user
+
     # Try to find existing user
     result = await db.execute(
         select(User).where(User.clerk_user_id == clerk_user_id)
@@ -86,4 +104,5 @@ async def get_current_user(
         await db.refresh(user)
         logger.info(f"Created new user: {email}")
     
+    user_cache.set(clerk_user_id, user)
     return user
@@ -0,0 +1,80 @@
+"""
+Vetting of client-supplied callback URLs
+Job results are POSTed from inside our network, so a callback must not
+reach loopback, private, link-local or otherwise non-public addresses
+"""
+import asyncio
+import ipaddress
+import socket
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+MAX_URL_LENGTH = 2048
+
+Resolver = Callable[[str, int], Awaitable[List[str]]]
+
+
+class UnsafeCallbackURL(ValueError):
+    pass
+
+
+class VettedCallback(NamedTuple):
+    url: str
+    hostname: str
+    address: str
+
+
+async def resolve_host(host: str, port: int) -> List[str]:
+    """
+    Every address the host resolves to, without blocking the event loop
+    """
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def check_callback_url(
+    url: str,
+    allow_local: bool = False,
+    resolve: Optional[Resolver] = None,
+) -> VettedCallback:
+    """
+    Check that a callback URL is https and every address it resolves to is public
+
+    Args:
+        url: The client's callback URL
+        allow_local: Accept plain http and private addresses (local development receivers)
+        resolve: Host resolver, defaults to the system's
+
+    Returns:
+        The URL with one vetted address to connect to, so the request
+        cannot be rebound to another address after the check
+
+    Raises:
+        UnsafeCallbackURL: When the URL may not be called
+    """
+    parsed = urlparse(url)
+    schemes = ("https", "http") if allow_local else ("https",)
+    if parsed.scheme not in schemes or not parsed.hostname or len(url) > MAX_URL_LENGTH:
+        raise UnsafeCallbackURL("callback_url must be an absolute https URL")
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    except ValueError:
+        raise UnsafeCallbackURL("callback_url has an invalid port")
+
+    try:
+        addresses = await (resolve or resolve_host)(parsed.hostname, port)
+    except (OSError, UnicodeError):
+        raise UnsafeCallbackURL("callback_url host could not be resolved")
+    if not addresses:
+        raise UnsafeCallbackURL("callback_url host could not be resolved")
+    # One private address is enough to refuse: the client picks which one we would get
+    if not allow_local and not all(is_public_address(address) for address in addresses):
+        raise UnsafeCallbackURL("callback_url must resolve to a public address")
+    return VettedCallback(url, parsed.hostname, addresses[0])
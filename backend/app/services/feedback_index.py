@@ -0,0 +1,95 @@
+"""
+Near-duplicate lookup over stored feedback
+Lets the translate endpoint reuse tasks from a paraphrase already translated in the same project
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.feedback import FeedbackInput, GeneratedTask
+from app.services.similarity_index import SimilarityIndex, jaccard, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Process-wide index of FeedbackInput.original_text, scoped per project
+feedback_index = SimilarityIndex()
+
+
+async def load_feedback_index(session_factory: async_sessionmaker, batch_size: int = 10000) -> None:
+    """
+    Warm the index from feedback_inputs
+    Runs in the background at startup; lookups simply miss until it finishes
+    """
+    loaded = 0
+    async with session_factory() as session:
+        result = await session.stream(
+            select(FeedbackInput.id, FeedbackInput.original_text, FeedbackInput.project_id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions(batch_size):
+            feedback_index.add_many(*zip(*rows))
+            loaded += len(rows)
+            # Let requests run between batches
+            await asyncio.sleep(0)
+    logger.info(f"Feedback similarity index loaded {loaded} inputs")
+
+
+def index_feedback(feedback_id: UUID, text: str, project_id: UUID) -> None:
+    """
+    Add a newly stored input to the index
+    """
+    if settings.SIMILARITY_INDEX_ENABLED:
+        feedback_index.add(feedback_id, text, owner=project_id)
+
+
+async def find_similar_tasks(db: AsyncSession, text: str, project_id: UUID) -> Optional[List[Dict]]:
+    """
+    Tasks of the project's closest prior input above SIMILARITY_THRESHOLD, if any
+
+    The MinHash estimate only nominates a candidate; its stored text is
+    compared exactly before any tasks are reused.
+    """
+    if not settings.SIMILARITY_INDEX_ENABLED:
+        return None
+
+    match = feedback_index.query(text, threshold=settings.SIMILARITY_THRESHOLD, owner=project_id)
+    if match is None:
+        return None
+
+    input_id, _ = match
+    candidate = await db.execute(
+        select(FeedbackInput.original_text).where(
+            FeedbackInput.id == input_id,
+            FeedbackInput.project_id == project_id
+        )
+    )
+    original_text = candidate.scalar_one_or_none()
+    if original_text is None:
+        return None
+    similarity = jaccard(set(tokenize(text)), set(tokenize(original_text)))
+    if similarity < settings.SIMILARITY_THRESHOLD:
+        return None
+
+    result = await db.execute(
+        select(GeneratedTask)
+        .where(GeneratedTask.input_id == input_id)
+        .order_by(GeneratedTask.created_at)
+    )
+    tasks = result.scalars().all()
+    if not tasks:
+        return None
+
+    logger.info(f"Reusing tasks from feedback {input_id} (similarity {similarity:.2f})")
+    return [
+        {
+            "task": task.task_description,
+            "estimated_time_minutes": task.estimated_time_minutes,
+            "difficulty_level": task.difficulty_level
+        }
+        for task in tasks
+    ]
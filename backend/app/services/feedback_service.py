@@ -0,0 +1,84 @@
+"""
+Persistence for translated feedback
+Every translate path writes its rows through here in a single transaction
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.feedback import FeedbackInput, GeneratedTask, SourceType
+from app.services.project_counters import record_feedback
+
+
+def build_feedback_row(
+    project_id: UUID,
+    original_text: str,
+    source_type: SourceType = SourceType.TEXT,
+    created_at: Optional[datetime] = None,
+    input_metadata: Optional[Dict] = None
+) -> Dict:
+    """
+    FeedbackInput values with a client-side id, ready for bulk insert
+    """
+    return {
+        "id": uuid4(),
+        "project_id": project_id,
+        "original_text": original_text,
+        "source_type": source_type,
+        "input_metadata": input_metadata,
+        "created_at": created_at or datetime.utcnow()
+    }
+
+
+def build_task_row(
+    feedback_row: Dict,
+    task_data: Dict,
+    created_at: Optional[datetime] = None
+) -> Dict:
+    """
+    GeneratedTask values with a client-side id, ready for bulk insert
+    """
+    return {
+        "id": uuid4(),
+        "input_id": feedback_row["id"],
+        "project_id": feedback_row["project_id"],
+        "task_description": task_data["task"],
+        "is_completed": False,
+        "estimated_time_minutes": task_data.get("estimated_time_minutes"),
+        "difficulty_level": task_data.get("difficulty_level"),
+        "created_at": created_at or datetime.utcnow()
+    }
+
+
+async def save_feedback_with_tasks(
+    db: AsyncSession,
+    feedback_rows: Sequence[Dict],
+    task_rows: Sequence[Dict]
+) -> List[GeneratedTask]:
+    """
+    Insert feedback inputs and their tasks, then commit once
+
+    Round trips: one INSERT for all inputs, one INSERT ... RETURNING for all
+    tasks, one UPDATE of the project counters, one COMMIT, regardless of how
+    many tasks there are.
+
+    Returns:
+        The inserted tasks, in the order of task_rows
+    """
+    if feedback_rows:
+        await db.execute(insert(FeedbackInput), list(feedback_rows))
+
+    tasks: List[GeneratedTask] = []
+    if task_rows:
+        result = await db.scalars(
+            insert(GeneratedTask).returning(GeneratedTask, sort_by_parameter_order=True),
+            list(task_rows)
+        )
+        tasks = list(result.all())
+
+    await record_feedback(db, feedback_rows, task_rows)
+    await db.commit()
+    return tasks
@@ -0,0 +1,204 @@
+"""
+CPU-bound screenshot preprocessing
+Runs in worker processes, so this module imports nothing from the app
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# 8x8 difference hash: 64 bits, 16 hex digits
+HASH_SIZE = 8
+
+STORED_CONTENT_TYPE = "image/webp"
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class ScreenshotError(ValueError):
+    """
+    The upload is not an image we can read (or is too large to decode)
+    """
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """
+    Content type from the first bytes of a file, or None if it isn't a supported image
+    """
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def perceptual_hash(image: Image.Image) -> str:
+    """
+    Difference hash: whether each pixel of a 9x8 grayscale thumbnail is
+    brighter than its right neighbour
+
+    Survives rescaling and recompression, so the same screenshot uploaded
+    twice (or as PNG and then JPEG) hashes to the same or a nearby value.
+    """
+    small = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            offset = row * (HASH_SIZE + 1) + col
+            bits = (bits << 1) | (pixels[offset] > pixels[offset + 1])
+    return f"{bits:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def hamming_distance(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    # Transparent areas of a screenshot are rendered white, as in a browser
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def process_screenshot(
+    source_path: str,
+    dest_path: str,
+    max_dimension: int = 1600,
+    quality: int = 80,
+    max_pixels: int = 50_000_000
+) -> Dict:
+    """
+    Downscale a screenshot to fit ``max_dimension`` and store it as WebP
+
+    Only the header is read before the pixel count is checked, so a
+    decompression bomb is rejected without being decoded. JPEGs are
+    decoded at a reduced scale when they are much larger than the target.
+
+    Returns:
+        Original and stored dimensions and sizes, and the perceptual hash
+    """
+    try:
+        with Image.open(source_path) as original:
+            width, height = original.size
+            if width * height > max_pixels:
+                raise ScreenshotError(
+                    f"Image is {width}x{height}; at most {max_pixels:,} pixels are accepted"
+                )
+            original_format = original.format
+            original.draft("RGB", (max_dimension, max_dimension))
+            image = _flatten(ImageOps.exif_transpose(original))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ScreenshotError(f"Could not read image: {e}") from None
+
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    phash = perceptual_hash(image)
+    image.save(dest_path, "WEBP", quality=quality, method=4)
+    return {
+        "original_format": original_format,
+        "original_width": width,
+        "original_height": height,
+        "width": image.width,
+        "height": image.height,
+        "content_type": STORED_CONTENT_TYPE,
+        "phash": phash,
+    }
+
+
+class ScreenshotProcessor:
+    """
+    Runs ``process_screenshot`` on a pool of ``workers`` processes
+
+    Decoding and resampling a large PNG holds the GIL for hundreds of
+    milliseconds, so it cannot run on the event loop (or a thread) without
+    stalling every other request. Workers are spawned rather than forked
+    from the threaded API process, on first use.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_dimension: int = 1600,
+        quality: int = 80,
+        max_pixels: int = 50_000_000
+    ):
+        self.workers = workers
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.max_pixels = max_pixels
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.processed = 0
+        self.rejected = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    async def process(self, source_path: str, dest_path: str) -> Dict:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        executor = self._executor
+        job = partial(
+            process_screenshot,
+            source_path,
+            dest_path,
+            max_dimension=self.max_dimension,
+            quality=self.quality,
+            max_pixels=self.max_pixels
+        )
+        start = time.perf_counter()
+        self.in_flight += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, job)
+        except ScreenshotError:
+            self.rejected += 1
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); reap the rest of the old pool
+            # (once, if several calls saw it break) and start a fresh one next time
+            self.errors += 1
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.processed += 1
+        self.total_seconds += time.perf_counter() - start
+        return result
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "avg_ms": (
+                round(self.total_seconds / self.processed * 1000, 1) if self.processed else None
+            ),
+        }
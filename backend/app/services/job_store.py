@@ -0,0 +1,229 @@
+"""
+Postgres queue for background translation jobs
+Any number of worker processes claim from it with FOR UPDATE SKIP LOCKED
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.feedback import GeneratedTask
+from app.models.translation_job import JobStatus, TranslationJob
+from app.services.feedback_service import (
+    build_feedback_row,
+    build_task_row,
+    save_feedback_with_tasks,
+)
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    user_id: UUID,
+    project_id: UUID,
+    input_text: str,
+    bypass_cache: bool = False,
+    callback_url: Optional[str] = None
+) -> TranslationJob:
+    """
+    Persist a queued job and commit, so it survives a restart before any worker sees it
+    """
+    job = TranslationJob(
+        user_id=user_id,
+        project_id=project_id,
+        input_text=input_text,
+        bypass_cache=bypass_cache,
+        callback_url=callback_url,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        run_after=datetime.utcnow(),
+        created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+def job_result(job: TranslationJob, tasks: Sequence[GeneratedTask] = ()) -> Dict:
+    """
+    A job's status and, once it succeeded, its tasks (for polling and callbacks)
+    """
+    return {
+        "job_id": str(job.id),
+        "status": job.status.value,
+        "project_id": str(job.project_id),
+        "original_text": job.input_text,
+        "attempts": job.attempts,
+        "feedback_id": str(job.feedback_id) if job.feedback_id else None,
+        "tasks": [
+            {
+                "id": str(task.id),
+                "task_description": task.task_description,
+                "is_completed": task.is_completed,
+                "estimated_time_minutes": task.estimated_time_minutes,
+                "difficulty_level": task.difficulty_level,
+                "created_at": str(task.created_at),
+            }
+            for task in tasks
+        ],
+        "error": job.error,
+        "created_at": str(job.created_at),
+        "finished_at": str(job.finished_at) if job.finished_at else None,
+    }
+
+
+async def load_job_tasks(db: AsyncSession, job: TranslationJob) -> List[GeneratedTask]:
+    if job.feedback_id is None:
+        return []
+    result = await db.scalars(
+        select(GeneratedTask)
+        .where(GeneratedTask.input_id == job.feedback_id)
+        .order_by(GeneratedTask.created_at, GeneratedTask.id)
+    )
+    return list(result.all())
+
+
+class PostgresJobStore:
+    """
+    Claims and settles rows in ``translation_jobs``
+
+    ``claim`` locks due rows with SKIP LOCKED, so concurrent workers never
+    take the same job, and leases them for ``lease_seconds``. A job whose
+    worker died mid-run is claimed again once its lease has passed. Jobs
+    are only settled by the worker that still holds the lease, so a worker
+    that stalled past its lease cannot write a job twice.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[TranslationJob]:
+        now = datetime.utcnow()
+        due = (
+            select(TranslationJob.id)
+            .where(or_(
+                and_(TranslationJob.status == JobStatus.QUEUED, TranslationJob.run_after <= now),
+                and_(TranslationJob.status == JobStatus.RUNNING, TranslationJob.locked_until < now),
+            ))
+            .order_by(TranslationJob.run_after)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(TranslationJob)
+            .where(TranslationJob.id.in_(due))
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=TranslationJob.attempts + 1,
+                worker_id=worker_id,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                started_at=now,
+            )
+            .returning(TranslationJob)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_factory() as session:
+            jobs = list((await session.scalars(statement)).all())
+            await session.commit()
+        return jobs
+
+    async def extend(self, job: TranslationJob, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Push the lease out while the job is still being worked on
+        """
+        return await self._settle(
+            job, worker_id,
+            locked_until=datetime.utcnow() + timedelta(seconds=lease_seconds)
+        )
+
+    async def complete(
+        self,
+        job: TranslationJob,
+        worker_id: str,
+        tasks_data: List[Dict]
+    ) -> Optional[List[GeneratedTask]]:
+        """
+        Write the feedback, its tasks and the job's success in one transaction
+
+        Returns None (and writes nothing) if this worker no longer holds the job.
+        """
+        now = datetime.utcnow()
+        feedback_row = build_feedback_row(job.project_id, job.input_text, created_at=now)
+        task_rows = [build_task_row(feedback_row, task_data, now) for task_data in tasks_data]
+        async with self.session_factory() as session:
+            # feedback_id's foreign key is deferred, so the job row can point at
+            # the feedback row before it is inserted
+            result = await session.execute(
+                self._owned(job.id, worker_id).values(
+                    status=JobStatus.SUCCEEDED,
+                    feedback_id=feedback_row["id"],
+                    locked_until=None,
+                    finished_at=now,
+                    error=None,
+                )
+            )
+            if result.rowcount == 0:
+                await session.rollback()
+                return None
+            tasks = await save_feedback_with_tasks(session, [feedback_row], task_rows)
+        job.status = JobStatus.SUCCEEDED
+        job.feedback_id = feedback_row["id"]
+        job.finished_at = now
+        return tasks
+
+    async def retry(
+        self,
+        job: TranslationJob,
+        worker_id: str,
+        error: str,
+        delay_seconds: float
+    ) -> bool:
+        """
+        Put the job back in the queue after ``delay_seconds``
+        """
+        return await self._settle(
+            job, worker_id,
+            status=JobStatus.QUEUED,
+            run_after=datetime.utcnow() + timedelta(seconds=delay_seconds),
+            locked_until=None,
+            worker_id=None,
+            error=error,
+        )
+
+    async def fail(self, job: TranslationJob, worker_id: str, error: str) -> bool:
+        return await self._settle(
+            job, worker_id,
+            status=JobStatus.FAILED,
+            locked_until=None,
+            finished_at=datetime.utcnow(),
+            error=error,
+        )
+
+    async def mark_callback_sent(self, job_id: UUID) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(TranslationJob)
+                .where(TranslationJob.id == job_id)
+                .values(callback_sent_at=datetime.utcnow())
+            )
+            await session.commit()
+
+    @staticmethod
+    def _owned(job_id: UUID, worker_id: str):
+        return update(TranslationJob).where(
+            TranslationJob.id == job_id,
+            TranslationJob.worker_id == worker_id,
+            TranslationJob.status == JobStatus.RUNNING,
+        )
+
+    async def _settle(self, job: TranslationJob, owner: str, **values) -> bool:
+        # ``owner`` is the worker holding the lease; ``values`` may reset worker_id
+        async with self.session_factory() as session:
+            result = await session.execute(self._owned(job.id, owner).values(**values))
+            await session.commit()
+        if result.rowcount == 0:
+            return False
+        for name, value in values.items():
+            setattr(job, name, value)
+        return True
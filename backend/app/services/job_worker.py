@@ -0,0 +1,290 @@
+"""
+Worker pool for background translation jobs
+Runs inside the API process or on its own (python -m app.worker)
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import httpx
+
+from app.core.config import settings
+from app.database.session import AsyncSessionLocal
+from app.models.translation_job import JobStatus, TranslationJob
+from app.services.callback_url import Resolver, UnsafeCallbackURL, check_callback_url
+from app.services.job_store import PostgresJobStore, job_result
+from app.services.translator_service import TranslatorService
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Freedback-Signature"
+
+
+def sign_callback(secret: str, body: bytes) -> str:
+    """
+    HMAC-SHA256 of a callback body, as sent in the X-Freedback-Signature header
+    """
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class TranslationJobWorker:
+    """
+    Claims queued translation jobs and runs up to ``concurrency`` at a time
+
+    The loop claims as many jobs as it has free slots, then sleeps until a
+    slot frees up, ``notify`` is called (a job was enqueued in this
+    process) or ``poll_interval_seconds`` pass. A running job's lease is
+    renewed every third of ``lease_seconds``; if the process dies the
+    lease runs out and another worker picks the job up. A job that raises
+    is requeued with exponential backoff until ``max_attempts`` claims have
+    been used, then marked failed.
+
+    Jobs with a callback URL get their result POSTed there once settled
+    (signed with ``callback_secret`` when one is set). Delivery is retried
+    a few times but is best effort; polling always has the result. The
+    URL is vetted again before sending and the request goes to the vetted
+    address with redirects off, so a host that re-resolves to an internal
+    address after the job was accepted gets nothing.
+    """
+
+    def __init__(
+        self,
+        store: PostgresJobStore,
+        translate: Callable[[TranslationJob], Awaitable[List[Dict]]],
+        concurrency: int = 2,
+        poll_interval_seconds: float = 1.0,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 5.0,
+        callback_secret: str = "",
+        callback_timeout_seconds: float = 10.0,
+        callback_attempts: int = 3,
+        allow_local_callbacks: bool = False,
+        resolve: Optional[Resolver] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.store = store
+        self.translate = translate
+        self.concurrency = concurrency
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.callback_secret = callback_secret
+        self.callback_attempts = callback_attempts
+        self.allow_local_callbacks = allow_local_callbacks
+        self.resolve = resolve
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._http_client = httpx.AsyncClient(
+            timeout=callback_timeout_seconds,
+            transport=transport,
+            follow_redirects=False
+        )
+        self._wakeup = asyncio.Event()
+        self._active: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.lost_leases = 0
+        self.claim_errors = 0
+        self.callbacks_sent = 0
+        self.callback_errors = 0
+        self.callbacks_refused = 0
+
+    def start(self) -> None:
+        """
+        Start claiming jobs (call from the running event loop)
+        """
+        if self._task is None and self.concurrency > 0:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        """
+        A job was just enqueued; claim without waiting for the next poll
+        """
+        self._wakeup.set()
+
+    async def close(self, grace_seconds: float = 30.0) -> None:
+        """
+        Stop claiming and give running jobs ``grace_seconds`` to finish
+
+        Jobs still running after that are abandoned; their leases expire
+        and another worker takes them over.
+        """
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._active:
+            _, pending = await asyncio.wait(self._active, timeout=grace_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self._http_client.aclose()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            free = self.concurrency - len(self._active)
+            if free > 0:
+                try:
+                    jobs = await self.store.claim(self.worker_id, free, self.lease_seconds)
+                except Exception as e:
+                    self.claim_errors += 1
+                    logger.error(f"Failed to claim translation jobs: {e}")
+                    jobs = []
+                self.claimed += len(jobs)
+                for job in jobs:
+                    task = asyncio.create_task(self._process(job))
+                    self._active.add(task)
+                    task.add_done_callback(self._finished)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._active.discard(task)
+        self._wakeup.set()
+
+    async def _process(self, job: TranslationJob) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            tasks = None
+            try:
+                if job.attempts > self.max_attempts:
+                    # Its workers kept dying before settling it
+                    raise RuntimeError(f"Gave up after {job.attempts - 1} attempts")
+                tasks_data = await self.translate(job)
+                tasks = await self.store.complete(job, self.worker_id, tasks_data)
+                settled = tasks is not None
+                if settled:
+                    self.succeeded += 1
+            except Exception as e:
+                settled = await self._handle_failure(job, e)
+        finally:
+            heartbeat.cancel()
+
+        if not settled:
+            self.lost_leases += 1
+            logger.warning(f"Translation job {job.id} was taken over by another worker")
+        elif job.callback_url and job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+            await self._send_callback(job, job.callback_url, job_result(job, tasks or []))
+
+    async def _handle_failure(self, job: TranslationJob, error: Exception) -> bool:
+        message = f"{type(error).__name__}: {error}"
+        try:
+            if job.attempts >= self.max_attempts:
+                logger.error(f"Translation job {job.id} failed for good: {message}")
+                settled = await self.store.fail(job, self.worker_id, message)
+                if settled:
+                    self.failed += 1
+            else:
+                delay = self.retry_base_seconds * 2 ** (job.attempts - 1)
+                logger.warning(
+                    f"Translation job {job.id} failed, retrying in {delay:.0f}s: {message}"
+                )
+                settled = await self.store.retry(job, self.worker_id, message, delay)
+                if settled:
+                    self.retried += 1
+            return settled
+        except Exception as e:
+            # Leave it to the lease: the job is claimed again once it runs out
+            logger.error(f"Could not settle translation job {job.id}: {e}")
+            return True
+
+    async def _heartbeat(self, job: TranslationJob) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self.store.extend(job, self.worker_id, self.lease_seconds):
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to extend lease on translation job {job.id}: {e}")
+
+    async def _send_callback(self, job: TranslationJob, callback_url: str, payload: Dict) -> None:
+        try:
+            target = await check_callback_url(
+                callback_url, self.allow_local_callbacks, self.resolve
+            )
+        except UnsafeCallbackURL as e:
+            self.callbacks_refused += 1
+            logger.warning(f"Callback for translation job {job.id} refused: {e}")
+            return
+        # Connect to the vetted address; Host and SNI (so the certificate check) keep the name
+        url = httpx.URL(target.url)
+        body = json.dumps(payload, default=str).encode()
+        headers = {"Content-Type": "application/json", "Host": url.netloc.decode("ascii")}
+        if self.callback_secret:
+            headers[SIGNATURE_HEADER] = sign_callback(self.callback_secret, body)
+        for attempt in range(self.callback_attempts):
+            try:
+                response = await self._http_client.post(
+                    url.copy_with(host=target.address),
+                    content=body,
+                    headers=headers,
+                    extensions={"sni_hostname": target.hostname}
+                )
+                if response.status_code < 300:
+                    self.callbacks_sent += 1
+                    await self.store.mark_callback_sent(job.id)
+                    return
+                # Redirects are not followed (they could point anywhere)
+                if response.status_code < 500 and response.status_code != 429:
+                    break
+            except Exception as e:
+                logger.warning(f"Callback for translation job {job.id} failed: {e}")
+            if attempt + 1 < self.callback_attempts:
+                await asyncio.sleep(2 ** attempt)
+        self.callback_errors += 1
+
+    def stats(self) -> Dict:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": len(self._active),
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "lost_leases": self.lost_leases,
+            "claim_errors": self.claim_errors,
+            "callbacks_sent": self.callbacks_sent,
+            "callback_errors": self.callback_errors,
+            "callbacks_refused": self.callbacks_refused,
+        }
+
+
+async def translate_job(job: TranslationJob) -> List[Dict]:
+    # Model failures raise so the job is retried instead of settling on placeholder tasks
+    translator = TranslatorService(user_id=job.user_id, endpoint="/feedback/translate/job")
+    return await translator.translate_feedback(
+        job.input_text,
+        use_cache=not job.bypass_cache,
+        raise_on_error=True
+    )
+
+
+# Started by the API lifespan (TRANSLATION_JOBS_IN_API) and by python -m app.worker
+translation_worker = TranslationJobWorker(
+    PostgresJobStore(AsyncSessionLocal),
+    translate_job,
+    concurrency=settings.TRANSLATION_JOB_CONCURRENCY,
+    poll_interval_seconds=settings.TRANSLATION_JOB_POLL_SECONDS,
+    lease_seconds=settings.TRANSLATION_JOB_LEASE_SECONDS,
+    max_attempts=settings.TRANSLATION_JOB_MAX_ATTEMPTS,
+    callback_secret=settings.TRANSLATION_JOB_CALLBACK_SECRET,
+    callback_timeout_seconds=settings.TRANSLATION_JOB_CALLBACK_TIMEOUT_SECONDS,
+    allow_local_callbacks=settings.TRANSLATION_JOB_ALLOW_PRIVATE_CALLBACKS,
+)
@@ -0,0 +1,163 @@
+"""
+Local JWT verification against a cached JWKS
+Replaces a round trip to Clerk on every authenticated request
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import jwt
+
+from app.core.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVerificationError(Exception):
+    """
+    Raised when a token cannot be verified
+    """
+
+
+class JWKSCache:
+    """
+    Signing keys fetched once and cached with a TTL
+
+    Once the TTL passes, keys are refreshed in the background while the
+    current set keeps serving requests. An unknown ``kid`` (key rotation)
+    triggers an immediate refresh, at most once per ``min_refresh_interval``
+    so random kids cannot hammer the JWKS endpoint. If a refresh fails the
+    previous keys stay in use.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        ttl_seconds: float = 3600,
+        min_refresh_interval: float = 30,
+        timeout_seconds: float = 5,
+    ):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self._http_client = httpx.AsyncClient(headers=headers, timeout=timeout_seconds)
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._attempted_at = 0.0
+        self._lock = asyncio.Lock()
+        self._background_refresh: Optional[asyncio.Task] = None
+        self.refreshes = 0
+
+    async def refresh(self) -> None:
+        """
+        Fetch the key set (concurrent callers share one request)
+        """
+        attempted_at = self._attempted_at
+        async with self._lock:
+            if self._attempted_at != attempted_at:
+                # Another caller refreshed while we waited for the lock
+                return
+            self._attempted_at = time.monotonic()
+            try:
+                response = await self._http_client.get(self.url)
+                response.raise_for_status()
+                key_set = jwt.PyJWKSet.from_dict(response.json())
+            except (httpx.HTTPError, jwt.PyJWTError, ValueError) as e:
+                logger.error(f"Error fetching JWKS: {e}")
+                return
+
+            self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+            self._fetched_at = time.monotonic()
+            self.refreshes += 1
+
+    async def get_signing_key(self, kid: Optional[str]) -> jwt.PyJWK:
+        """
+        Signing key for a token's ``kid`` header
+        """
+        now = time.monotonic()
+        if not self._keys:
+            await self.refresh()
+        elif now - self._fetched_at > self.ttl_seconds:
+            self._schedule_background_refresh()
+
+        key = self._keys.get(kid) if kid else None
+        if key is None and time.monotonic() - self._attempted_at >= self.min_refresh_interval:
+            # Possibly a rotated key we have not seen yet
+            await self.refresh()
+            key = self._keys.get(kid) if kid else None
+
+        if key is None:
+            raise TokenVerificationError(f"Unknown signing key: {kid}")
+        return key
+
+    def _schedule_background_refresh(self) -> None:
+        if self._background_refresh is None or self._background_refresh.done():
+            self._background_refresh = asyncio.create_task(self.refresh())
+
+    async def aclose(self) -> None:
+        if self._background_refresh is not None:
+            self._background_refresh.cancel()
+        await self._http_client.aclose()
+
+
+class ClerkTokenVerifier:
+    """
+    Verifies session tokens locally and remembers verified claims until ``exp``
+    """
+
+    def __init__(
+        self,
+        jwks: JWKSCache,
+        issuer: Optional[str] = None,
+        authorized_parties: Optional[List[str]] = None,
+        leeway_seconds: float = 5,
+        cache_size: int = 10000,
+        algorithms: Optional[List[str]] = None,
+    ):
+        self.jwks = jwks
+        self.algorithms = algorithms or ["RS256"]
+        self.issuer = issuer or None
+        self.authorized_parties = authorized_parties or []
+        self.leeway_seconds = leeway_seconds
+        self.verified = TTLCache(max_entries=cache_size)
+
+    async def verify(self, token: str) -> Dict:
+        """
+        Verify a token's signature and claims
+
+        Returns:
+            The token claims
+
+        Raises:
+            TokenVerificationError: If the token is invalid or expired
+        """
+        cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        claims = self.verified.get(cache_key)
+        if claims is not None:
+            return claims
+
+        try:
+            header = jwt.get_unverified_header(token)
+            signing_key = await self.jwks.get_signing_key(header.get("kid"))
+            claims = jwt.decode(
+                token,
+                signing_key.key,
+                algorithms=self.algorithms,
+                issuer=self.issuer,
+                leeway=self.leeway_seconds,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e)) from e
+
+        if self.authorized_parties and claims.get("azp") not in self.authorized_parties:
+            raise TokenVerificationError("Unauthorized party")
+
+        ttl = claims["exp"] - time.time()
+        if ttl > 0:
+            self.verified.set(cache_key, claims, ttl_seconds=ttl)
+        return claims
@@ -0,0 +1,140 @@
+"""
+Async OpenAI client shared by the translator services
+Keeps one pooled set of HTTP connections per process and caps in-flight completions
+"""
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, cast
+
+import httpx
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
+
+
+class LLMClient:
+    """
+    Non-blocking chat completion client
+
+    Every call goes through the same ``httpx.AsyncClient`` so translations
+    reuse warm TLS connections, and a semaphore bounds how many completions
+    are in flight at once.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: Optional[str] = None,
+        timeout_seconds: float = 30.0,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_seconds, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+        # Retries are left to the caller so a timeout means one request, not three
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or None,
+            http_client=self._http_client,
+            max_retries=0,
+        )
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> ChatCompletion:
+        """
+        Request a chat completion without blocking the event loop
+
+        Args:
+            messages: Chat messages to send
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            response_format: Optional OpenAI response format
+            timeout: Per-request timeout in seconds, defaults to the client timeout
+
+        Returns:
+            The parsed OpenAI completion
+        """
+        extra: Dict[str, Any] = {}
+        if response_format:
+            extra["response_format"] = response_format
+
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                return await self._client.chat.completions.create(
+                    model=model,
+                    messages=cast(List[ChatCompletionMessageParam], messages),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout or self.timeout_seconds,
+                    **extra,
+                )
+            finally:
+                self.in_flight -= 1
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        response_format: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        on_usage: Optional[Callable[[Any], None]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive
+
+        The concurrency slot is held until the stream is exhausted or closed.
+        If ``on_usage`` is given, the final usage chunk is requested and
+        passed to it.
+        """
+        extra: Dict[str, Any] = {}
+        if response_format:
+            extra["response_format"] = response_format
+        if on_usage:
+            extra["extra_body"] = {"stream_options": {"include_usage": True}}
+
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                stream = await self._client.chat.completions.create(
+                    model=model,
+                    messages=cast(List[ChatCompletionMessageParam], messages),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout or self.timeout_seconds,
+                    stream=True,
+                    **extra,
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    usage = getattr(chunk, "usage", None)
+                    if usage and on_usage:
+                        on_usage(usage)
+            finally:
+                self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        """
+        Close the shared connection pool
+        """
+        await self._http_client.aclose()
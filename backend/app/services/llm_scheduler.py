@@ -0,0 +1,230 @@
+"""
+Fair-share scheduler in front of the model client
+Interactive translations are not stuck behind one user's bulk job
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Hashable, List, NamedTuple, Optional, Sequence
+
+from app.core.rate_limit import TokenBucketLimiter
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+
+class ModelBudget(NamedTuple):
+    model: str
+    tokens_per_minute: float
+
+
+class Grant:
+    """
+    Permission to make one model call, on ``model``
+
+    Set ``tokens_used`` once the real usage is known so the unused part of
+    the estimate goes back to the model's budget.
+    """
+
+    def __init__(self, model: str, tokens: float, waited: float):
+        self.model = model
+        self.tokens = tokens
+        self.waited = waited
+        self.tokens_used: Optional[int] = None
+
+
+class _Request:
+    __slots__ = ("user", "lane", "tokens", "future", "enqueued_at")
+
+    def __init__(self, user: Hashable, lane: str, tokens: float, future: asyncio.Future):
+        self.user = user
+        self.lane = lane
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class LLMScheduler:
+    """
+    Admits model calls under a global concurrency cap and per-model
+    tokens-per-minute budgets
+
+    Waiting calls sit in per-user queues inside two lanes. Lanes are served
+    by weighted round robin (``lane_weights``, interactive 4 : batch 1 by
+    default) so batches always progress, and within a lane users take turns
+    regardless of how many calls each has queued. Each call goes to the
+    first model in ``budgets`` with room for its estimate, so the fallback
+    model takes over as soon as the primary's budget runs out instead of
+    after a rate limit error.
+    """
+
+    def __init__(
+        self,
+        budgets: Sequence[ModelBudget],
+        max_concurrency: int = 16,
+        lane_weights: Optional[Dict[str, int]] = None,
+        wait_samples: int = 1000,
+    ):
+        self.budgets = list(budgets)
+        self.max_concurrency = max_concurrency
+        weights = lane_weights or {INTERACTIVE: 4, BATCH: 1}
+        self._turns: List[str] = [lane for lane, weight in weights.items() for _ in range(weight)]
+        self._turn = 0
+        self._lanes: Dict[str, "OrderedDict[Hashable, Deque[_Request]]"] = {
+            lane: OrderedDict() for lane in weights
+        }
+        self._tokens = TokenBucketLimiter(max_keys=len(self.budgets))
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._waits: Dict[str, Deque[float]] = {
+            lane: deque(maxlen=wait_samples) for lane in weights
+        }
+        self.in_flight = 0
+        self.dispatched: Dict[str, int] = {budget.model: 0 for budget in self.budgets}
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        user: Hashable,
+        tokens: float,
+        lane: str = INTERACTIVE
+    ) -> AsyncIterator[Grant]:
+        """
+        Wait for a turn, then hold a concurrency slot for the block
+        """
+        grant = await self.acquire(user, tokens, lane)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    async def acquire(self, user: Hashable, tokens: float, lane: str = INTERACTIVE) -> Grant:
+        """
+        Queue a call and wait until it is admitted; pair with ``release``
+        """
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown lane: {lane}")
+        request = _Request(user, lane, tokens, asyncio.get_running_loop().create_future())
+        self._lanes[lane].setdefault(user, deque()).append(request)
+        self._dispatch()
+        try:
+            return await request.future
+        except asyncio.CancelledError:
+            if request.future.done() and not request.future.cancelled():
+                # Admitted just as the caller gave up
+                self.release(request.future.result())
+            else:
+                self._remove(request)
+            raise
+
+    def release(self, grant: Grant) -> None:
+        """
+        Free the slot and refund whatever the estimate over-charged
+        """
+        self.in_flight -= 1
+        if grant.tokens_used is not None and grant.tokens_used < grant.tokens:
+            self._tokens.credit(
+                grant.model,
+                grant.tokens - grant.tokens_used,
+                self._budget(grant.model).tokens_per_minute
+            )
+        self._dispatch()
+
+    def _budget(self, model: str) -> ModelBudget:
+        return next(budget for budget in self.budgets if budget.model == model)
+
+    def _next_lane(self) -> Optional[str]:
+        for offset in range(len(self._turns)):
+            lane = self._turns[(self._turn + offset) % len(self._turns)]
+            if self._lanes[lane]:
+                self._turn = (self._turn + offset + 1) % len(self._turns)
+                return lane
+        return None
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.max_concurrency:
+            lane = self._next_lane()
+            if lane is None:
+                return
+            users = self._lanes[lane]
+            user, queue = next(iter(users.items()))
+            request = queue[0]
+            if request.future.done():
+                # Cancelled caller that has not removed itself yet
+                self._remove(request)
+                continue
+
+            model, retry_after = self._take_tokens(request.tokens)
+            if model is None:
+                # Give the lane its turn back and retry once tokens have refilled
+                self._turn = (self._turn - 1) % len(self._turns)
+                self._schedule_wakeup(retry_after)
+                return
+
+            queue.popleft()
+            if queue:
+                users.move_to_end(user)
+            else:
+                del users[user]
+
+            waited = time.monotonic() - request.enqueued_at
+            self._waits[lane].append(waited)
+            self.in_flight += 1
+            self.dispatched[model] += 1
+            request.future.set_result(Grant(model, request.tokens, waited))
+
+    def _take_tokens(self, tokens: float):
+        retry_after: Optional[float] = None
+        for budget in self.budgets:
+            wait = self._tokens.acquire(
+                budget.model,
+                budget.tokens_per_minute / 60,
+                budget.tokens_per_minute,
+                tokens
+            )
+            if not wait:
+                return budget.model, 0.0
+            retry_after = wait if retry_after is None else min(retry_after, wait)
+        return None, retry_after
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            return
+
+        def wake() -> None:
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = asyncio.get_running_loop().call_later(delay, wake)
+
+    def _remove(self, request: _Request) -> None:
+        users = self._lanes[request.lane]
+        queue = users.get(request.user)
+        if queue is None:
+            return
+        try:
+            queue.remove(request)
+        except ValueError:
+            return
+        if not queue:
+            del users[request.user]
+
+    def stats(self) -> Dict:
+        """
+        Queue depth, wait times and routing counters for monitoring
+        """
+        lanes = {}
+        for lane, users in self._lanes.items():
+            waits = sorted(self._waits[lane])
+            lanes[lane] = {
+                "queued": sum(len(queue) for queue in users.values()),
+                "users_waiting": len(users),
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+            }
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "lanes": lanes,
+            "dispatched": dict(self.dispatched),
+        }
@@ -0,0 +1,138 @@
+"""
+Denormalized per-project counters
+Kept current in the same transaction as the writes that change them
+"""
+import argparse
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.feedback import FeedbackInput, GeneratedTask
+from app.models.project import Project
+
+logger = logging.getLogger(__name__)
+
+_projects = Project.__table__
+
+_record_feedback = (
+    update(_projects)
+    .where(_projects.c.id == bindparam("project_id"))
+    .values(
+        feedback_count=_projects.c.feedback_count + bindparam("feedback_delta"),
+        task_count=_projects.c.task_count + bindparam("task_delta"),
+        # GREATEST ignores NULL, so the first feedback sets it
+        last_feedback_at=func.greatest(_projects.c.last_feedback_at, bindparam("last_feedback_at")),
+    )
+)
+
+_record_completions = (
+    update(_projects)
+    .where(_projects.c.id == bindparam("project_id"))
+    # Never below zero, even if the counter had drifted low before tasks were reopened
+    .values(completed_task_count=func.greatest(
+        _projects.c.completed_task_count + bindparam("completed_delta"), 0
+    ))
+)
+
+
+async def record_feedback(
+    db: AsyncSession,
+    feedback_rows: Sequence[Dict],
+    task_rows: Sequence[Dict]
+) -> None:
+    """
+    Add newly inserted inputs and tasks to their projects' counters
+
+    Every task row must belong to one of ``feedback_rows``. Does not commit.
+    """
+    project_of_input = {row["id"]: row["project_id"] for row in feedback_rows}
+    params: Dict[UUID, Dict] = {}
+    for row in feedback_rows:
+        entry = params.setdefault(row["project_id"], {
+            "project_id": row["project_id"],
+            "feedback_delta": 0,
+            "task_delta": 0,
+            "last_feedback_at": row["created_at"],
+        })
+        entry["feedback_delta"] += 1
+        entry["last_feedback_at"] = max(entry["last_feedback_at"], row["created_at"])
+    for row in task_rows:
+        params[project_of_input[row["input_id"]]]["task_delta"] += 1
+
+    if params:
+        await db.execute(_record_feedback, list(params.values()))
+
+
+async def record_completions(db: AsyncSession, deltas: Dict[UUID, int]) -> None:
+    """
+    Apply completed-task deltas per project (negative when tasks are reopened)
+
+    Does not commit.
+    """
+    params = [
+        {"project_id": project_id, "completed_delta": delta}
+        for project_id, delta in deltas.items()
+        if delta
+    ]
+    if params:
+        await db.execute(_record_completions, params)
+
+
+async def reconcile_project_counters(
+    db: AsyncSession,
+    project_ids: Optional[Iterable[UUID]] = None
+) -> int:
+    """
+    Recompute counters from feedback_inputs and generated_tasks
+
+    Repairs drift from writes that bypassed the helpers above (manual SQL,
+    cascading deletes). Commits.
+
+    Returns:
+        Number of projects updated
+    """
+    tasks = GeneratedTask.__table__
+    inputs = FeedbackInput.__table__
+    project_inputs = inputs.c.project_id == _projects.c.id
+
+    statement = update(_projects).values(
+        feedback_count=select(func.count()).where(project_inputs).scalar_subquery(),
+        task_count=select(func.count())
+        .select_from(tasks.join(inputs, tasks.c.input_id == inputs.c.id))
+        .where(project_inputs)
+        .scalar_subquery(),
+        completed_task_count=select(func.count())
+        .select_from(tasks.join(inputs, tasks.c.input_id == inputs.c.id))
+        .where(project_inputs, tasks.c.is_completed.is_(True))
+        .scalar_subquery(),
+        last_feedback_at=select(func.max(inputs.c.created_at))
+        .where(project_inputs)
+        .scalar_subquery(),
+    )
+    if project_ids is not None:
+        statement = statement.where(_projects.c.id.in_(list(project_ids)))
+
+    result = await db.execute(statement)
+    await db.commit()
+    return result.rowcount
+
+
+async def _main(project_ids: Optional[Sequence[UUID]]) -> None:
+    from app.database.session import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as db:
+        updated = await reconcile_project_counters(db, project_ids)
+    logger.info(f"Reconciled counters for {updated} projects")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Rebuild per-project feedback and task counters")
+    parser.add_argument("--project-id", type=UUID, action="append", dest="project_ids")
+    args = parser.parse_args()
+    asyncio.run(_main(args.project_ids))
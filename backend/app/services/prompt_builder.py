@@ -0,0 +1,178 @@
+"""
+Prompt assembly and local token budgeting for translation calls
+The system prefix is sent byte-identical every time and max_tokens is sized to the input
+"""
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to the ~4 characters per token estimate
+    tiktoken = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+# Chat format overhead per message and for the reply primer (OpenAI cookbook)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The BPE file is downloaded on first use; offline hosts estimate instead
+        logger.warning(f"Tokenizer unavailable for {model}, estimating: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Tokens in ``text`` for ``model``, exact when tiktoken is installed
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str) -> int:
+    return sum(
+        TOKENS_PER_MESSAGE + count_tokens(message["content"], model)
+        for message in messages
+    )
+
+
+class Prompt(NamedTuple):
+    messages: List[Dict[str, str]]
+    prompt_tokens: int
+    max_tokens: int
+    items: int = 1
+
+    @property
+    def reserved_tokens(self) -> int:
+        """
+        Most tokens the call can use, for the scheduler's budget
+        """
+        return self.prompt_tokens + self.max_tokens
+
+
+class PromptBuilder:
+    """
+    Builds translation prompts from a fixed system prompt and the user's feedback
+
+    The system message is the same string on every call, so upstream prompt
+    caching can reuse it, and its token count is computed once. ``max_tokens``
+    allows ``tokens_per_task`` for each task we expect back: ``min_tasks``
+    for short feedback, one more per ``input_tokens_per_task`` of feedback,
+    up to ``max_tasks``. A prompt packing several feedback items budgets
+    for each of them.
+
+    ``record`` takes each completion's usage so the estimates can be checked
+    against what the model actually used.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        model: str,
+        tokens_per_task: int = 100,
+        min_tasks: int = 3,
+        max_tasks: int = 5,
+        input_tokens_per_task: int = 25,
+        overhead_tokens: int = 30,
+    ):
+        self.system_prompt = system_prompt
+        self.model = model
+        self.tokens_per_task = tokens_per_task
+        self.min_tasks = min_tasks
+        self.max_tasks = max_tasks
+        self.input_tokens_per_task = input_tokens_per_task
+        self.overhead_tokens = overhead_tokens
+        self.prefix_tokens = count_message_tokens(
+            [{"role": "system", "content": system_prompt}],
+            model
+        ) + TOKENS_PER_REPLY
+        self.calls = 0
+        self.items = 0
+        self.estimated_prompt_tokens = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.max_tokens_total = 0
+        self.hit_limit = 0
+
+    def build(self, feedback_text: str, items: int = 1) -> Prompt:
+        input_tokens = TOKENS_PER_MESSAGE + count_tokens(feedback_text, self.model)
+        return Prompt(
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": feedback_text}
+            ],
+            prompt_tokens=self.prefix_tokens + input_tokens,
+            max_tokens=self.max_tokens_for(input_tokens, items),
+            items=items
+        )
+
+    def expected_tasks(self, input_tokens: int, items: int = 1) -> int:
+        return min(
+            self.max_tasks * items,
+            self.min_tasks * items + input_tokens // self.input_tokens_per_task
+        )
+
+    def max_tokens_for(self, input_tokens: int, items: int = 1) -> int:
+        expected = self.expected_tasks(input_tokens, items)
+        return self.overhead_tokens + self.tokens_per_task * expected
+
+    def record(self, prompt: Prompt, usage: Any) -> None:
+        """
+        Account one completion's usage (an OpenAI usage object or streamed dict)
+        """
+        if usage is None:
+            return
+        if isinstance(usage, dict):
+            details = usage.get("prompt_tokens_details") or {}
+            cached = details.get("cached_tokens") if isinstance(details, dict) else None
+            prompt_tokens = usage.get("prompt_tokens") or 0
+            completion_tokens = usage.get("completion_tokens") or 0
+        else:
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+        self.calls += 1
+        self.items += prompt.items
+        self.estimated_prompt_tokens += prompt.prompt_tokens
+        self.prompt_tokens += prompt_tokens
+        self.cached_prompt_tokens += cached or 0
+        self.completion_tokens += completion_tokens
+        self.max_tokens_total += prompt.max_tokens
+        if completion_tokens >= prompt.max_tokens:
+            self.hit_limit += 1
+
+    def stats(self) -> Dict:
+        """
+        Token accounting for monitoring
+        """
+        calls = self.calls or 1
+        return {
+            "tokenizer": "tiktoken" if _encoding(self.model) is not None else "estimate",
+            "prefix_tokens": self.prefix_tokens,
+            "calls": self.calls,
+            "items_per_call": round(self.items / calls, 2),
+            "prompt_tokens_avg": round(self.prompt_tokens / calls, 1),
+            "prompt_tokens_estimated_avg": round(self.estimated_prompt_tokens / calls, 1),
+            "cached_prompt_ratio": round(self.cached_prompt_tokens / (self.prompt_tokens or 1), 4),
+            "completion_tokens_avg": round(self.completion_tokens / calls, 1),
+            "max_tokens_avg": round(self.max_tokens_total / calls, 1),
+            "hit_limit": self.hit_limit,
+        }
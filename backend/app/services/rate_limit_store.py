@@ -0,0 +1,76 @@
+"""
+Postgres-backed shared tier for the rate limiter
+"""
+from sqlalchemy import Float, bindparam, case, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.rate_limit import RateLimitBucket
+
+_buckets = RateLimitBucket.__table__
+
+_rate = bindparam("rate", type_=Float)
+_burst = bindparam("burst", type_=Float)
+_cost = bindparam("cost", type_=Float)
+_need = bindparam("need", type_=Float)
+
+_now = func.clock_timestamp()
+_refilled = func.least(
+    _burst,
+    _buckets.c.tokens + func.extract("epoch", _now - _buckets.c.updated_at) * _rate
+)
+
+_insert = insert(_buckets).values(
+    key=bindparam("key"),
+    tokens=_burst - _cost,
+    updated_at=_now,
+    allowed=True,
+)
+_acquire = _insert.on_conflict_do_update(
+    index_elements=[_buckets.c.key],
+    set_={
+        "tokens": case(
+            (_refilled >= _need, _refilled - _cost),
+            else_=_refilled
+        ),
+        "updated_at": _now,
+        "allowed": _refilled >= _need,
+    }
+).returning(_buckets.c.tokens, _buckets.c.allowed)
+
+
+class PostgresRateLimitStore:
+    """
+    Shares token buckets between API workers through ``rate_limit_buckets``
+
+    Refill and take happen in one upsert on the row, so concurrent workers
+    serialize on the row lock and the database clock is the only clock.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def acquire(
+        self,
+        key: str,
+        rate: float,
+        burst: float,
+        cost: float = 1.0,
+        allow_debt: bool = False,
+    ) -> float:
+        """
+        Same contract as ``TokenBucketLimiter.acquire``
+        """
+        need = min(cost, burst)
+        if not allow_debt:
+            cost = need
+        async with self.session_factory() as session:
+            result = await session.execute(
+                _acquire,
+                {"key": key, "rate": rate, "burst": burst, "cost": cost, "need": need}
+            )
+            tokens, allowed = result.one()
+            await session.commit()
+        if allowed:
+            return 0.0
+        return (need - tokens) / rate
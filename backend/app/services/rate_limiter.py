@@ -0,0 +1,137 @@
+"""
+Per-user, per-plan rate limiting for the translate endpoints
+One user can no longer spend the whole OpenAI rate limit for everyone
+"""
+import logging
+import math
+from typing import Any, Dict, NamedTuple, Optional, Protocol
+
+from fastapi import Depends, HTTPException, status
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucketLimiter
+from app.database.session import AsyncSessionLocal
+from app.models.user import SubscriptionPlan, User
+from app.services.auth_service import get_current_user
+from app.services.rate_limit_store import PostgresRateLimitStore
+
+logger = logging.getLogger(__name__)
+
+
+class PlanLimit(NamedTuple):
+    per_minute: float
+    burst: float
+
+
+class SharedRateLimitBackend(Protocol):
+    """
+    Optional token buckets shared between workers (e.g. Postgres)
+    """
+
+    async def acquire(
+        self,
+        key: str,
+        rate: float,
+        burst: float,
+        cost: float = 1.0,
+        allow_debt: bool = False,
+    ) -> float:
+        ...
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by plan and user
+
+    Buckets live in process unless a shared backend is configured. A failing
+    shared backend is logged and the in-process buckets take over, so the
+    limiter can never fail a request on its own.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[Optional[SubscriptionPlan], PlanLimit],
+        max_keys: int = 100000,
+        shared: Optional[SharedRateLimitBackend] = None,
+    ):
+        self.limits = limits
+        self.local = TokenBucketLimiter(max_keys=max_keys)
+        self.shared = shared
+        self.shared_errors = 0
+
+    def limit_for(self, plan: Optional[SubscriptionPlan]) -> PlanLimit:
+        return self.limits.get(plan, self.limits[None])
+
+    async def acquire(self, user: User, cost: float = 1.0, allow_debt: bool = False) -> float:
+        """
+        Charge ``cost`` requests to the user's bucket
+
+        ``allow_debt`` charges the full cost even above the plan's burst
+        (see ``TokenBucketLimiter.acquire``).
+
+        Returns:
+            0.0 when allowed, otherwise seconds until it would be
+        """
+        limit = self.limit_for(user.subscription_plan)
+        key = f"{getattr(user.subscription_plan, 'value', 'none')}:{user.id}"
+        rate = limit.per_minute / 60
+
+        if self.shared is not None:
+            try:
+                return await self.shared.acquire(key, rate, limit.burst, cost, allow_debt)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared rate limiter failed, using local buckets: {e}")
+
+        return self.local.acquire(key, rate, limit.burst, cost, allow_debt)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters for monitoring
+        """
+        return {
+            **self.local.stats(),
+            "shared_errors": self.shared_errors,
+            "shared_enabled": self.shared is not None,
+        }
+
+
+# Users without a plan get the monthly limits
+rate_limiter = RateLimiter(
+    limits={
+        None: PlanLimit(settings.RATE_LIMIT_MONTHLY_PER_MINUTE, settings.RATE_LIMIT_MONTHLY_BURST),
+        SubscriptionPlan.MONTHLY: PlanLimit(
+            settings.RATE_LIMIT_MONTHLY_PER_MINUTE, settings.RATE_LIMIT_MONTHLY_BURST
+        ),
+        SubscriptionPlan.PER_PROJECT: PlanLimit(
+            settings.RATE_LIMIT_PER_PROJECT_PER_MINUTE, settings.RATE_LIMIT_PER_PROJECT_BURST
+        ),
+        SubscriptionPlan.ENTERPRISE: PlanLimit(
+            settings.RATE_LIMIT_ENTERPRISE_PER_MINUTE, settings.RATE_LIMIT_ENTERPRISE_BURST
+        ),
+    },
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    shared=PostgresRateLimitStore(AsyncSessionLocal) if settings.RATE_LIMIT_SHARED else None,
+)
+
+
+async def check_rate_limit(user: User, cost: float = 1.0, allow_debt: bool = False) -> None:
+    """
+    Raise 429 with Retry-After when the user's bucket is empty
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    retry_after = await rate_limiter.acquire(user, cost, allow_debt)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
+async def translate_rate_limit(current_user: User = Depends(get_current_user)) -> None:
+    """
+    Dependency charging one request to the caller's bucket
+    """
+    await check_rate_limit(current_user)
@@ -0,0 +1,258 @@
+"""
+Deadlines, retries, hedging and a circuit breaker for upstream calls
+A slow or failing model region degrades to fallback tasks instead of tail latency
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream that is known to be failing
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calls after ``failure_threshold`` consecutive failures
+
+    After ``reset_seconds`` one probe call is let through (half-open); its
+    success closes the circuit, its failure opens it for another period.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probing = False
+
+    @property
+    def rejecting(self) -> bool:
+        """
+        True while calls would be refused (does not claim the probe)
+        """
+        if self.state == OPEN:
+            return self.clock() - self.opened_at < self.reset_seconds
+        return self.state == HALF_OPEN and self._probing
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go ahead now; claims the probe when half-open
+        """
+        if self.state == OPEN and self.clock() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def abandon(self) -> None:
+        """
+        Give back a claimed probe whose call was cancelled before it finished
+        """
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit opened after {self.failures} failures")
+            self.state = OPEN
+            self.opened_at = self.clock()
+            self._probing = False
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """
+    Recent successful call latencies, for picking the hedge delay
+    """
+
+    def __init__(self, samples: int = 500):
+        self._samples: Deque[float] = deque(maxlen=samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float, min_samples: int = 1) -> Optional[float]:
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class ResilientCall:
+    """
+    Runs an upstream call under a deadline, with retries and optional hedging
+
+    ``make_call`` receives the seconds left before the deadline and should
+    use them as its own timeout. Exceptions in ``retryable`` (plus timeouts)
+    are retried after a full-jitter exponential backoff while the deadline
+    allows, and a call that still fails counts against the circuit breaker.
+    Other exceptions pass straight through; they prove the upstream is
+    answering, so they do not trip the breaker.
+
+    With ``hedge_percentile`` set, an attempt still running after that
+    percentile of recent latencies gets a second identical request; the
+    first to succeed wins and the other is cancelled.
+    """
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        retryable: Tuple[Type[BaseException], ...] = (),
+        attempts: int = 3,
+        base_delay_seconds: float = 0.5,
+        max_delay_seconds: float = 8.0,
+        deadline_seconds: float = 45.0,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 50,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.breaker = breaker or CircuitBreaker()
+        self.retryable: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError, *retryable)
+        self.attempts = attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.deadline_seconds = deadline_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.rng = rng
+        self.latencies = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadlines_exceeded = 0
+
+    async def __call__(self, make_call: Callable[[float], Awaitable[T]]) -> T:
+        if not self.breaker.allow():
+            raise CircuitOpenError("Upstream circuit is open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+        error: BaseException = asyncio.TimeoutError("Deadline exceeded")
+        for attempt in range(self.attempts):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                result = await self._attempt(make_call, remaining)
+            except self.retryable as e:
+                error = e
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except Exception:
+                self.breaker.record_success()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+            if attempt + 1 == self.attempts:
+                break
+            delay = self.rng() * min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt)
+            if loop.time() + delay >= deadline:
+                break
+            self.retries += 1
+            logger.warning(f"Upstream call failed ({error!r}), retrying in {delay:.2f}s")
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+
+        if isinstance(error, asyncio.TimeoutError):
+            self.deadlines_exceeded += 1
+        self.breaker.record_failure()
+        raise error
+
+    async def _attempt(self, make_call: Callable[[float], Awaitable[T]], remaining: float) -> T:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        hedge_after = None
+        if self.hedge_percentile is not None:
+            hedge_after = self.latencies.percentile(self.hedge_percentile, self.hedge_min_samples)
+
+        pending: Set[asyncio.Future] = {asyncio.ensure_future(make_call(remaining))}
+        hedge: Optional[asyncio.Future] = None
+        try:
+            if hedge_after is not None and hedge_after < remaining:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done:
+                    self.hedges += 1
+                    hedge = asyncio.ensure_future(make_call(remaining - hedge_after))
+                    pending.add(hedge)
+
+            # Replaced by the failure of whichever call finishes last
+            error: BaseException = asyncio.TimeoutError("Deadline exceeded")
+            while pending:
+                timeout = started + remaining - loop.time()
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(timeout, 0),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError("Deadline exceeded")
+                for task in done:
+                    exception = task.exception()
+                    if exception is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        self.latencies.add(loop.time() - started)
+                        return task.result()
+                    error = exception
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            **self.breaker.stats(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "latency_p95_ms": round((self.latencies.percentile(0.95) or 0.0) * 1000, 1),
+        }
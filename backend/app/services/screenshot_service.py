@@ -0,0 +1,192 @@
+"""
+Screenshot feedback ingestion
+Uploads are streamed to disk, preprocessed in a process pool and
+deduplicated by perceptual hash against the project's earlier screenshots
+"""
+import hashlib
+import os
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.feedback import FeedbackInput, GeneratedTask, SourceType
+from app.services.image_processing import (
+    ScreenshotError,
+    ScreenshotProcessor,
+    hamming_distance,
+    sniff_image_type,
+)
+from app.services.translation_cache import normalize_feedback
+
+# Enough bytes to recognise every supported format
+SNIFF_BYTES = 16
+
+
+class UploadTooLarge(ScreenshotError):
+    pass
+
+
+class StagedUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    content_type: str
+
+
+async def stage_upload(
+    chunks: AsyncIterator[bytes],
+    directory: str,
+    max_bytes: int
+) -> StagedUpload:
+    """
+    Write an upload to a temporary file in ``directory`` as it arrives
+
+    Only one chunk is held in memory at a time. The upload is rejected as
+    soon as its first bytes are not a supported image or it grows past
+    ``max_bytes``; the partial file is removed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid4().hex}.upload")
+    digest = hashlib.sha256()
+    head = b""
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(
+                        f"Screenshots are limited to {max_bytes // (1024 * 1024)} MB"
+                    )
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                    if len(head) == SNIFF_BYTES and sniff_image_type(head) is None:
+                        raise ScreenshotError("Upload is not a PNG, JPEG, GIF or WebP image")
+                digest.update(chunk)
+                # Chunks are at most a few dozen KB; writing them to the page
+                # cache is cheaper than a thread hop
+                f.write(chunk)
+        content_type = sniff_image_type(head)
+        if content_type is None:
+            raise ScreenshotError("Upload is not a PNG, JPEG, GIF or WebP image")
+    except BaseException:
+        _remove(path)
+        raise
+    return StagedUpload(path, size, digest.hexdigest(), content_type)
+
+
+async def store_screenshot(staged: StagedUpload, project_id: UUID, feedback_id: UUID) -> Dict:
+    """
+    Downscale and recompress a staged upload into the project's screenshot directory
+
+    The original is deleted either way; only the processed copy is kept.
+
+    Returns:
+        The screenshot metadata stored on the FeedbackInput
+    """
+    relative_path = os.path.join(str(project_id), f"{feedback_id}.webp")
+    dest_path = os.path.join(settings.SCREENSHOT_UPLOAD_DIR, relative_path)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    try:
+        processed = await screenshot_processor.process(staged.path, dest_path)
+    except BaseException:
+        _remove(dest_path)
+        raise
+    finally:
+        _remove(staged.path)
+    return {
+        "path": relative_path,
+        "content_type": processed["content_type"],
+        "width": processed["width"],
+        "height": processed["height"],
+        "bytes": os.path.getsize(dest_path),
+        "phash": processed["phash"],
+        "original": {
+            "content_type": staged.content_type,
+            "format": processed["original_format"],
+            "width": processed["original_width"],
+            "height": processed["original_height"],
+            "bytes": staged.size,
+            "sha256": staged.sha256,
+        },
+    }
+
+
+async def find_duplicate_screenshot(
+    db: AsyncSession,
+    project_id: UUID,
+    phash: str,
+    comment: str
+) -> Optional[Tuple[UUID, Dict, List[Dict]]]:
+    """
+    An earlier screenshot in the project that looks the same and came with the same comment
+
+    Scans the project's most recent SCREENSHOT_DEDUP_SCAN_LIMIT screenshots
+    and takes the closest one within SCREENSHOT_HASH_MAX_DISTANCE bits.
+
+    Returns:
+        (feedback id, its screenshot metadata, its tasks as translator output), or None
+    """
+    result = await db.execute(
+        select(FeedbackInput.id, FeedbackInput.original_text, FeedbackInput.input_metadata)
+        .where(
+            FeedbackInput.project_id == project_id,
+            FeedbackInput.source_type == SourceType.SCREENSHOT
+        )
+        .order_by(FeedbackInput.created_at.desc(), FeedbackInput.id.desc())
+        .limit(settings.SCREENSHOT_DEDUP_SCAN_LIMIT)
+    )
+    normalized = normalize_feedback(comment)
+    best = None
+    for feedback_id, original_text, metadata in result.all():
+        screenshot = (metadata or {}).get("screenshot")
+        if not screenshot or normalize_feedback(original_text) != normalized:
+            continue
+        distance = hamming_distance(phash, screenshot["phash"])
+        if distance > settings.SCREENSHOT_HASH_MAX_DISTANCE:
+            continue
+        if best is None or distance < best[0]:
+            best = (distance, feedback_id, screenshot)
+    if best is None:
+        return None
+
+    _, feedback_id, screenshot = best
+    tasks = await db.scalars(
+        select(GeneratedTask)
+        .where(GeneratedTask.input_id == feedback_id)
+        .order_by(GeneratedTask.created_at, GeneratedTask.id)
+    )
+    tasks_data = [
+        {
+            "task": task.task_description,
+            "estimated_time_minutes": task.estimated_time_minutes,
+            "difficulty_level": task.difficulty_level,
+        }
+        for task in tasks.all()
+    ]
+    if not tasks_data:
+        return None
+    return feedback_id, screenshot, tasks_data
+
+
+def discard_screenshot(screenshot: Dict) -> None:
+    _remove(os.path.join(settings.SCREENSHOT_UPLOAD_DIR, screenshot["path"]))
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# Closed by the API lifespan
+screenshot_processor = ScreenshotProcessor(
+    workers=settings.SCREENSHOT_WORKERS,
+    max_dimension=settings.SCREENSHOT_MAX_DIMENSION,
+    quality=settings.SCREENSHOT_QUALITY,
+    max_pixels=settings.SCREENSHOT_MAX_PIXELS,
+)
@@ -0,0 +1,256 @@
+"""
+CPU-only near-duplicate index over feedback text
+MinHash signatures with LSH banding, stored in NumPy arrays
+"""
+import re
+import zlib
+from typing import AbstractSet, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.translation_cache import normalize_feedback
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN = re.compile(r"[a-z0-9#%]+")
+
+# Words per shingle; pairs keep word order and negation ("don't make") in the set
+SHINGLE_SIZE = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Word shingles used as the MinHash set (the lone word for one-word texts)
+    """
+    words = _TOKEN.findall(normalize_feedback(text))
+    if len(words) < SHINGLE_SIZE:
+        return words
+    return sorted({
+        " ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)
+    })
+
+
+def jaccard(a: AbstractSet[str], b: AbstractSet[str]) -> float:
+    """
+    Exact Jaccard similarity of two shingle sets
+    """
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class SimilarityIndex:
+    """
+    Incremental MinHash/LSH index answering "closest prior text" lookups
+
+    Each band's bucket keys are kept in a sorted array and searched with
+    ``np.searchsorted``. New rows land in a small unsorted tail that is
+    scanned linearly and merged into the sorted arrays once it grows past
+    ``merge_threshold``, so inserts stay cheap and lookups stay O(log n).
+    Matches can be scoped to an owner so one user's feedback never seeds
+    another user's tasks.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 16,
+        merge_threshold: int = 4096,
+        max_candidates_per_band: int = 32,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.merge_threshold = merge_threshold
+        self.max_candidates_per_band = max_candidates_per_band
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 61 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 61 - 1, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.randint(1, 2 ** 63 - 1, size=self.rows_per_band, dtype=np.uint64) | 1
+
+        self._capacity = 0
+        self._size = 0
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._band_keys = np.empty((0, bands), dtype=np.uint64)
+        self._owners = np.empty(0, dtype=np.int32)
+        self._item_ids: List[Hashable] = []
+        self._owner_codes: dict = {}
+
+        # Rows [0, _merged) are reachable through the sorted arrays, the rest is the tail
+        self._merged = 0
+        self._sorted_keys = [np.empty(0, dtype=np.uint64) for _ in range(bands)]
+        self._sorted_rows = [np.empty(0, dtype=np.int64) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _token_hashes(self, tokens: Sequence[str]) -> np.ndarray:
+        return np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) for token in tokens),
+            dtype=np.uint64,
+            count=len(tokens),
+        )
+
+    def _signatures_for(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        MinHash signatures for many documents in one vectorized pass
+        """
+        lengths = np.fromiter(
+            (len(t) for t in token_lists), dtype=np.int64, count=len(token_lists)
+        )
+        hashes = self._token_hashes([token for tokens in token_lists for token in tokens])
+        permuted = self._a[:, None] * hashes[None, :] + self._b[:, None]
+        permuted = (permuted % _MERSENNE_PRIME) & _MAX_HASH
+        offsets = np.concatenate((np.zeros(1, dtype=np.int64), np.cumsum(lengths)[:-1]))
+        return np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+
+    def _keys_for(self, signatures: np.ndarray) -> np.ndarray:
+        bands = signatures.reshape(len(signatures), self.bands, self.rows_per_band)
+        bands = bands.astype(np.uint64)
+        return (bands * self._band_mix).sum(axis=2)
+
+    def _owner_code(self, owner: Optional[Hashable]) -> int:
+        if owner is None:
+            return -1
+        return self._owner_codes.setdefault(owner, len(self._owner_codes))
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2, 1024)
+        for name in ("_signatures", "_band_keys", "_owners"):
+            old = getattr(self, name)
+            grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+        self._capacity = capacity
+
+    def add(self, item_id: Hashable, text: str, owner: Optional[Hashable] = None) -> None:
+        """
+        Index one document
+        """
+        self.add_many([item_id], [text], [owner])
+
+    def add_many(
+        self,
+        item_ids: Sequence[Hashable],
+        texts: Sequence[str],
+        owners: Optional[Sequence[Optional[Hashable]]] = None,
+    ) -> None:
+        """
+        Index a batch of documents (texts without any words are skipped)
+        """
+        owners = owners if owners is not None else [None] * len(texts)
+        kept = [
+            (item_id, tokens, owner)
+            for item_id, tokens, owner in zip(item_ids, map(tokenize, texts), owners)
+            if tokens
+        ]
+        if not kept:
+            return
+
+        signatures = self._signatures_for([tokens for _, tokens, _ in kept])
+        self._reserve(len(kept))
+        start, end = self._size, self._size + len(kept)
+        self._signatures[start:end] = signatures
+        self._band_keys[start:end] = self._keys_for(signatures)
+        self._owners[start:end] = [self._owner_code(owner) for _, _, owner in kept]
+        self._item_ids.extend(item_id for item_id, _, _ in kept)
+        self._size = end
+
+        if self._size - self._merged >= self.merge_threshold:
+            self._merge_tail()
+
+    def _merge_tail(self) -> None:
+        """
+        Fold the unsorted tail into each band's sorted arrays
+        """
+        rows = np.arange(self._merged, self._size, dtype=np.int64)
+        for band in range(self.bands):
+            keys = self._band_keys[self._merged:self._size, band]
+            order = np.argsort(keys, kind="stable")
+            positions = np.searchsorted(self._sorted_keys[band], keys[order], side="right")
+            self._sorted_keys[band] = np.insert(self._sorted_keys[band], positions, keys[order])
+            self._sorted_rows[band] = np.insert(self._sorted_rows[band], positions, rows[order])
+        self._merged = self._size
+
+    def query(
+        self,
+        text: str,
+        threshold: float = 0.8,
+        owner: Optional[Hashable] = None,
+    ) -> Optional[Tuple[Hashable, float]]:
+        """
+        Find the most similar indexed document
+
+        Args:
+            text: Text to look up
+            threshold: Minimum estimated Jaccard similarity (0-1)
+            owner: Only consider documents indexed for this owner
+
+        Returns:
+            (item_id, similarity) of the best match, or None
+        """
+        tokens = tokenize(text)
+        if not tokens or not self._size:
+            return None
+        if owner is not None and owner not in self._owner_codes:
+            return None
+
+        signature = self._signatures_for([tokens])[0]
+        keys = self._keys_for(signature[None, :])[0]
+        owner_code = self._owner_code(owner) if owner is not None else None
+
+        candidates = []
+        for band in range(self.bands):
+            sorted_keys = self._sorted_keys[band]
+            lo = np.searchsorted(sorted_keys, keys[band], side="left")
+            hi = np.searchsorted(sorted_keys, keys[band], side="right")
+            if lo == hi:
+                continue
+            rows = self._sorted_rows[band][lo:hi]
+            if owner_code is not None:
+                rows = rows[self._owners[rows] == owner_code]
+            candidates.append(rows[-self.max_candidates_per_band:])
+
+        if self._merged < self._size:
+            tail = self._band_keys[self._merged:self._size]
+            mask = (tail == keys).any(axis=1)
+            if owner_code is not None:
+                mask &= self._owners[self._merged:self._size] == owner_code
+            candidates.append(np.nonzero(mask)[0] + self._merged)
+
+        if not candidates:
+            return None
+        rows = np.unique(np.concatenate(candidates))
+        if not len(rows):
+            return None
+
+        similarities = (self._signatures[rows] == signature).mean(axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] < threshold:
+            return None
+        return self._item_ids[rows[best]], float(similarities[best])
+
+    def extend(
+        self,
+        rows: Iterable[Tuple[Hashable, str, Optional[Hashable]]],
+        batch_size: int = 10000
+    ) -> None:
+        """
+        Bulk-load (item_id, text, owner) rows in vectorized batches
+        """
+        batch: list = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self.add_many(*zip(*batch))
+                batch = []
+        if batch:
+            self.add_many(*zip(*batch))
@@ -0,0 +1,234 @@
+"""
+Incremental parser for model output
+Emits each task object as soon as its closing brace arrives
+"""
+import json
+import re
+from typing import Dict, List, Optional
+
+# Characters that can change the scanner's state outside / inside a string
+_STRUCTURAL = re.compile(r'[{}\[\],"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# Prose fallback: list markers and code fences are not part of a task
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_FENCE = re.compile(r"^\s*```")
+
+
+class TaskStreamParser:
+    """
+    Extracts tasks from model output delivered in chunks
+
+    Accepts ``{"tasks": [{...}, ...]}``, a bare ``[{...}, ...]``, either one
+    wrapped in a Markdown fence or prose, an array of strings in either of
+    those places, and a lone ``{"task": ...}``. Any object whose parent is
+    an array is a candidate task; it is emitted once it closes and has a
+    non-empty ``task`` string. Strings are only tasks in the root array or
+    the one under ``"tasks"``, so other lists (notes, tags) are ignored.
+    A candidate that is dropped (no usable ``task``) sets ``salvaged``, so
+    the partial result is not cached as a clean one.
+
+    Each chunk is scanned once, jumping between structural characters, and
+    the buffer only keeps text that may still become a task, so feeding is
+    O(len(chunk)). Call ``finish`` at the end of the output to recover a
+    task cut off by the token limit, or line-per-task prose when the model
+    returned no JSON at all.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._offset = 0  # absolute position of self._buffer[0]
+        self._position = 0  # absolute position of the next unscanned character
+        self._stack: List[str] = []
+        self._in_string = False
+        self._string_start = -1
+        self._string_depth = -1  # stack depth of the array whose strings are tasks
+        self._key_start = -1
+        self._root_key: Optional[str] = None
+        self._task_start = -1
+        self._task_depth = 0
+        self._task_last_comma = -1
+        self._root_start = -1
+        self._seen_json = False
+        self._emitted = 0
+        self.complete = False
+        self.salvaged = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        Consume a chunk and return the tasks it completed
+        """
+        self._buffer += chunk
+        tasks: List[Dict] = []
+        buffer = self._buffer
+        offset = self._offset
+        index = self._position - offset
+        end = len(buffer)
+
+        while index < end:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, index)
+                if match is None:
+                    index = end
+                    break
+                index = match.end()
+                if match.group() == "\\":
+                    # Skip the escaped character (may be in the next chunk)
+                    if index >= end:
+                        index = end + 1
+                        break
+                    index += 1
+                    continue
+                self._in_string = False
+                if self._key_start >= 0:
+                    # The last string in the root object before a "[" is that array's key
+                    self._root_key = self._decode(buffer[self._key_start - offset:index])
+                    self._key_start = -1
+                if self._string_start >= 0:
+                    task = self._parse_string(buffer[self._string_start - offset:index])
+                    if task is not None:
+                        tasks.append(task)
+                    else:
+                        self.salvaged = True
+                    self._string_start = -1
+                continue
+
+            match = _STRUCTURAL.search(buffer, index)
+            if match is None:
+                index = end
+                break
+            char = match.group()
+            position = match.start()
+            index = match.end()
+            absolute = offset + position
+
+            if char == '"':
+                self._in_string = True
+                if len(self._stack) == self._string_depth and self._task_start < 0:
+                    self._string_start = absolute
+                elif self._stack == ["{"]:
+                    self._key_start = absolute
+            elif char in "{[":
+                self._seen_json = True
+                if char == "{" and self._task_start < 0:
+                    if self._stack and self._stack[-1] == "[":
+                        self._task_start = absolute
+                        self._task_depth = len(self._stack) + 1
+                        self._task_last_comma = -1
+                    elif not self._stack:
+                        self._root_start = absolute
+                elif char == "[" and self._task_start < 0 and (
+                    not self._stack or (self._stack == ["{"] and self._root_key == "tasks")
+                ):
+                    self._string_depth = len(self._stack) + 1
+                self._stack.append(char)
+            elif char == ",":
+                if self._task_start >= 0 and len(self._stack) == self._task_depth:
+                    self._task_last_comma = absolute
+            elif self._stack:
+                opener = self._stack.pop()
+                if len(self._stack) < self._string_depth:
+                    self._string_depth = -1
+                if self._task_start >= 0 and len(self._stack) == self._task_depth - 1:
+                    if opener == "{":
+                        task = self._parse(buffer[self._task_start - offset:position + 1])
+                        if task is not None:
+                            tasks.append(task)
+                        else:
+                            # An item without a usable "task": the output is not all there
+                            self.salvaged = True
+                    self._task_start = -1
+                elif not self._stack:
+                    if opener == "{" and self._root_start >= 0 and not self._emitted and not tasks:
+                        # A lone {"task": ...} is a single task
+                        task = self._parse(buffer[self._root_start - offset:position + 1])
+                        if task is not None:
+                            tasks.append(task)
+                    self._root_start = -1
+                    self.complete = True
+
+        self._position = offset + index
+        self._emitted += len(tasks)
+        self._trim()
+        return tasks
+
+    def finish(self) -> List[Dict]:
+        """
+        Flush at end of output and return any tasks that can still be recovered
+        """
+        tasks: List[Dict] = []
+        if self._task_start >= 0:
+            # Cut off mid-task: close it as is, or drop the field after the last comma
+            fragment = self._buffer[self._task_start - self._offset:]
+            candidates = [fragment]
+            if self._task_last_comma > self._task_start:
+                candidates.append(fragment[:self._task_last_comma - self._task_start])
+            for candidate in candidates:
+                task = self._parse(candidate.rstrip() + "}")
+                if task is not None:
+                    tasks.append(task)
+                    self.salvaged = True
+                    break
+        elif not self._seen_json and not self._emitted:
+            tasks = self._parse_prose(self._buffer)
+            self.salvaged = bool(tasks)
+        self._emitted += len(tasks)
+        self._task_start = -1
+        return tasks
+
+    def _trim(self) -> None:
+        keep = [
+            start for start in (self._task_start, self._string_start, self._key_start)
+            if start >= 0
+        ]
+        if self._root_start >= 0 and not self._emitted:
+            keep.append(self._root_start)
+        if not self._seen_json:
+            # Could still be prose; keep everything for finish()
+            return
+        # The position can run one past the buffer when an escape is split across chunks
+        cut = min(keep + [self._position, self._offset + len(self._buffer)])
+        if cut > self._offset:
+            self._buffer = self._buffer[cut - self._offset:]
+            self._offset = cut
+
+    @staticmethod
+    def _parse(fragment: str) -> Optional[Dict]:
+        try:
+            value = json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+        if isinstance(value, dict) and isinstance(value.get("task"), str) and value["task"].strip():
+            return value
+        return None
+
+    @staticmethod
+    def _decode(literal: str) -> Optional[str]:
+        try:
+            return json.loads(literal)
+        except json.JSONDecodeError:
+            return None
+
+    @classmethod
+    def _parse_string(cls, literal: str) -> Optional[Dict]:
+        value = cls._decode(literal)
+        if value and value.strip():
+            return {"task": value.strip()}
+        return None
+
+    @staticmethod
+    def _parse_prose(text: str) -> List[Dict]:
+        lines = [line for line in text.splitlines() if not _FENCE.match(line)]
+        # In a list, anything before the first item is preamble ("Sure! Here are the tasks")
+        started = not any(_LIST_MARKER.match(line) for line in lines)
+        tasks = []
+        for line in lines:
+            if not started:
+                if not _LIST_MARKER.match(line):
+                    continue
+                started = True
+            line = _LIST_MARKER.sub("", line).strip()
+            # "Tasks:" style headings introduce items rather than being one
+            if line and not line.endswith(":"):
+                tasks.append({"task": line})
+        return tasks
@@ -0,0 +1,90 @@
+"""
+Micro-batching window in front of the translator
+Requests that arrive together for the same key are handed over as one batch
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Set, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[K, T, R]):
+    """
+    Collects items submitted under the same key for up to ``window_seconds``
+
+    The first item for a key opens its window. When the window closes, or
+    ``max_items`` are waiting, ``run`` receives the key and the items in
+    arrival order and must return one result per item; each caller gets its
+    own. A caller that gives up while waiting does not cancel the batch.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[K, List[T]], Awaitable[List[R]]],
+        window_seconds: float = 0.005,
+        max_items: int = 8,
+    ):
+        self.run = run
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self._pending: Dict[K, List[Tuple[T, asyncio.Future]]] = {}
+        self._timers: Dict[K, asyncio.TimerHandle] = {}
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, key: K, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) >= self.max_items:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.window_seconds, self._flush, key)
+        return await future
+
+    def _flush(self, key: K) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [(item, future) for item, future in self._pending.pop(key, []) if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.ensure_future(self._run(key, batch))
+        # Keep a reference so the task is not garbage collected mid-run
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, key: K, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        try:
+            results = await self.run(key, [item for item, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        return {
+            "window_ms": round(self.window_seconds * 1000, 1),
+            "batches": self.batches,
+            "items": self.items,
+            "items_per_batch": round(self.items / (self.batches or 1), 2),
+            "waiting": sum(len(batch) for batch in self._pending.values()),
+        }
@@ -0,0 +1,113 @@
+"""
+Content-addressed cache for feedback translations
+Common phrases ("make it pop", "make the logo bigger") skip the LLM entirely
+"""
+import hashlib
+import logging
+import re
+from typing import Any, Dict, Optional, Protocol
+
+from app.core.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n\"'.,!?;:"
+
+
+def normalize_feedback(text: str) -> str:
+    """
+    Normalize feedback so trivially different phrasings share a cache entry
+    """
+    return _WHITESPACE.sub(" ", text.casefold()).strip(_EDGE_PUNCTUATION)
+
+
+def translation_cache_key(text: str, model: str, prompt_version: str) -> str:
+    """
+    Cache key for a translation: normalized text + model + prompt version
+    """
+    payload = "\x1f".join((prompt_version, model, normalize_feedback(text)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SharedCacheBackend(Protocol):
+    """
+    Optional second tier shared between workers (e.g. Postgres)
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        ...
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache
+
+    Lookups hit the in-process LRU first, then the shared backend if one is
+    configured. Shared-tier failures are logged and treated as misses so the
+    cache can never fail a translation.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+        shared: Optional[SharedCacheBackend] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.local = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.shared = shared
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Return a cached translation, or None on a miss
+        """
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+
+        try:
+            value = await self.shared.get(key)
+        except Exception as e:
+            self.shared_errors += 1
+            logger.warning(f"Shared translation cache read failed: {e}")
+            return None
+
+        if value is not None:
+            self.shared_hits += 1
+            self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a translation in every tier
+        """
+        self.local.set(key, value)
+        if self.shared is None:
+            return
+
+        try:
+            await self.shared.set(key, value, self.ttl_seconds)
+        except Exception as e:
+            self.shared_errors += 1
+            logger.warning(f"Shared translation cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit, miss and eviction counters for both tiers
+        """
+        local = self.local.stats()
+        return {
+            **local,
+            "hits": local["hits"] + self.shared_hits,
+            "misses": local["misses"] - self.shared_hits,
+            "local_hits": local["hits"],
+            "shared_hits": self.shared_hits,
+            "shared_errors": self.shared_errors,
+            "shared_enabled": self.shared is not None,
+        }
@@ -0,0 +1,44 @@
+"""
+Postgres-backed shared tier for the translation cache
+"""
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.translation_cache import TranslationCacheEntry
+
+
+class PostgresTranslationStore:
+    """
+    Shares cached translations between API workers through ``translation_cache``
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def get(self, key: str) -> Optional[Any]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(TranslationCacheEntry.value).where(
+                    TranslationCacheEntry.key == key,
+                    TranslationCacheEntry.expires_at > datetime.utcnow()
+                )
+            )
+            return result.scalar_one_or_none()
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        statement = insert(TranslationCacheEntry).values(
+            key=key, value=value, created_at=now, expires_at=expires_at
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[TranslationCacheEntry.key],
+            set_={"value": statement.excluded.value, "expires_at": statement.excluded.expires_at}
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement)
+            await session.commit()
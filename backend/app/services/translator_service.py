@@ -3,16 +3,86 @@ THE CORE MAGIC: AI-powered feedback translator
 This service translates vague client feedback into actionable design tasks
 """
 import openai
+import asyncio
 import json
 import logging
-from typing import List, Dict
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, Union, cast
+from uuid import UUID
 
 from app.core.config import settings
+from app.database.session import AsyncSessionLocal
+from app.services.llm_client import LLMClient
+from app.services.resilience import CircuitBreaker, CircuitOpenError, ResilientCall
+from app.services.llm_scheduler import BATCH, INTERACTIVE, LLMScheduler, ModelBudget
+from app.services.prompt_builder import PromptBuilder, count_tokens
+from app.services.translation_store import PostgresTranslationStore
+from app.services.translation_cache import TranslationCache, translation_cache_key
+from app.services.task_parser import TaskStreamParser
+from app.services.translation_batcher import MicroBatcher
+from app.services.usage_meter import UsageMeter, usage_tokens
+from app.services.usage_store import PostgresUsageStore
 
 logger = logging.getLogger(__name__)
 
-# Configure OpenAI
-openai.api_key = settings.OPENAI_API_KEY
+# Shared async OpenAI client (one connection pool per process)
+llm_client = LLMClient(
+    api_key=settings.OPENAI_API_KEY,
+    base_url=settings.OPENAI_BASE_URL,
+    timeout_seconds=settings.OPENAI_TIMEOUT_SECONDS,
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+)
+
+# Deadline, retries, hedging and circuit breaker around every completion
+model_call = ResilientCall(
+    breaker=CircuitBreaker(
+        failure_threshold=settings.OPENAI_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.OPENAI_BREAKER_RESET_SECONDS,
+    ),
+    retryable=(openai.APIConnectionError, openai.InternalServerError),
+    attempts=settings.OPENAI_RETRY_ATTEMPTS,
+    base_delay_seconds=settings.OPENAI_RETRY_BASE_DELAY_SECONDS,
+    max_delay_seconds=settings.OPENAI_RETRY_MAX_DELAY_SECONDS,
+    deadline_seconds=settings.OPENAI_DEADLINE_SECONDS,
+    hedge_percentile=settings.OPENAI_HEDGE_PERCENTILE,
+    hedge_min_samples=settings.OPENAI_HEDGE_MIN_SAMPLES,
+)
+
+# Every model call waits its turn here; the fallback model takes over when
+# the primary's tokens-per-minute budget is spent
+llm_scheduler = LLMScheduler(
+    budgets=[
+        ModelBudget(settings.OPENAI_MODEL, settings.OPENAI_TOKENS_PER_MINUTE),
+        ModelBudget(settings.OPENAI_FALLBACK_MODEL, settings.OPENAI_FALLBACK_TOKENS_PER_MINUTE),
+    ],
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+    lane_weights={
+        INTERACTIVE: settings.LLM_SCHEDULER_INTERACTIVE_WEIGHT,
+        BATCH: settings.LLM_SCHEDULER_BATCH_WEIGHT,
+    },
+)
+
+# Translations keyed on normalized feedback + model + prompt version
+translation_cache = TranslationCache(
+    max_entries=settings.TRANSLATION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TRANSLATION_CACHE_TTL_SECONDS,
+    shared=(
+        PostgresTranslationStore(AsyncSessionLocal)
+        if settings.TRANSLATION_CACHE_SHARED else None
+    ),
+)
+
+# Token usage of every completion, written to api_usage in the background
+usage_meter = UsageMeter(
+    PostgresUsageStore(AsyncSessionLocal).write,
+    max_queue_size=settings.USAGE_METER_QUEUE_SIZE,
+    batch_size=settings.USAGE_METER_BATCH_SIZE,
+    flush_interval_seconds=settings.USAGE_METER_FLUSH_SECONDS,
+)
+
+
+# One comment's tasks, or why it could not be translated (translate_many(return_exceptions=True))
+TranslationOutcome = Union[List[Dict], Exception]
 
 
 class TranslatorService:
@@ -20,6 +90,10 @@ class TranslatorService:
     Service for translating vague feedback into actionable tasks
     """
     
+    # Bump whenever SYSTEM_PROMPT or PACKED_SYSTEM_PROMPT changes so cached
+    # translations are not reused
+    PROMPT_VERSION = "v1"
+
     SYSTEM_PROMPT = """You are an expert Art Director and Senior Designer with 15+ years of experience. Your job is to translate vague, unclear client feedback into specific, actionable design tasks for junior designers.
 
 When you receive feedback, you should:
@@ -66,71 +140,458 @@ Output:
   ]
 }"""
     
-    async def translate_feedback(self, feedback_text: str) -> List[Dict]:
+    # Several short comments in one call; each task names the comment it belongs to
+    # Backslash-newlines only wrap the source; the prompt text has no break there
+    PACKED_SYSTEM_PROMPT = """You are an expert Art Director and Senior Designer with 15+ years of \
+experience. Your job is to translate vague, unclear client feedback into specific, actionable \
+design tasks for junior designers.
+
+You will receive a JSON array of separate pieces of client feedback. Translate each piece on its \
+own. For each one you should:
+1. Identify the core intent behind the vague language
+2. Break it down into 2-5 specific, actionable tasks
+3. Use precise design terminology
+4. Include specific measurements or percentages when relevant
+5. Reference concrete design elements (colors, typography, spacing, etc.)
+
+You MUST respond ONLY in valid JSON format with this exact structure, where "item" is the \
+zero-based position of the feedback in the input array:
+{
+  "tasks": [
+    {
+      "item": 0,
+      "task": "Specific actionable task description",
+      "estimated_time_minutes": 15,
+      "difficulty_level": "easy"
+    }
+  ]
+}
+
+Every piece of feedback must get at least 2 tasks.
+Difficulty levels: "easy", "medium", "hard"
+Time estimates: realistic minutes (5-120)
+
+Example:
+Input: ["make it pop", "the logo feels lost"]
+Output:
+{
+  "tasks": [
+    {
+      "item": 0,
+      "task": "Increase contrast ratio on the main headline from 4.5:1 to at least 7:1 for \
+better readability",
+      "estimated_time_minutes": 10,
+      "difficulty_level": "easy"
+    },
+    {
+      "item": 0,
+      "task": "Add a subtle drop shadow (0px 4px 6px rgba(0, 0, 0, 0.1)) to the primary CTA button",
+      "estimated_time_minutes": 5,
+      "difficulty_level": "easy"
+    },
+    {
+      "item": 1,
+      "task": "Scale the logo up by 20% and give it at least 32px of clear space on every side",
+      "estimated_time_minutes": 10,
+      "difficulty_level": "easy"
+    },
+    {
+      "item": 1,
+      "task": "Move the logo to the top-left of the header so it is the first element users see",
+      "estimated_time_minutes": 15,
+      "difficulty_level": "medium"
+    }
+  ]
+}"""
+
+    def __init__(
+        self,
+        client: Optional[LLMClient] = None,
+        cache: Optional[TranslationCache] = None,
+        meter: Optional[UsageMeter] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        caller: Optional[ResilientCall] = None,
+        prompts: Optional[PromptBuilder] = None,
+        packed_prompts: Optional[PromptBuilder] = None,
+        user_id: Optional[UUID] = None,
+        endpoint: str = "translate",
+        lane: str = INTERACTIVE
+    ):
+        self.client = client or llm_client
+        self.cache = cache or translation_cache
+        self.meter = meter or usage_meter
+        self.scheduler = scheduler or llm_scheduler
+        self.caller = caller or model_call
+        self.prompts = prompts or translation_prompts
+        self.packed_prompts = packed_prompts or packed_translation_prompts
+        # Usage is attributed to this user; None disables metering
+        self.user_id = user_id
+        self.endpoint = endpoint
+        # Scheduler lane: "interactive" for single requests, "batch" for bulk work
+        self.lane = lane
+
+    async def translate_feedback(
+        self,
+        feedback_text: str,
+        use_cache: bool = True,
+        raise_on_error: bool = False
+    ) -> List[Dict]:
         """
         Translate vague feedback into actionable tasks using OpenAI
         
         Args:
             feedback_text: The vague client feedback
+            use_cache: Look up previous translations first (fresh results are always cached)
+            raise_on_error: Raise instead of returning the fallback tasks, for
+                callers that retry later (background jobs)
             
         Returns:
             List of task dictionaries with task description, time, and difficulty
         """
+        cache_key = translation_cache_key(feedback_text, settings.OPENAI_MODEL, self.PROMPT_VERSION)
+        if use_cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             # Call OpenAI API
-            response = await self._call_openai(feedback_text)
+            response, model = await self._call_openai(feedback_text)
             
-            # Parse JSON response
-            tasks_data = json.loads(response)
+            # Parse the response, tolerating fences, bare arrays and truncation
+            parser = TaskStreamParser()
+            tasks = parser.feed(response) + parser.finish()
             
-            if "tasks" not in tasks_data:
-                raise ValueError("Invalid response format from AI")
+            if not tasks:
+                logger.error(f"No tasks in AI response: {response}")
+                if raise_on_error:
+                    raise ValueError("No tasks in the model's reply")
+                return self._fallback_tasks(feedback_text)
             
-            return tasks_data["tasks"]
+            # Recovered output is served but not cached, and neither is the
+            # fallback model's: the key promises the primary model's answer
+            if parser.complete and not parser.salvaged and model == settings.OPENAI_MODEL:
+                await self.cache.set(cache_key, tasks)
+            return tasks
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI response: {e}")
-            logger.error(f"Response was: {response}")
-            # Fallback: return a generic task
+        except CircuitOpenError:
+            if raise_on_error:
+                raise
+            # Upstream is failing; don't queue behind it
+            logger.warning("Model circuit open, returning fallback tasks")
             return self._fallback_tasks(feedback_text)
         except Exception as e:
+            if raise_on_error:
+                raise
             logger.error(f"Error translating feedback: {e}")
             return self._fallback_tasks(feedback_text)
     
-    async def _call_openai(self, feedback_text: str) -> str:
+    async def translate_many(
+        self,
+        feedback_texts: List[str],
+        use_cache: bool = True,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False
+    ) -> List[TranslationOutcome]:
         """
-        Call OpenAI API with retry logic
+        Translate several comments, packing short ones into shared completions
+
+        Up to TRANSLATION_PACK_MAX_ITEMS comments that fit in
+        TRANSLATION_PACK_MAX_ITEM_TOKENS go into one call, and each task in
+        the reply names the comment it belongs to. Longer comments, and any
+        the packed reply leaves out, are translated one at a time.
+
+        Args:
+            feedback_texts: The vague client feedback, one comment each
+            use_cache: Look up previous translations first (fresh results are always cached)
+            max_concurrency: Most model calls in flight for this batch at once
+            return_exceptions: Give a comment whose translation failed its
+                exception instead of the fallback tasks
+
+        Returns:
+            One list of task dictionaries (or exception) per comment, in the same order
+        """
+        results: List[Optional[TranslationOutcome]] = [None] * len(feedback_texts)
+        cache_keys = [
+            translation_cache_key(text, settings.OPENAI_MODEL, self.PROMPT_VERSION)
+            for text in feedback_texts
+        ]
+        if use_cache:
+            for index, cache_key in enumerate(cache_keys):
+                results[index] = await self.cache.get(cache_key)
+
+        packable = [
+            index for index, text in enumerate(feedback_texts)
+            if results[index] is None and self.packable(text)
+        ]
+        size = max(settings.TRANSLATION_PACK_MAX_ITEMS, 1)
+        packs = [packable[i:i + size] for i in range(0, len(packable), size)]
+        singles = [
+            index for index, text in enumerate(feedback_texts)
+            if results[index] is None and index not in packable
+        ]
+        # A pack of one is an ordinary call
+        singles += [pack[0] for pack in packs if len(pack) == 1]
+        packs = [pack for pack in packs if len(pack) > 1]
+
+        semaphore = asyncio.Semaphore(max_concurrency or len(feedback_texts) or 1)
+
+        async def translate_single(index: int) -> None:
+            async with semaphore:
+                try:
+                    results[index] = await self.translate_feedback(
+                        feedback_texts[index],
+                        use_cache=False,
+                        raise_on_error=return_exceptions
+                    )
+                except Exception as e:
+                    results[index] = e
+
+        async def translate_pack(pack: List[int]) -> None:
+            async with semaphore:
+                try:
+                    packed = await self._translate_pack(
+                        [feedback_texts[index] for index in pack],
+                        [cache_keys[index] for index in pack],
+                        raise_on_error=return_exceptions
+                    )
+                except Exception as e:
+                    for index in pack:
+                        results[index] = e
+                    return
+            missing = [index for index, tasks in zip(pack, packed) if not tasks]
+            for index, tasks in zip(pack, packed):
+                if tasks:
+                    results[index] = tasks
+            if missing:
+                logger.warning(
+                    f"Packed reply missed {len(missing)} of {len(pack)} items, retrying them alone"
+                )
+                await asyncio.gather(*(translate_single(index) for index in missing))
+
+        await asyncio.gather(
+            *(translate_single(index) for index in singles),
+            *(translate_pack(pack) for pack in packs)
+        )
+        # Every comment has its outcome by now
+        return cast(List[TranslationOutcome], results)
+
+    def packable(self, feedback_text: str) -> bool:
+        """
+        Whether a comment is short enough to share a completion with others
+        """
+        if settings.TRANSLATION_PACK_MAX_ITEMS < 2:
+            return False
+        tokens = count_tokens(feedback_text, self.packed_prompts.model)
+        return tokens <= settings.TRANSLATION_PACK_MAX_ITEM_TOKENS
+
+    async def _translate_pack(
+        self,
+        feedback_texts: List[str],
+        cache_keys: List[str],
+        raise_on_error: bool = False
+    ) -> List[List[Dict]]:
+        """
+        Translate comments in one call; an empty list marks a comment the reply left out
         """
         try:
-            # Try with primary model (GPT-4)
-            response = openai.ChatCompletion.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": feedback_text}
-                ],
-                temperature=0.7,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
+            response, model = await self._call_openai(
+                json.dumps(feedback_texts, ensure_ascii=False),
+                prompts=self.packed_prompts,
+                items=len(feedback_texts)
             )
-            
-            return response.choices[0].message.content
-            
-        except openai.error.RateLimitError:
-            # Try fallback model if rate limited
-            logger.warning("Rate limited on primary model, trying fallback")
-            response = openai.ChatCompletion.create(
-                model=settings.OPENAI_FALLBACK_MODEL,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": feedback_text}
-                ],
+        except CircuitOpenError:
+            if raise_on_error:
+                raise
+            logger.warning("Model circuit open, returning fallback tasks")
+            return [self._fallback_tasks(text) for text in feedback_texts]
+        except Exception as e:
+            if raise_on_error:
+                raise
+            logger.error(f"Error translating packed feedback: {e}")
+            return [self._fallback_tasks(text) for text in feedback_texts]
+
+        parser = TaskStreamParser()
+        grouped: List[List[Dict]] = [[] for _ in feedback_texts]
+        last_item = None
+        for task in parser.feed(response) + parser.finish():
+            item = task.pop("item", None)
+            if isinstance(item, str) and item.isdigit():
+                item = int(item)
+            if isinstance(item, int) and not isinstance(item, bool) and 0 <= item < len(grouped):
+                grouped[item].append(task)
+                last_item = item
+
+        if not parser.complete or parser.salvaged:
+            # The comment being written when the reply was cut off may be missing tasks
+            if last_item is not None:
+                grouped[last_item] = []
+            return grouped
+        if model != settings.OPENAI_MODEL:
+            return grouped
+        for cache_key, tasks in zip(cache_keys, grouped):
+            if tasks:
+                await self.cache.set(cache_key, tasks)
+        return grouped
+
+    async def stream_translate_feedback(
+        self,
+        feedback_text: str,
+        use_cache: bool = True
+    ) -> AsyncIterator[Dict]:
+        """
+        Translate feedback, yielding each task as soon as the model finishes it
+
+        Falls back to the generic tasks if the model produced nothing usable.
+        Only complete streams are cached.
+        """
+        cache_key = translation_cache_key(feedback_text, settings.OPENAI_MODEL, self.PROMPT_VERSION)
+        if use_cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                for task in cached:
+                    yield task
+                return
+
+        if self.caller.breaker.rejecting:
+            logger.warning("Model circuit open, returning fallback tasks")
+            for task in self._fallback_tasks(feedback_text):
+                yield task
+            return
+
+        tasks: List[Dict] = []
+        completed = False
+        answered_by = None
+        prompt = self.prompts.build(feedback_text)
+        async with self.scheduler.slot(self.user_id, prompt.reserved_tokens, self.lane) as grant:
+            for model in self._models(grant.model):
+                parser = TaskStreamParser()
+                usage: List[Any] = []
+                try:
+                    async for chunk in self.client.stream_chat_completion(
+                        prompt.messages,
+                        model=model,
+                        temperature=0.7,
+                        max_tokens=prompt.max_tokens,
+                        response_format={"type": "json_object"},
+                        on_usage=usage.append
+                    ):
+                        for task in parser.feed(chunk):
+                            tasks.append(task)
+                            yield task
+                    # A task cut off by the token limit, or prose instead of JSON
+                    for task in parser.finish():
+                        tasks.append(task)
+                        yield task
+                    completed = parser.complete and not parser.salvaged
+                    answered_by = model
+                    self.caller.breaker.record_success()
+                    break
+                except openai.RateLimitError:
+                    if tasks:
+                        break
+                    logger.warning("Rate limited on primary model, trying fallback")
+                except Exception as e:
+                    # Streams are not retried (tasks may already be out), but
+                    # upstream failures still count towards the breaker
+                    if isinstance(e, self.caller.retryable):
+                        self.caller.breaker.record_failure()
+                    logger.error(f"Error streaming translation: {e}")
+                    break
+                finally:
+                    for item in usage:
+                        tokens = self._total_tokens(item) or 0
+                        grant.tokens_used = (grant.tokens_used or 0) + tokens
+                        self.prompts.record(prompt, item)
+                        await self._record_usage(model, item)
+
+        if not tasks:
+            for task in self._fallback_tasks(feedback_text):
+                yield task
+        elif completed and answered_by == settings.OPENAI_MODEL:
+            await self.cache.set(cache_key, tasks)
+
+    async def _call_openai(
+        self,
+        feedback_text: str,
+        prompts: Optional[PromptBuilder] = None,
+        items: int = 1
+    ) -> Tuple[str, str]:
+        """
+        Call OpenAI API through the scheduler and the resilient call wrapper
+
+        The scheduler picks the model; a rate limit error on the primary
+        still retries once on the fallback. Raises CircuitOpenError without
+        waiting for a slot while the upstream is failing.
+
+        Returns:
+            The reply's content and the model that wrote it
+        """
+        if self.caller.breaker.rejecting:
+            raise CircuitOpenError("Upstream circuit is open")
+        prompts = prompts or self.prompts
+        prompt = prompts.build(feedback_text, items)
+
+        def completion(model: str):
+            return lambda timeout: self.client.chat_completion(
+                prompt.messages,
+                model=model,
                 temperature=0.7,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
+                max_tokens=prompt.max_tokens,
+                response_format={"type": "json_object"},
+                timeout=timeout
             )
-            
-            return response.choices[0].message.content
+
+        async with self.scheduler.slot(self.user_id, prompt.reserved_tokens, self.lane) as grant:
+            model = grant.model
+            try:
+                response = await self.caller(completion(model))
+            except openai.RateLimitError:
+                if model == settings.OPENAI_FALLBACK_MODEL:
+                    raise
+                # Try fallback model if rate limited
+                logger.warning("Rate limited on primary model, trying fallback")
+                model = settings.OPENAI_FALLBACK_MODEL
+                response = await self.caller(completion(model))
+            grant.tokens_used = self._total_tokens(response.usage)
+
+        prompts.record(prompt, response.usage)
+        await self._record_usage(model, response.usage)
+        return response.choices[0].message.content, model
+
+    def _models(self, scheduled: str) -> List[str]:
+        """
+        Models to try in order: the scheduled one, then the fallback
+        """
+        if scheduled == settings.OPENAI_FALLBACK_MODEL:
+            return [scheduled]
+        return [scheduled, settings.OPENAI_FALLBACK_MODEL]
+
+    @staticmethod
+    def _total_tokens(usage: Any) -> Optional[int]:
+        tokens = usage_tokens(usage)
+        if tokens is None:
+            return None
+        return tokens["prompt_tokens"] + tokens["completion_tokens"]
+
+    async def _record_usage(self, model: str, usage: Any) -> None:
+        """
+        Queue a completion's token usage for the api_usage table
+        """
+        tokens = usage_tokens(usage)
+        if self.user_id is None or tokens is None:
+            return
+        try:
+            await self.meter.record(
+                self.user_id,
+                self.endpoint,
+                model,
+                tokens["prompt_tokens"],
+                tokens["completion_tokens"]
+            )
+        except RuntimeError as e:
+            # Meter already closed (shutdown in progress)
+            logger.warning(f"Usage not recorded: {e}")
     
     def _fallback_tasks(self, feedback_text: str) -> List[Dict]:
         """
@@ -153,3 +614,38 @@ Output:
                 "difficulty_level": "easy"
             }
         ]
+
+
+# System prompt token count is computed once; max_tokens follows the input
+translation_prompts = PromptBuilder(
+    TranslatorService.SYSTEM_PROMPT,
+    settings.OPENAI_MODEL,
+    tokens_per_task=settings.TRANSLATION_TOKENS_PER_TASK,
+    max_tasks=settings.TRANSLATION_MAX_TASKS,
+)
+
+packed_translation_prompts = PromptBuilder(
+    TranslatorService.PACKED_SYSTEM_PROMPT,
+    settings.OPENAI_MODEL,
+    tokens_per_task=settings.TRANSLATION_TOKENS_PER_TASK,
+    max_tasks=settings.TRANSLATION_MAX_TASKS,
+)
+
+
+async def _translate_window(
+    key: Tuple[UUID, UUID, bool],
+    feedback_texts: List[str]
+) -> List[List[Dict]]:
+    user_id, _project_id, use_cache = key
+    translator = TranslatorService(user_id=user_id, endpoint="/feedback/translate")
+    # Without return_exceptions every outcome is a task list
+    outcomes = await translator.translate_many(feedback_texts, use_cache=use_cache)
+    return cast(List[List[Dict]], outcomes)
+
+
+# Short /translate requests for one project that arrive within the window share a call
+translation_window = MicroBatcher(
+    _translate_window,
+    window_seconds=settings.TRANSLATION_PACK_WINDOW_MS / 1000,
+    max_items=settings.TRANSLATION_PACK_MAX_ITEMS,
+)
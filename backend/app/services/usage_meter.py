@@ -0,0 +1,214 @@
+"""
+Write-behind metering for LLM token usage
+Translations enqueue usage rows; a background task inserts them in batches
+"""
+import asyncio
+import logging
+import math
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# (prompt, completion) price in cents per 1K tokens
+MODEL_PRICES_CENTS_PER_1K = {
+    "gpt-4": (3.0, 6.0),
+    "gpt-4-turbo-preview": (1.0, 3.0),
+    "gpt-3.5-turbo": (0.05, 0.15),
+}
+
+UsageSink = Callable[[List[Dict]], Awaitable[None]]
+
+ROLLUP_PERIODS = ("hour", "day", "month")
+
+
+def usage_tokens(usage: Any) -> Optional[Dict[str, int]]:
+    """
+    Token counts from an OpenAI usage object (or the dict streamed chunks carry)
+    """
+    if usage is None:
+        return None
+    if not isinstance(usage, dict):
+        usage = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+            "completion_tokens": getattr(usage, "completion_tokens", 0),
+        }
+    return {
+        "prompt_tokens": usage.get("prompt_tokens") or 0,
+        "completion_tokens": usage.get("completion_tokens") or 0,
+    }
+
+
+def estimate_cost_cents(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[int]:
+    """
+    Cost of a completion in whole cents (rounded up), None for unknown models
+    """
+    prices = MODEL_PRICES_CENTS_PER_1K.get(model)
+    if prices is None:
+        return None
+    prompt_price, completion_price = prices
+    return math.ceil((prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000)
+
+
+def bucket_start(timestamp: datetime, period: str) -> datetime:
+    """
+    Start of the hour, day or month containing ``timestamp``
+    """
+    if period == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "month":
+        return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup period: {period}")
+
+
+def rollup_rows(rows: Iterable[Dict]) -> List[Dict]:
+    """
+    Aggregate api_usage rows into one increment per (user, period, bucket, endpoint)
+
+    Sorted by key so concurrent upserts lock rollup rows in the same order.
+    """
+    rollups: Dict[tuple, Dict] = {}
+    for row in rows:
+        for period in ROLLUP_PERIODS:
+            start = bucket_start(row["created_at"], period)
+            key = (str(row["user_id"]), period, start, row["endpoint"])
+            entry = rollups.setdefault(key, {
+                "user_id": row["user_id"],
+                "period": period,
+                "bucket_start": start,
+                "endpoint": row["endpoint"],
+                "request_count": 0,
+                "tokens_used": 0,
+                "cost_cents": 0,
+            })
+            entry["request_count"] += 1
+            entry["tokens_used"] += row["tokens_used"] or 0
+            entry["cost_cents"] += row["cost_cents"] or 0
+    return [rollups[key] for key in sorted(rollups)]
+
+
+class UsageMeter:
+    """
+    Bounded in-memory queue of api_usage rows flushed in batches
+
+    A flush runs once ``batch_size`` rows are waiting or every
+    ``flush_interval_seconds``, whichever comes first. When the sink fails
+    the batch is kept and retried on the next flush; meanwhile the queue
+    fills and ``record`` starts waiting, which is the backpressure signal
+    to callers. ``close`` stops the loop and drains everything left.
+    """
+
+    def __init__(
+        self,
+        sink: UsageSink,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 2.0,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._retry: List[Dict] = []
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.recorded = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.lost = 0
+
+    def start(self) -> None:
+        """
+        Start the background flush loop (call from the running event loop)
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def record(
+        self,
+        user_id: uuid.UUID,
+        endpoint: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+    ) -> None:
+        """
+        Queue one usage row; waits only when the queue is full
+        """
+        if self._closing:
+            raise RuntimeError("Usage meter is closed")
+        row = {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "endpoint": endpoint,
+            "tokens_used": prompt_tokens + completion_tokens,
+            "cost_cents": estimate_cost_cents(model, prompt_tokens, completion_tokens),
+            "created_at": datetime.utcnow(),
+        }
+        await self._queue.put(row)
+        self.recorded += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write everything currently queued, one batch at a time
+        """
+        while self._retry or not self._queue.empty():
+            batch, self._retry = self._retry, []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self.sink(batch)
+            except Exception as e:
+                self.flush_errors += 1
+                self._retry = batch
+                logger.error(f"Failed to write {len(batch)} usage rows, will retry: {e}")
+                return
+            self.flushes += 1
+            self.flushed += len(batch)
+
+    async def close(self, attempts: int = 3) -> None:
+        """
+        Stop the flush loop and drain the queue
+        """
+        self._closing = True
+        if self._task is not None:
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+
+        for _ in range(attempts):
+            await self.flush()
+            if not self._retry and self._queue.empty():
+                return
+
+        self.lost = len(self._retry) + self._queue.qsize()
+        logger.error(f"Dropped {self.lost} usage rows on shutdown")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for monitoring
+        """
+        return {
+            "queued": self._queue.qsize() + len(self._retry),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "lost": self.lost,
+        }
@@ -0,0 +1,91 @@
+"""
+Postgres sink for the usage meter
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.api_usage import APIUsage, APIUsageRollup
+from app.models.user import SubscriptionPlan
+from app.services.usage_meter import bucket_start, rollup_rows
+
+_rollups = APIUsageRollup.__table__
+
+_upsert_rollups = pg_insert(_rollups)
+_upsert_rollups = _upsert_rollups.on_conflict_do_update(
+    index_elements=[
+        _rollups.c.user_id, _rollups.c.period, _rollups.c.bucket_start, _rollups.c.endpoint
+    ],
+    set_={
+        "request_count": _rollups.c.request_count + _upsert_rollups.excluded.request_count,
+        "tokens_used": _rollups.c.tokens_used + _upsert_rollups.excluded.tokens_used,
+        "cost_cents": _rollups.c.cost_cents + _upsert_rollups.excluded.cost_cents,
+    }
+)
+
+
+class PostgresUsageStore:
+    """
+    Writes metered usage to ``api_usage``, one multi-row INSERT per batch
+
+    The hour/day/month rollups are upserted in the same transaction, so
+    they never count a row that was not written (or miss one that was).
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def write(self, rows: List[Dict]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(APIUsage), rows)
+            await session.execute(_upsert_rollups, rollup_rows(rows))
+            await session.commit()
+
+
+async def usage_totals(
+    db: AsyncSession,
+    user_id: UUID,
+    period: str,
+    at: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    A user's totals across endpoints for the period containing ``at``
+
+    Reads only the rollup rows under one primary-key prefix.
+    """
+    start = bucket_start(at or datetime.utcnow(), period)
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(_rollups.c.request_count), 0).label("request_count"),
+            func.coalesce(func.sum(_rollups.c.tokens_used), 0).label("tokens_used"),
+            func.coalesce(func.sum(_rollups.c.cost_cents), 0).label("cost_cents"),
+        ).where(
+            _rollups.c.user_id == user_id,
+            _rollups.c.period == period,
+            _rollups.c.bucket_start == start,
+        )
+    )
+    row = result.one()
+    return {
+        "request_count": row.request_count,
+        "tokens_used": row.tokens_used,
+        "cost_cents": row.cost_cents,
+    }
+
+
+def monthly_token_quota(plan: Optional[SubscriptionPlan]) -> Optional[int]:
+    """
+    Tokens a plan may use per calendar month (UTC), None when unlimited
+    """
+    quotas: Dict[Optional[SubscriptionPlan], int] = {
+        SubscriptionPlan.MONTHLY: settings.USAGE_QUOTA_MONTHLY_TOKENS,
+        SubscriptionPlan.PER_PROJECT: settings.USAGE_QUOTA_PER_PROJECT_TOKENS,
+        SubscriptionPlan.ENTERPRISE: settings.USAGE_QUOTA_ENTERPRISE_TOKENS,
+    }
+    quota = quotas.get(plan, settings.USAGE_QUOTA_MONTHLY_TOKENS)
+    return quota or None
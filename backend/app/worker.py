@@ -0,0 +1,55 @@
+"""
+Standalone translation job worker
+
+Claims jobs from translation_jobs alongside (or instead of) the API's
+in-process workers. Run as many as needed; SKIP LOCKED keeps them from
+taking the same job.
+
+Usage:
+    python -m app.worker --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+# Registers every model first; importing one model on its own is circular
+import app.database.base  # noqa: F401
+from app.database.session import engine
+from app.services.job_worker import translation_worker
+from app.services.translator_service import llm_client, usage_meter
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    translation_worker.concurrency = concurrency
+    usage_meter.start()
+    translation_worker.start()
+    logger.info(
+        f"Translation worker {translation_worker.worker_id} running {concurrency} jobs at a time"
+    )
+
+    await stop.wait()
+
+    logger.info("Shutting down translation worker...")
+    await translation_worker.close()
+    await usage_meter.close()
+    await llm_client.aclose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run translation jobs")
+    parser.add_argument("--concurrency", type=int, default=translation_worker.concurrency or 4)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
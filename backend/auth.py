@@ -2,8 +2,10 @@
 Authentication utilities
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
@@ -13,26 +15,72 @@ import os
 from dotenv import load_dotenv
 
 from database import get_db
+from app.database.entity_cache import EntityCache
 from models import User
 
 load_dotenv()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost are flagged by needs_update and rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+# and bounds how many hashes burn CPU at once
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    thread_name_prefix="bcrypt"
+)
 security = HTTPBearer()
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-key-change-in-production-min-32-chars")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_EXPIRATION_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
 
+# Users keyed by id; anything that changes a user row calls invalidate_user
+user_cache = EntityCache(
+    User,
+    max_entries=int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+)
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a user from the cache after changing their row"""
+    user_cache.invalidate(str(user_id))
+
+
+async def _run_hasher(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_hash_executor, func, *args)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_hasher(pwd_context.verify, plain_password, hashed_password)
+
 
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its cost is out of date
+    
+    Returns:
+        (valid, new_hash) where new_hash is None unless the stored hash should be replaced
+    """
+    return await _run_hasher(pwd_context.verify_and_update, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+
+async def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return await _run_hasher(pwd_context.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -70,8 +118,13 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    user = user_cache.get(str(user_id), db)
+    if user is not None:
+        return user
+    
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
     
+    user_cache.set(str(user_id), user)
     return user
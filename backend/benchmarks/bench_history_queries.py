@@ -0,0 +1,118 @@
+"""
+Benchmark: queries per feedback history request
+
+Seeds projects with growing histories and counts the statements each
+history request sends. The previous endpoint loaded every input and then
+the tasks of each one (one lazy load per row); the current endpoint
+returns a page with task counts from a single GROUP BY query, so its
+count stays flat as the history grows.
+
+Requires the app settings (DATABASE_URL etc.) to point at a scratch database.
+
+Usage:
+    python -m benchmarks.bench_history_queries --sizes 10 100 1000 --tasks-per-input 4
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete, event, insert, select
+
+from app.database.base import Base
+from app.database.session import engine, AsyncSessionLocal
+from app.models.user import User
+from app.models.project import Project
+from app.models.feedback import FeedbackInput, GeneratedTask
+from app.services.feedback_service import build_feedback_row, build_task_row
+from app.api.v1.endpoints.feedback import get_project_feedback_history
+
+
+class StatementCounter:
+    def __init__(self, sync_engine):
+        self.count = 0
+        event.listen(sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, *args, **kwargs):
+        self.count += 1
+
+
+async def previous_history(session, project_id, user):
+    """The previous behaviour, with the per-row lazy load made explicit"""
+    result = await session.execute(
+        select(Project).where(Project.id == project_id, Project.user_id == user.id)
+    )
+    assert result.scalar_one_or_none()
+    result = await session.execute(
+        select(FeedbackInput).where(FeedbackInput.project_id == project_id)
+    )
+    history = []
+    for feedback_input in result.scalars().all():
+        tasks = await session.execute(
+            select(GeneratedTask).where(GeneratedTask.input_id == feedback_input.id)
+        )
+        history.append({"id": str(feedback_input.id), "task_count": len(tasks.scalars().all())})
+    return history
+
+
+async def current_history(session, project_id, user):
+    response = await get_project_feedback_history(
+        project_id, cursor=None, limit=50, created_after=None, created_before=None,
+        db=session, current_user=user
+    )
+    return response["feedback_history"]
+
+
+async def seed(session, user, size: int, tasks_per_input: int):
+    project = Project(user_id=user.id, name=f"History benchmark ({size})")
+    session.add(project)
+    await session.flush()
+
+    feedback_rows = [build_feedback_row(project.id, f"feedback {i}") for i in range(size)]
+    task_rows = [
+        build_task_row(row, {"task": f"task {j}"})
+        for row in feedback_rows
+        for j in range(tasks_per_input)
+    ]
+    await session.execute(insert(FeedbackInput), feedback_rows)
+    await session.execute(insert(GeneratedTask), task_rows)
+    await session.commit()
+    return project.id
+
+
+async def main(sizes, tasks_per_input: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        user = User(email=f"bench-{uuid.uuid4()}@example.com", clerk_user_id=str(uuid.uuid4()))
+        session.add(user)
+        await session.commit()
+        project_ids = {size: await seed(session, user, size, tasks_per_input) for size in sizes}
+
+    counter = StatementCounter(engine.sync_engine)
+    print(f"{tasks_per_input} tasks per input, first page of 50 for the current endpoint")
+    for size in sizes:
+        for label, history in (("previous", previous_history), ("current", current_history)):
+            async with AsyncSessionLocal() as session:
+                counter.count = 0
+                start = time.perf_counter()
+                rows = await history(session, project_ids[size], user)
+                elapsed = time.perf_counter() - start
+            print(
+                f"  {size:>6} inputs {label:>8}: {counter.count:5d} queries, "
+                f"{len(rows):5d} rows, {elapsed * 1000:8.2f} ms"
+            )
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(User).where(User.id == user.id))
+        await session.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--tasks-per-input", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.tasks_per_input))
@@ -0,0 +1,87 @@
+"""
+Benchmark: concurrent translations against a simulated LLM
+
+Compares the old blocking OpenAI call made from inside an async handler with
+the shared async LLMClient. With the async client, N concurrent translations
+should finish in roughly one LLM latency instead of N.
+
+Usage:
+    python -m benchmarks.bench_llm_concurrency --concurrency 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from openai import OpenAI
+
+from app.services.llm_client import LLMClient
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": json.dumps({"tasks": [{"task": "Increase contrast"}]})},
+    }],
+    "usage": {"prompt_tokens": 400, "completion_tokens": 40, "total_tokens": 440},
+}
+
+MESSAGES = [{"role": "user", "content": "make it pop"}]
+
+
+async def run_blocking(concurrency: int, latency: float) -> float:
+    """The previous behaviour: a sync SDK call inside ``async def``"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        return httpx.Response(200, json=COMPLETION)
+
+    client = OpenAI(api_key="bench", http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    async def translate():
+        client.chat.completions.create(model="gpt-4", messages=MESSAGES)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(translate() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_async(concurrency: int, latency: float) -> float:
+    """The shared non-blocking client"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=COMPLETION)
+
+    client = LLMClient(
+        api_key="bench",
+        max_concurrency=concurrency,
+        transport=httpx.MockTransport(handler),
+    )
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client.chat_completion(MESSAGES, model="gpt-4") for _ in range(concurrency)
+        ))
+        return time.perf_counter() - start
+    finally:
+        await client.aclose()
+
+
+async def main(concurrency: int, latency: float) -> None:
+    blocking = await run_blocking(concurrency, latency)
+    non_blocking = await run_async(concurrency, latency)
+    print(f"{concurrency} concurrent translations, simulated LLM latency {latency:.2f}s")
+    print(f"  blocking SDK call : {blocking:6.2f}s ({blocking / latency:4.1f}x latency)")
+    print(f"  async LLMClient   : {non_blocking:6.2f}s ({non_blocking / latency:4.1f}x latency)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.latency))
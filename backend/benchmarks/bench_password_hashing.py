@@ -0,0 +1,76 @@
+"""
+Benchmark: a burst of logins and event loop responsiveness
+
+Runs N concurrent password verifications two ways: bcrypt called inline
+from the coroutine (the old behaviour) and through ``auth.verify_password``,
+which runs it on the hashing thread pool. A ticker coroutine measures how
+late the event loop wakes it up. Inline hashing blocks it for the whole
+burst; offloaded hashing should keep the lag near zero.
+
+Usage:
+    python -m benchmarks.bench_password_hashing --logins 32 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+
+async def ticker(interval: float, lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def burst(verify, logins: int) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(0.01, lags, stop))
+    await asyncio.sleep(0.02)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick
+    assert all(results)
+    return {
+        "elapsed": elapsed,
+        "logins_per_second": logins / elapsed,
+        "max_loop_lag_ms": max(lags) * 1000 if lags else 0.0,
+    }
+
+
+async def main(logins: int, rounds: int) -> None:
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)
+    import auth
+
+    password = "correct horse battery staple"
+    hashed = await auth.get_password_hash(password)
+
+    async def inline():
+        return auth.pwd_context.verify(password, hashed)
+
+    async def offloaded():
+        return await auth.verify_password(password, hashed)
+
+    print(f"{logins} concurrent logins, bcrypt cost {rounds}, "
+          f"{auth.password_hash_executor._max_workers} hashing threads")
+    for name, verify in (("inline", inline), ("thread pool", offloaded)):
+        result = await burst(verify, logins)
+        print(
+            f"{name:>12}: {result['elapsed']:.2f}s total, "
+            f"{result['logins_per_second']:.1f} logins/s, "
+            f"max event loop lag {result['max_loop_lag_ms']:.0f} ms"
+        )
+    auth.password_hash_executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.rounds))
@@ -0,0 +1,57 @@
+"""
+Benchmark: per-request overhead of the in-process rate limiter
+
+Times TokenBucketLimiter.acquire for one hot user, for requests spread
+over many users, and when the key space is larger than ``max_keys`` so
+every call also evicts. The limiter sits in front of every translate
+request, so it should cost a few microseconds at most.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter --requests 1000000 --users 100000
+"""
+import argparse
+import random
+import time
+
+from app.core.rate_limit import TokenBucketLimiter
+
+
+def run(limiter: TokenBucketLimiter, keys: list) -> float:
+    acquire = limiter.acquire
+    start = time.perf_counter()
+    for key in keys:
+        acquire(key, 20 / 60, 10)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main(requests: int, users: int) -> None:
+    rng = random.Random(7)
+    scenarios = (
+        ("one hot user", TokenBucketLimiter(), ["monthly:hot"] * requests),
+        (
+            f"{users:,} users",
+            TokenBucketLimiter(max_keys=users),
+            [f"monthly:{rng.randrange(users)}" for _ in range(requests)],
+        ),
+        (
+            f"{users:,} users, max_keys={users // 10:,}",
+            TokenBucketLimiter(max_keys=users // 10),
+            [f"monthly:{rng.randrange(users)}" for _ in range(requests)],
+        ),
+    )
+    print(f"{requests:,} acquires per scenario")
+    for label, limiter, keys in scenarios:
+        per_call = run(limiter, keys)
+        stats = limiter.stats()
+        print(
+            f"{label:>32}: {per_call * 1e6:.2f} us/request, "
+            f"{stats['limited'] / requests:.0%} limited, {stats['keys']:,} buckets"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.requests, args.users)
@@ -0,0 +1,158 @@
+"""
+Benchmark: screenshot upload throughput and memory per request
+
+Feeds large synthetic PNGs through the /feedback/screenshots ingestion
+path (stage_upload streaming to disk, then the ScreenshotProcessor pool)
+and through the naive alternative (read the whole body into memory,
+decode and resize on the event loop), CONCURRENCY uploads at a time.
+
+Reports uploads/s, MB/s, latency, the event loop's worst stall while the
+uploads run, Python heap held per in-flight request (tracemalloc) and the
+peak RSS of the pool's worker processes.
+
+Requires the app settings (DATABASE_URL etc.) to be importable; nothing
+is written to the database.
+
+Usage:
+    python -m benchmarks.bench_screenshot_upload --uploads 32 --concurrency 8 --width 4000 --height 3000
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import AsyncIterator, List
+
+from PIL import Image, ImageDraw
+
+from app.services.image_processing import ScreenshotProcessor, perceptual_hash
+from app.services.screenshot_service import stage_upload
+
+# What uvicorn hands the app per receive() on a fast connection
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_screenshot(width: int, height: int, seed: int) -> Image.Image:
+    """UI chrome plus a noisy 'photo' region, so the PNG doesn't compress to nothing."""
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, height // 12), fill=(30, 60, 140))
+    for row in range(height // 8, height, 36):
+        draw.line((80, row, rng.randint(width // 4, width - 80), row), fill=(50, 50, 50), width=5)
+    photo = Image.effect_noise((width // 2, height // 2), 64).convert("RGB")
+    image.paste(photo, (width // 4, height // 4))
+    return image
+
+
+async def body_chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+            await asyncio.sleep(0)
+
+
+async def streamed_upload(path: str, workdir: str, processor: ScreenshotProcessor) -> None:
+    staged = await stage_upload(body_chunks(path), os.path.join(workdir, "incoming"), 1 << 30)
+    await processor.process(staged.path, os.path.join(workdir, f"{os.path.basename(staged.path)}.webp"))
+    os.remove(staged.path)
+
+
+async def buffered_upload(path: str, workdir: str, max_dimension: int, quality: int) -> None:
+    body = b"".join([chunk async for chunk in body_chunks(path)])
+    with Image.open(io.BytesIO(body)) as image:
+        image = image.convert("RGB")
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    perceptual_hash(image)
+    image.save(os.path.join(workdir, f"{time.perf_counter_ns()}.webp"), "WEBP", quality=quality, method=4)
+
+
+async def loop_stalls(stop: asyncio.Event, samples: List[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        samples.append(time.perf_counter() - start - 0.005)
+
+
+async def run(label, upload, paths, concurrency) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(path):
+        async with semaphore:
+            start = time.perf_counter()
+            await upload(path)
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    stalls: List[float] = []
+    ticker = asyncio.create_task(loop_stalls(stop, stalls))
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(path) for path in paths))
+    elapsed = time.perf_counter() - start
+    _, heap_peak = tracemalloc.get_traced_memory()
+    stop.set()
+    await ticker
+
+    megabytes = sum(os.path.getsize(path) for path in paths) / 1e6
+    p95 = statistics.quantiles(latencies, n=20)[18] if len(latencies) > 1 else latencies[0]
+    print(
+        f"{label:>9}: {len(paths) / elapsed:6.2f} uploads/s {megabytes / elapsed:7.1f} MB/s  "
+        f"p50 {statistics.median(latencies) * 1000:6.0f} ms  p95 {p95 * 1000:6.0f} ms  "
+        f"loop stall max {max(stalls, default=0) * 1000:5.0f} ms  "
+        f"heap/request {heap_peak / concurrency / 1e6:6.2f} MB"
+    )
+
+
+async def main(uploads: int, concurrency: int, width: int, height: int, workers: int, max_dimension: int, quality: int) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for seed in range(min(uploads, 8)):
+            path = os.path.join(workdir, f"source-{seed}.png")
+            synthetic_screenshot(width, height, seed).save(path, compress_level=6)
+            paths.append(path)
+        paths = [paths[i % len(paths)] for i in range(uploads)]
+        average = sum(os.path.getsize(path) for path in paths) / len(paths) / 1e6
+        print(f"{uploads} uploads of {width}x{height} PNG (avg {average:.1f} MB), {concurrency} at a time")
+
+        processor = ScreenshotProcessor(workers=workers, max_dimension=max_dimension, quality=quality)
+        tracemalloc.start()
+        try:
+            await run(
+                "streamed",
+                lambda path: streamed_upload(path, workdir, processor),
+                paths, concurrency
+            )
+            processor.close()
+            # Workers have been reaped, so their high-water mark is in RUSAGE_CHILDREN (KB on Linux)
+            print(f"{'':>9}  worker peak RSS {resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024:.0f} MB")
+            await run(
+                "buffered",
+                lambda path: buffered_upload(path, workdir, max_dimension, quality),
+                paths, concurrency
+            )
+        finally:
+            tracemalloc.stop()
+            processor.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--max-dimension", type=int, default=1600)
+    parser.add_argument("--quality", type=int, default=80)
+    args = parser.parse_args()
+    asyncio.run(main(
+        args.uploads, args.concurrency, args.width, args.height,
+        args.workers, args.max_dimension, args.quality
+    ))
@@ -0,0 +1,80 @@
+"""
+Benchmark: near-duplicate lookups over a large feedback corpus
+
+Builds a SimilarityIndex over synthetic feedback, then measures lookup
+latency for paraphrases of stored inputs and for unseen text.
+
+Usage:
+    python -m benchmarks.bench_similarity_index --size 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.similarity_index import SimilarityIndex
+
+VOCABULARY = (
+    "make logo bigger bolder pop pizzazz hero header footer button cta color palette "
+    "contrast typography font headline spacing padding margin shadow gradient brand "
+    "modern clean minimal vibrant dark light image photo icon menu navigation layout "
+    "grid card section banner blue red green orange purple white black subtle strong "
+    "more less feel look fresh premium playful serious friendly corporate warm cool"
+).split()
+
+
+def synthetic_feedback(rng: random.Random) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(4, 14)))
+
+
+def paraphrase(text: str, rng: random.Random) -> str:
+    words = text.split()
+    words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return " ".join(words)
+
+
+def percentile(samples, pct):
+    return statistics.quantiles(samples, n=100)[pct - 1]
+
+
+def main(size: int, queries: int, owners: int) -> None:
+    rng = random.Random(7)
+    texts = [synthetic_feedback(rng) for _ in range(size)]
+
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    index.extend((i, text, i % owners) for i, text in enumerate(texts))
+    build = time.perf_counter() - start
+    print(f"indexed {len(index):,} inputs in {build:.1f}s ({build / size * 1e6:.1f} us/input)")
+
+    for label, make_query in (
+        ("paraphrase", lambda i: paraphrase(texts[i], rng)),
+        ("unseen", lambda i: synthetic_feedback(rng)),
+    ):
+        latencies, hits = [], 0
+        for _ in range(queries):
+            i = rng.randrange(size)
+            text = make_query(i)
+            start = time.perf_counter()
+            match = index.query(text, threshold=0.7, owner=i % owners)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            hits += match is not None
+        print(
+            f"{label:>10}: p50 {percentile(latencies, 50):7.1f} us  "
+            f"p99 {percentile(latencies, 99):7.1f} us  hit rate {hits / queries:.0%}"
+        )
+
+    # Incremental inserts including the periodic tail merge
+    start = time.perf_counter()
+    for i in range(10000):
+        index.add(size + i, synthetic_feedback(rng), owner=i % owners)
+    print(f"incremental add: {(time.perf_counter() - start) / 10000 * 1e6:.1f} us/input (amortized)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--owners", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.size, args.queries, args.owners)
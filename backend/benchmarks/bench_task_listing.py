@@ -0,0 +1,152 @@
+"""
+Benchmark: project task listing at 100k tasks
+
+Seeds one project with many tasks (plus a second project as noise), then
+compares the previous /api/projects/{project_id}/tasks implementation
+(project lookup, load every input, unbounded IN query) with the current
+keyset-paginated endpoint: the first page and a page deep in the listing.
+
+Runs against DATABASE_URL, which should point at a scratch Postgres; the
+tables are created if missing and the seeded rows are deleted afterwards.
+
+Usage:
+    python -m benchmarks.bench_task_listing --tasks 100000 --tasks-per-input 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import Response
+from sqlalchemy import delete, event, insert, select
+
+from database import Base, SessionLocal, engine
+from models import FeedbackInput, GeneratedTask, Project, User
+from main import get_tasks
+
+
+class StatementCounter:
+    def __init__(self, sync_engine):
+        self.count = 0
+        event.listen(sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed(db, project_id, tasks: int, tasks_per_input: int, started: datetime) -> None:
+    inputs, rows = [], []
+    for i in range(0, tasks, tasks_per_input):
+        input_id = uuid.uuid4()
+        created_at = started + timedelta(seconds=i)
+        inputs.append({
+            "id": input_id,
+            "project_id": project_id,
+            "original_text": f"feedback {i}",
+            "created_at": created_at,
+        })
+        rows.extend({
+            "id": uuid.uuid4(),
+            "input_id": input_id,
+            "project_id": project_id,
+            "task_description": f"task {i + j}",
+            "is_completed": (i + j) % 3 == 0,
+            "created_at": created_at,
+            "updated_at": created_at,
+        } for j in range(min(tasks_per_input, tasks - i)))
+    db.execute(insert(FeedbackInput), inputs)
+    db.execute(insert(GeneratedTask), rows)
+    db.commit()
+
+
+def previous_listing(db, project_id, user_id):
+    project = db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
+    assert project
+    feedback_inputs = db.query(FeedbackInput).filter(FeedbackInput.project_id == project_id).all()
+    input_ids = [fi.id for fi in feedback_inputs]
+    return db.query(GeneratedTask).filter(
+        GeneratedTask.input_id.in_(input_ids)
+    ).order_by(GeneratedTask.created_at.desc()).all()
+
+
+async def current_page(db, project_id, user, cursor=None, limit=100):
+    response = Response()
+    tasks = await get_tasks(
+        str(project_id), response, cursor=cursor, limit=limit, is_completed=None,
+        current_user=user, db=db
+    )
+    return tasks, response.headers.get("X-Next-Cursor")
+
+
+async def timed(label, counter, runs, func) -> None:
+    samples, statements, rows = [], 0, 0
+    for _ in range(runs):
+        before = counter.count
+        started = time.perf_counter()
+        page, _ = await func()
+        rows = len(page)
+        samples.append(time.perf_counter() - started)
+        statements = counter.count - before
+    print(f"{label:>20}: p50 {statistics.median(samples) * 1000:8.1f} ms, "
+          f"{statements} statements, {rows} rows")
+
+
+def cleanup(db, user_id, project_ids) -> None:
+    input_ids = select(FeedbackInput.id).where(FeedbackInput.project_id.in_(project_ids))
+    db.execute(delete(GeneratedTask).where(GeneratedTask.input_id.in_(input_ids)))
+    db.execute(delete(FeedbackInput).where(FeedbackInput.project_id.in_(project_ids)))
+    db.execute(delete(Project).where(Project.id.in_(project_ids)))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+
+
+async def main(tasks: int, tasks_per_input: int, runs: int) -> None:
+    Base.metadata.create_all(engine)
+    counter = StatementCounter(engine)
+
+    with SessionLocal() as db:
+        user = User(email=f"bench-{uuid.uuid4()}@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        project = Project(user_id=user.id, name="bench")
+        noise = Project(user_id=user.id, name="noise")
+        db.add_all([project, noise])
+        db.commit()
+        user_id, project_id, noise_id = user.id, project.id, noise.id
+
+        try:
+            started = datetime(2024, 1, 1)
+            seed(db, project_id, tasks, tasks_per_input, started)
+            seed(db, noise_id, tasks // 2, tasks_per_input, started)
+            print(f"Seeded {tasks} tasks ({tasks_per_input} per input) "
+                  f"plus {tasks // 2} in another project")
+
+            async def previous():
+                rows = previous_listing(db, project_id, user_id)
+                db.expunge_all()
+                return rows, None
+
+            # Walk halfway through the listing for a deep cursor
+            middle_cursor = None
+            for _ in range(tasks // 200):
+                _, middle_cursor = await current_page(db, project_id, user, middle_cursor)
+
+            await timed("previous (all rows)", counter, runs, previous)
+            await timed("keyset first page", counter, runs,
+                        lambda: current_page(db, project_id, user))
+            await timed("keyset middle page", counter, runs,
+                        lambda: current_page(db, project_id, user, middle_cursor))
+        finally:
+            db.rollback()
+            cleanup(db, user_id, [project_id, noise_id])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--tasks-per-input", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.tasks_per_input, args.runs))
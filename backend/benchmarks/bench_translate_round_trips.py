@@ -0,0 +1,112 @@
+"""
+Benchmark: database round trips per translation
+
+Replays the previous /api/v1/feedback/translate persistence sequence
+(commit, refresh, add tasks, commit, refresh per task) and the current
+save_feedback_with_tasks path against Postgres, counting BEGIN, every
+statement and COMMIT each one sends.
+
+Requires the app settings (DATABASE_URL etc.) to point at a scratch database.
+
+Usage:
+    python -m benchmarks.bench_translate_round_trips --tasks 5 --iterations 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event
+
+from app.database.base import Base
+from app.database.session import engine, AsyncSessionLocal
+from app.models.user import User
+from app.models.project import Project
+from app.models.feedback import FeedbackInput, GeneratedTask, SourceType
+from app.services.feedback_service import (
+    build_feedback_row,
+    build_task_row,
+    save_feedback_with_tasks,
+)
+
+FEEDBACK = "make the logo bigger and add pizzazz"
+
+
+class RoundTripCounter:
+    def __init__(self, sync_engine):
+        self.count = 0
+        for name in ("begin", "before_cursor_execute", "commit"):
+            event.listen(sync_engine, name, self._record)
+
+    def _record(self, *args, **kwargs):
+        self.count += 1
+
+
+async def previous_flow(session, project_id, tasks_data):
+    feedback_input = FeedbackInput(
+        project_id=project_id,
+        original_text=FEEDBACK,
+        source_type=SourceType.TEXT
+    )
+    session.add(feedback_input)
+    await session.commit()
+    await session.refresh(feedback_input)
+
+    tasks = []
+    for task_data in tasks_data:
+        task = GeneratedTask(
+            input_id=feedback_input.id,
+            project_id=project_id,
+            task_description=task_data["task"]
+        )
+        session.add(task)
+        tasks.append(task)
+    await session.commit()
+    for task in tasks:
+        await session.refresh(task)
+
+
+async def current_flow(session, project_id, tasks_data):
+    feedback_row = build_feedback_row(project_id, FEEDBACK)
+    task_rows = [build_task_row(feedback_row, task_data) for task_data in tasks_data]
+    await save_feedback_with_tasks(session, [feedback_row], task_rows)
+
+
+async def main(task_count: int, iterations: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    tasks_data = [{"task": f"Task {i}"} for i in range(task_count)]
+    async with AsyncSessionLocal() as session:
+        user = User(email=f"bench-{uuid.uuid4()}@example.com", clerk_user_id=str(uuid.uuid4()))
+        project = Project(user=user, name="Round trip benchmark")
+        session.add_all([user, project])
+        await session.commit()
+        project_id, user_id = project.id, user.id
+
+    counter = RoundTripCounter(engine.sync_engine)
+    print(f"{task_count} tasks per translation, {iterations} iterations")
+    for label, flow in (("previous", previous_flow), ("current", current_flow)):
+        counter.count = 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            async with AsyncSessionLocal() as session:
+                await flow(session, project_id, tasks_data)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {label:>8}: {counter.count / iterations:5.1f} round trips, "
+            f"{elapsed / iterations * 1000:6.2f} ms per translation"
+        )
+
+    async with AsyncSessionLocal() as session:
+        await session.delete(await session.get(User, user_id))
+        await session.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.iterations))
@@ -0,0 +1,216 @@
+"""
+Local stand-in for the OpenAI chat completions API
+
+Serves /v1/chat/completions (plain and streamed) with a lognormal latency
+distribution and configurable rates of 500s, 429s and malformed content
+(fenced JSON, a bare array, prose, or output cut off mid-object), so the
+translate pipeline can be load tested without paying for or waiting on
+the real API. Point OPENAI_BASE_URL at it.
+
+Usage:
+    python -m benchmarks.fake_openai --port 8900 --latency-ms 800 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+TASKS = [
+    "Increase the headline contrast ratio to at least 7:1",
+    "Replace the muted blue (#94A3B8) with a vibrant accent (#3B82F6)",
+    "Add a 0px 4px 6px rgba(0, 0, 0, 0.1) drop shadow to the primary CTA",
+    "Scale the logo up by 15% in the hero section",
+    "Increase section padding from 24px to 40px",
+    "Swap the headline font for a heavier display weight",
+]
+
+MALFORMED_KINDS = ("fenced", "array", "prose", "truncated")
+
+
+class FakeBehaviour:
+    """
+    Knobs for the fake server; every response samples from them independently
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_sigma: float = 0.4,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        stream_chunk_chars: int = 12,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.stream_chunk_chars = stream_chunk_chars
+        self.rng = random.Random(seed)
+
+    def latency(self) -> float:
+        """
+        Seconds for one completion; ``latency_ms`` is the median
+        """
+        return self.latency_ms / 1000 * math.exp(self.rng.gauss(0, self.latency_sigma))
+
+    def content(self) -> str:
+        tasks = [
+            {
+                "task": task,
+                "estimated_time_minutes": self.rng.choice((5, 10, 15, 30, 60)),
+                "difficulty_level": self.rng.choice(("easy", "medium", "hard")),
+            }
+            for task in self.rng.sample(TASKS, self.rng.randint(2, 5))
+        ]
+        body = json.dumps({"tasks": tasks}, indent=2)
+        if self.rng.random() >= self.malformed_rate:
+            return body
+
+        kind = self.rng.choice(MALFORMED_KINDS)
+        if kind == "fenced":
+            return f"Here are the tasks:\n```json\n{body}\n```"
+        if kind == "array":
+            return json.dumps(tasks)
+        if kind == "prose":
+            return "\n".join(task["task"] for task in tasks)
+        return body[: self.rng.randint(len(body) // 3, len(body) - 2)]
+
+
+def _usage(messages: List[Dict], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(len(message.get("content") or "") for message in messages) // 4
+    completion_tokens = max(len(content) // 4, 1)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _error(status: int, message: str, kind: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": kind, "code": None}}
+    )
+
+
+def create_app(behaviour: FakeBehaviour) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    app.state.behaviour = behaviour
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        app.state.requests += 1
+        roll = behaviour.rng.random()
+        if roll < behaviour.error_rate:
+            await asyncio.sleep(behaviour.latency() / 4)
+            return _error(500, "The server had an error processing your request", "server_error")
+        if roll < behaviour.error_rate + behaviour.rate_limit_rate:
+            return _error(429, "Rate limit reached for requests", "requests")
+
+        model = payload.get("model", "gpt-4")
+        messages = payload.get("messages", [])
+        content = behaviour.content()
+        usage = _usage(messages, content)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        latency = behaviour.latency()
+
+        if not payload.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }],
+                "usage": usage,
+            }
+
+        include_usage = (payload.get("stream_options") or {}).get("include_usage", False)
+        chunks = [
+            content[i:i + behaviour.stream_chunk_chars]
+            for i in range(0, len(content), behaviour.stream_chunk_chars)
+        ]
+
+        async def events() -> AsyncIterator[str]:
+            # A third of the latency before the first token, the rest spread over the chunks
+            await asyncio.sleep(latency / 3)
+            per_chunk = latency * 2 / 3 / max(len(chunks), 1)
+            for text in chunks:
+                yield _sse(completion_id, model, {"content": text}, None)
+                await asyncio.sleep(per_chunk)
+            yield _sse(completion_id, model, {}, "stop")
+            if include_usage:
+                yield "data: " + json.dumps({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }) + "\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+
+def _sse(completion_id: str, model: str, delta: Dict, finish_reason: Optional[str]) -> str:
+    return "data: " + json.dumps({
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }) + "\n\n"
+
+
+def add_behaviour_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="median completion latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="lognormal spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="fraction of malformed content")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def behaviour_from_args(args: argparse.Namespace) -> FakeBehaviour:
+    return FakeBehaviour(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(behaviour_from_args(args)), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,314 @@
+"""
+Load test: feedback translation against a local fake OpenAI
+
+Drives the legacy app (main.py, POST /api/translate) and/or app.main
+(POST /api/v1/feedback/translate, /translate/stream or /translate/batch)
+in process through httpx's ASGI transport. Model calls go to
+benchmarks.fake_openai, started in a subprocess unless --fake-url is given.
+Reports throughput, p50/p95/p99 latency, status codes, DB pool usage and
+event loop lag. Save a run with --json and pass it back as --baseline on
+the next run to print the change for every metric.
+
+Runs against DATABASE_URL, which should point at a scratch Postgres; a
+load-test user and project are created per app and deleted afterwards.
+Rate limiting and usage quotas are switched off unless --keep-limits.
+
+Usage:
+    python -m benchmarks.load_test --app both --requests 500 --concurrency 50
+    python -m benchmarks.load_test --app app --endpoint stream --json before.json
+    python -m benchmarks.load_test --app app --endpoint stream --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_openai import add_behaviour_arguments
+
+PHRASES = (
+    "make it pop", "the logo should be bigger", "needs more pizzazz",
+    "feels too corporate", "can the header breathe a bit more", "make the CTA stand out",
+    "colors feel off", "it looks dated", "make it feel premium", "too busy on mobile",
+)
+
+APP_PATHS = {
+    "translate": "/api/v1/feedback/translate",
+    "stream": "/api/v1/feedback/translate/stream",
+    "batch": "/api/v1/feedback/translate/batch",
+}
+
+
+class Target(NamedTuple):
+    app: object
+    path: str
+    headers: Dict[str, str]
+    body: Callable[[str], Dict]
+    pool_stats: object
+
+
+def feedback_text(rng: random.Random, index: int) -> str:
+    # Unique text per request so neither cache tier nor the similarity index answers it
+    return f"{rng.choice(PHRASES)}, {rng.choice(PHRASES)} (#{index} {uuid.uuid4().hex[:8]})"
+
+
+def percentile(samples: List[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100)[pct - 1]
+
+
+@asynccontextmanager
+async def legacy_target(args) -> AsyncIterator[Target]:
+    from auth import create_access_token
+    from database import SessionLocal, pool_stats
+    from main import app
+    from models import Project, User
+
+    with SessionLocal() as db:
+        user = User(
+            email=f"load-{uuid.uuid4()}@example.com",
+            password_hash="x",
+            subscription_status="active"
+        )
+        db.add(user)
+        db.flush()
+        project = Project(user_id=user.id, name="Load test")
+        db.add(project)
+        db.commit()
+        user_id, project_id = user.id, project.id
+
+    token = create_access_token({"sub": str(user_id)})
+    try:
+        yield Target(
+            app=app,
+            path="/api/translate",
+            headers={"Authorization": f"Bearer {token}"},
+            body=lambda text: {"project_id": str(project_id), "feedback_text": text, "bypass_cache": True},
+            pool_stats=pool_stats,
+        )
+    finally:
+        with SessionLocal() as db:
+            db.query(User).filter(User.id == user_id).delete()
+            db.commit()
+
+
+@asynccontextmanager
+async def app_target(args) -> AsyncIterator[Target]:
+    from sqlalchemy import delete
+
+    from app.database.session import AsyncSessionLocal, pool_stats
+    from app.main import app
+    from app.models.project import Project
+    from app.models.user import SubscriptionPlan, SubscriptionStatus, User
+    from app.services.auth_service import get_current_user
+
+    async with app.router.lifespan_context(app):
+        async with AsyncSessionLocal() as db:
+            user = User(
+                email=f"load-{uuid.uuid4()}@example.com",
+                clerk_user_id=f"load-{uuid.uuid4()}",
+                subscription_status=SubscriptionStatus.ACTIVE,
+                subscription_plan=SubscriptionPlan.MONTHLY,
+            )
+            db.add(user)
+            await db.flush()
+            project = Project(user_id=user.id, name="Load test")
+            db.add(project)
+            await db.commit()
+
+        # Clerk verification is out of scope here; every request is this user
+        app.dependency_overrides[get_current_user] = lambda: user
+
+        def body(text: str) -> Dict:
+            if args.endpoint == "batch":
+                return {
+                    "project_id": str(project.id),
+                    "items": [{"input_text": f"{text} [{i}]"} for i in range(args.batch_size)],
+                    "bypass_cache": True,
+                }
+            return {"project_id": str(project.id), "input_text": text, "bypass_cache": True}
+
+        try:
+            yield Target(
+                app=app,
+                path=APP_PATHS[args.endpoint],
+                headers={},
+                body=body,
+                pool_stats=pool_stats,
+            )
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(User).where(User.id == user.id))
+                await db.commit()
+
+
+async def ticker(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def drive(target: Target, requests: int, concurrency: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    lags: List[float] = []
+    stop = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=target.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=300) as client:
+        async def one(index: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        target.path,
+                        json=target.body(feedback_text(rng, index)),
+                        headers=target.headers
+                    )
+                    statuses[response.status_code] += 1
+                except Exception as e:
+                    statuses[type(e).__name__] += 1
+                    return
+                latencies.append(time.perf_counter() - started)
+
+        tick = asyncio.create_task(ticker(0.01, lags, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await tick
+
+    pool = target.pool_stats.snapshot()
+    ok = sum(count for status, count in statuses.items() if status == 200)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "error_rate": round(1 - ok / requests, 4),
+        "pool_peak_checked_out": pool["peak_checked_out"],
+        "pool_long_holds": pool["long_holds"],
+        "pool_max_hold_ms": pool["max_hold_ms"],
+        "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lags, default=0.0) * 1000, 2),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_openai(args) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    command = [
+        sys.executable, "-m", "benchmarks.fake_openai", "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--latency-sigma", str(args.latency_sigma),
+        "--error-rate", str(args.error_rate), "--rate-limit-rate", str(args.rate_limit_rate),
+        "--malformed-rate", str(args.malformed_rate),
+    ]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    process = subprocess.Popen(command)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{url}/stats", timeout=0.5)
+            return process, f"{url}/v1"
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake OpenAI server did not start")
+
+
+def configure_environment(fake_url: str, keep_limits: bool) -> None:
+    # Must run before either app is imported: both read settings at import time
+    os.environ["OPENAI_BASE_URL"] = fake_url
+    os.environ["OPENAI_API_KEY"] = "load-test"
+    if not keep_limits:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+        for plan in ("MONTHLY", "PER_PROJECT", "ENTERPRISE"):
+            os.environ[f"USAGE_QUOTA_{plan}_TOKENS"] = "0"
+
+
+def print_report(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]]) -> None:
+    for name, result in results.items():
+        print(f"\n{name}: {result['requests']} requests, concurrency {result['concurrency']}")
+        before = (baseline or {}).get(name, {})
+        for metric, value in result.items():
+            if metric in ("requests", "concurrency"):
+                continue
+            line = f"  {metric:>24}: {value}"
+            previous = before.get(metric)
+            if isinstance(value, (int, float)) and isinstance(previous, (int, float)) and previous:
+                line += f"  (baseline {previous}, {(value - previous) / previous:+.1%})"
+            print(line)
+
+
+async def main(args) -> None:
+    fake_process = None
+    fake_url = args.fake_url
+    if fake_url is None:
+        fake_process, fake_url = start_fake_openai(args)
+    configure_environment(fake_url, args.keep_limits)
+
+    targets = {"legacy": legacy_target, "app": app_target}
+    names = list(targets) if args.app == "both" else [args.app]
+    results = {}
+    try:
+        for name in names:
+            async with targets[name](args) as target:
+                # Warm connections and code paths outside the measured run
+                await drive(target, min(args.concurrency, 10), min(args.concurrency, 10), args.seed or 0)
+                label = name if name == "legacy" else f"app/{args.endpoint}"
+                results[label] = await drive(target, args.requests, args.concurrency, args.seed or 0)
+    finally:
+        if fake_process is not None:
+            fake_process.terminate()
+            fake_process.wait()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", choices=("legacy", "app", "both"), default="both")
+    parser.add_argument("--endpoint", choices=tuple(APP_PATHS), default="translate")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--fake-url", default=None, help="use a running fake server (…/v1)")
+    parser.add_argument("--keep-limits", action="store_true", help="leave rate limits and quotas on")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    parser.add_argument("--baseline", default=None, help="compare with a previous --json file")
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -27,6 +27,11 @@ CREATE TABLE projects (
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     name VARCHAR(255) NOT NULL,
     description TEXT,
+    -- Denormalized counters kept current by the API (rebuild with app.services.project_counters)
+    feedback_count INTEGER NOT NULL DEFAULT 0,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    completed_task_count INTEGER NOT NULL DEFAULT 0,
+    last_feedback_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -47,6 +52,8 @@ CREATE TABLE feedback_inputs (
 CREATE TABLE generated_tasks (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     input_id UUID NOT NULL REFERENCES feedback_inputs(id) ON DELETE CASCADE,
+    -- Copied from the feedback input so project-wide task listings need no join
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
     task_description TEXT NOT NULL,
     is_completed BOOLEAN DEFAULT FALSE,
     estimated_time_minutes INTEGER,
@@ -65,6 +72,56 @@ CREATE TABLE api_usage (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- api_usage pre-aggregated per hour/day/month, maintained by the usage meter
+CREATE TABLE api_usage_rollups (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    period VARCHAR(8) NOT NULL CHECK (period IN ('hour', 'day', 'month')),
+    bucket_start TIMESTAMP NOT NULL,
+    endpoint VARCHAR(255) NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    tokens_used INTEGER NOT NULL DEFAULT 0,
+    cost_cents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, period, bucket_start, endpoint)
+);
+
+-- Shared translation cache (optional second tier behind the in-process LRU)
+CREATE TABLE translation_cache (
+    key VARCHAR(64) PRIMARY KEY,
+    value JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Token buckets shared between API workers (optional, RATE_LIMIT_SHARED)
+CREATE TABLE rate_limit_buckets (
+    key VARCHAR(255) PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    allowed BOOLEAN NOT NULL
+);
+
+-- Background translation jobs, claimed by workers with FOR UPDATE SKIP LOCKED
+CREATE TABLE translation_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    input_text TEXT NOT NULL,
+    bypass_cache BOOLEAN NOT NULL DEFAULT FALSE,
+    callback_url VARCHAR(2048),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    locked_until TIMESTAMP,
+    worker_id VARCHAR(255),
+    -- Deferred: a worker marks the job done before inserting its feedback row
+    feedback_id UUID REFERENCES feedback_inputs(id) ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED,
+    error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    callback_sent_at TIMESTAMP
+);
+
 -- ================================================
 -- Indexes for performance
 -- ================================================
@@ -74,9 +131,13 @@ CREATE INDEX idx_users_clerk_id ON users(clerk_user_id);
 CREATE INDEX idx_users_stripe_id ON users(stripe_customer_id);
 CREATE INDEX idx_projects_user_id ON projects(user_id);
 CREATE INDEX idx_feedback_inputs_project_id ON feedback_inputs(project_id);
+CREATE INDEX idx_feedback_inputs_project_created ON feedback_inputs(project_id, created_at, id);
 CREATE INDEX idx_generated_tasks_input_id ON generated_tasks(input_id);
-CREATE INDEX idx_api_usage_user_id ON api_usage(user_id);
+CREATE INDEX idx_generated_tasks_project_created ON generated_tasks(project_id, created_at, id);
+CREATE INDEX idx_api_usage_user_created ON api_usage(user_id, created_at);
 CREATE INDEX idx_api_usage_created_at ON api_usage(created_at);
+CREATE INDEX idx_translation_cache_expires_at ON translation_cache(expires_at);
+CREATE INDEX idx_translation_jobs_status_run_after ON translation_jobs(status, run_after);
 
 -- ================================================
 -- Updated_at trigger function
@@ -3,22 +3,30 @@ FeedbackFix Backend API
 FastAPI application for translating client feedback into actionable design tasks
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
 import os
+import uuid
 from dotenv import load_dotenv
 
-from database import engine, get_db, Base
+from database import engine, get_db, Base, pool_stats
 from models import User, Project, FeedbackInput, GeneratedTask
 from schemas import (
     UserCreate, UserResponse, ProjectCreate, ProjectResponse,
     FeedbackInputCreate, TaskResponse, TranslateRequest, TranslateResponse
 )
-from auth import get_current_user, create_access_token, verify_password, get_password_hash
-from services.translate_service import translate_feedback
+from auth import (
+    user_cache, invalidate_user, get_current_user, create_access_token,
+    verify_and_update_password, get_password_hash, password_hash_executor
+)
+from services.translate_service import translate_feedback, translation_cache, translation_prompts, model_call, client as llm_client
 from services.stripe_service import create_checkout_session
+from app.core.pagination import encode_cursor, decode_cursor
 
 load_dotenv()
 
@@ -39,11 +47,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 security = HTTPBearer()
 
 
+@app.on_event("shutdown")
+async def close_llm_client():
+    """Release the shared OpenAI connection pool and password hashing threads"""
+    await llm_client.aclose()
+    password_hash_executor.shutdown(wait=False)
+
+
 @app.get("/")
 async def root():
     return {
@@ -53,6 +69,18 @@ async def root():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Internal performance counters"""
+    return {
+        "translation_cache": translation_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "db_pool": pool_stats.snapshot(),
+        "llm_resilience": model_call.stats(),
+        "llm_prompts": translation_prompts.stats()
+    }
+
+
 @app.post("/api/auth/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
@@ -65,7 +93,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     new_user = User(
         email=user_data.email,
         password_hash=hashed_password
@@ -86,12 +114,25 @@ async def login(user_data: UserCreate, db: Session = Depends(get_db)):
     """Login user and return access token"""
     user = db.query(User).filter(User.email == user_data.email).first()
     
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+    
+    valid, new_hash = await verify_and_update_password(user_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # BCRYPT_ROUNDS changed since this hash was made
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+        invalidate_user(user.id)
+    
     access_token = create_access_token(data={"sub": str(user.id)})
     
     return {
@@ -123,9 +164,22 @@ async def get_projects(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all projects for the current user"""
+    """Get all projects for the current user, with stats from the project counters"""
     projects = db.query(Project).filter(Project.user_id == current_user.id).all()
-    return [ProjectResponse(id=str(p.id), name=p.name, created_at=p.created_at) for p in projects]
+    
+    def completion_percentage(p: Project) -> float:
+        return round(p.completed_task_count / p.task_count * 100, 1) if p.task_count else 0.0
+    
+    return [ProjectResponse(
+        id=str(p.id),
+        name=p.name,
+        created_at=p.created_at,
+        feedback_count=p.feedback_count,
+        task_count=p.task_count,
+        completed_task_count=p.completed_task_count,
+        completion_percentage=completion_percentage(p),
+        last_feedback_at=p.last_feedback_at
+    ) for p in projects]
 
 
 @app.post("/api/projects", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
@@ -179,76 +233,118 @@ async def translate_feedback_endpoint(
             detail="Project not found"
         )
     
-    # Save feedback input
-    feedback_input = FeedbackInput(
-        project_id=request.project_id,
-        original_text=request.feedback_text
-    )
-    db.add(feedback_input)
+    # End the read transaction so the pooled connection is not held during the LLM call
     db.commit()
-    db.refresh(feedback_input)
     
     # Translate feedback using AI
     try:
-        tasks = await translate_feedback(request.feedback_text)
+        tasks = await translate_feedback(request.feedback_text, use_cache=not request.bypass_cache)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Translation failed: {str(e)}"
         )
     
-    # Save generated tasks
-    task_responses = []
-    for task_text in tasks:
-        task = GeneratedTask(
+    # Save the input and its tasks in one commit; ids are generated client-side
+    # so the response never depends on a flush or refresh
+    feedback_input = FeedbackInput(
+        id=uuid.uuid4(),
+        project_id=request.project_id,
+        original_text=request.feedback_text,
+        created_at=datetime.utcnow()
+    )
+    generated_tasks = [
+        GeneratedTask(
+            id=uuid.uuid4(),
             input_id=feedback_input.id,
-            task_description=task_text
+            project_id=feedback_input.project_id,
+            task_description=task_text,
+            is_completed=False
         )
-        db.add(task)
-        task_responses.append(TaskResponse(
+        for task_text in tasks
+    ]
+    # Built before commit: the session expires attributes on commit
+    response = TranslateResponse(
+        feedback_input_id=str(feedback_input.id),
+        tasks=[TaskResponse(
             id=str(task.id),
             task_description=task.task_description,
             is_completed=task.is_completed
-        ))
-    
+        ) for task in generated_tasks]
+    )
+    db.add(feedback_input)
+    db.add_all(generated_tasks)
+    # Project counters move in the same transaction as the rows they count
+    db.query(Project).filter(Project.id == request.project_id).update({
+        Project.feedback_count: Project.feedback_count + 1,
+        Project.task_count: Project.task_count + len(generated_tasks),
+        Project.last_feedback_at: func.greatest(Project.last_feedback_at, feedback_input.created_at)
+    }, synchronize_session=False)
     db.commit()
     
-    return TranslateResponse(
-        feedback_input_id=str(feedback_input.id),
-        tasks=task_responses
-    )
+    return response
 
 
 @app.get("/api/projects/{project_id}/tasks", response_model=list[TaskResponse])
 async def get_tasks(
     project_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    is_completed: Optional[bool] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all tasks for a project"""
-    # Verify project belongs to user
-    project = db.query(Project).filter(
-        Project.id == project_id,
+    """
+    Get a page of tasks for a project, newest first
+    
+    One query per page, walking idx_generated_tasks_project_created. When
+    there are more tasks, the X-Next-Cursor response header holds the
+    cursor for the next page.
+    """
+    query = db.query(GeneratedTask).join(
+        Project, GeneratedTask.project_id == Project.id
+    ).filter(
+        GeneratedTask.project_id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    )
     
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
+    if is_completed is not None:
+        query = query.filter(GeneratedTask.is_completed == is_completed)
+    
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(
+            tuple_(GeneratedTask.created_at, GeneratedTask.id) < (cursor_created_at, cursor_id)
         )
     
-    # Get all feedback inputs for this project
-    feedback_inputs = db.query(FeedbackInput).filter(
-        FeedbackInput.project_id == project_id
-    ).all()
+    # One extra row tells us whether there is a next page
+    tasks = query.order_by(
+        GeneratedTask.created_at.desc(),
+        GeneratedTask.id.desc()
+    ).limit(limit + 1).all()
     
-    input_ids = [fi.id for fi in feedback_inputs]
+    if not tasks and not cursor:
+        # Only an empty first page needs the ownership check on its own
+        project = db.query(Project.id).filter(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        ).first()
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
     
-    # Get all tasks for these inputs
-    tasks = db.query(GeneratedTask).filter(
-        GeneratedTask.input_id.in_(input_ids)
-    ).order_by(GeneratedTask.created_at.desc()).all()
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(tasks[-1].created_at, tasks[-1].id)
     
     return [TaskResponse(
         id=str(t.id),
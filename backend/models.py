@@ -2,7 +2,7 @@
 SQLAlchemy database models
 """
 
-from sqlalchemy import Column, String, Text, Boolean, ForeignKey, TIMESTAMP, CheckConstraint
+from sqlalchemy import Column, String, Text, Boolean, Integer, ForeignKey, TIMESTAMP, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -47,6 +47,12 @@ class Project(Base):
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Denormalized counters, updated in the same transaction as feedback inserts
+    feedback_count = Column(Integer, default=0, server_default="0", nullable=False)
+    task_count = Column(Integer, default=0, server_default="0", nullable=False)
+    completed_task_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_feedback_at = Column(TIMESTAMP, nullable=True)
+    
     # Relationships
     user = relationship("User", back_populates="projects")
     feedback_inputs = relationship("FeedbackInput", back_populates="project", cascade="all, delete-orphan")
@@ -70,6 +76,8 @@ class GeneratedTask(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     input_id = Column(UUID(as_uuid=True), ForeignKey("feedback_inputs.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Copied from the feedback input so project-wide task listings need no join
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     task_description = Column(Text, nullable=False)
     is_completed = Column(Boolean, default=False, nullable=False)
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
@@ -77,3 +85,8 @@ class GeneratedTask(Base):
     
     # Relationships
     feedback_input = relationship("FeedbackInput", back_populates="generated_tasks")
+    
+    __table_args__ = (
+        # Backs the project task listing: keyset on (created_at, id) within a project
+        Index("idx_generated_tasks_project_created", "project_id", "created_at", "id"),
+    )
@@ -31,6 +31,11 @@ class ProjectResponse(BaseModel):
     id: str
     name: str
     created_at: datetime
+    feedback_count: int = 0
+    task_count: int = 0
+    completed_task_count: int = 0
+    completion_percentage: float = 0.0
+    last_feedback_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -54,6 +59,7 @@ class TaskResponse(BaseModel):
 class TranslateRequest(BaseModel):
     project_id: str
     feedback_text: str
+    bypass_cache: bool = False
 
 
 class TranslateResponse(BaseModel):
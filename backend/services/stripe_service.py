@@ -10,6 +10,7 @@ from fastapi import HTTPException, status
 from typing import Optional
 
 from models import User
+from auth import invalidate_user
 
 load_dotenv()
 
@@ -55,6 +56,7 @@ async def create_checkout_session(user_id: str, user_email: str, db: Session) ->
             customer_id = customer.id
             user.stripe_customer_id = customer_id
             db.commit()
+            invalidate_user(user_id)
         
         # Create checkout session
         session = stripe.checkout.Session.create(
@@ -122,6 +124,7 @@ async def handle_webhook(event_data: dict) -> dict:
                     user.stripe_customer_id = customer_id
                     user.subscription_status = "active"
                     db.commit()
+                    invalidate_user(user.id)
         
         elif event_type == "customer.subscription.updated":
             # Subscription status changed
@@ -142,6 +145,7 @@ async def handle_webhook(event_data: dict) -> dict:
             if user:
                 user.subscription_status = mapped_status
                 db.commit()
+                invalidate_user(user.id)
         
         elif event_type == "customer.subscription.deleted":
             # Subscription canceled
@@ -150,6 +154,7 @@ async def handle_webhook(event_data: dict) -> dict:
             if user:
                 user.subscription_status = "canceled"
                 db.commit()
+                invalidate_user(user.id)
         
         elif event_type == "invoice.payment_succeeded":
             # Payment successful
@@ -158,6 +163,7 @@ async def handle_webhook(event_data: dict) -> dict:
             if user:
                 user.subscription_status = "active"
                 db.commit()
+                invalidate_user(user.id)
         
         elif event_type == "invoice.payment_failed":
             # Payment failed
@@ -166,6 +172,7 @@ async def handle_webhook(event_data: dict) -> dict:
             if user:
                 user.subscription_status = "past_due"
                 db.commit()
+                invalidate_user(user.id)
         
         return {"status": "success"}
         
@@ -3,14 +3,52 @@ AI-powered feedback translation service
 Translates vague client feedback into actionable design tasks
 """
 
-from openai import OpenAI
 import os
-import json
+import logging
+import openai
 from dotenv import load_dotenv
 
+from app.services.llm_client import LLMClient
+from app.services.prompt_builder import PromptBuilder
+from app.services.resilience import CircuitBreaker, CircuitOpenError, ResilientCall
+from app.services.task_parser import TaskStreamParser
+from app.services.translation_cache import TranslationCache, translation_cache_key
+
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
+
+client = LLMClient(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=os.getenv("OPENAI_BASE_URL"),
+    timeout_seconds=float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30")),
+    max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "16")),
+    max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "32")),
+)
+
+model_call = ResilientCall(
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("OPENAI_BREAKER_FAILURE_THRESHOLD", "5")),
+        reset_seconds=float(os.getenv("OPENAI_BREAKER_RESET_SECONDS", "30")),
+    ),
+    retryable=(openai.APIConnectionError, openai.InternalServerError),
+    attempts=int(os.getenv("OPENAI_RETRY_ATTEMPTS", "3")),
+    base_delay_seconds=float(os.getenv("OPENAI_RETRY_BASE_DELAY_SECONDS", "0.5")),
+    max_delay_seconds=float(os.getenv("OPENAI_RETRY_MAX_DELAY_SECONDS", "8")),
+    deadline_seconds=float(os.getenv("OPENAI_DEADLINE_SECONDS", "45")),
+    hedge_percentile=float(os.getenv("OPENAI_HEDGE_PERCENTILE")) if os.getenv("OPENAI_HEDGE_PERCENTILE") else None,
+    hedge_min_samples=int(os.getenv("OPENAI_HEDGE_MIN_SAMPLES", "50")),
+)
+
+TRANSLATION_MODEL = "gpt-4"
+
+# Bump whenever TRANSLATION_SYSTEM_PROMPT changes so cached translations are not reused
+PROMPT_VERSION = "legacy-v1"
+
+translation_cache = TranslationCache(
+    max_entries=int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("TRANSLATION_CACHE_TTL_SECONDS", "86400")),
+)
 
 TRANSLATION_SYSTEM_PROMPT = """You are an expert Art Director translating vague client feedback for a junior designer. 
 
@@ -51,13 +89,23 @@ Example output: [
 
 Now translate the following client feedback into actionable design tasks:"""
 
+# Tasks here are one short "task" field each, so need fewer tokens than app's
+translation_prompts = PromptBuilder(
+    TRANSLATION_SYSTEM_PROMPT,
+    TRANSLATION_MODEL,
+    tokens_per_task=50,
+    min_tasks=4,
+    max_tasks=8,
+)
+
 
-async def translate_feedback(feedback_text: str) -> list[str]:
+async def translate_feedback(feedback_text: str, use_cache: bool = True) -> list[str]:
     """
     Translate vague client feedback into actionable design tasks.
     
     Args:
         feedback_text: The raw client feedback string
+        use_cache: Look up previous translations first (fresh results are always cached)
         
     Returns:
         List of actionable task descriptions
@@ -65,58 +113,49 @@ async def translate_feedback(feedback_text: str) -> list[str]:
     if not feedback_text or not feedback_text.strip():
         raise ValueError("Feedback text cannot be empty")
     
+    cache_key = translation_cache_key(feedback_text, TRANSLATION_MODEL, PROMPT_VERSION)
+    if use_cache:
+        cached = await translation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
-                {"role": "user", "content": feedback_text.strip()}
-            ],
+        prompt = translation_prompts.build(feedback_text.strip())
+        response = await model_call(lambda timeout: client.chat_completion(
+            prompt.messages,
+            model=TRANSLATION_MODEL,
             temperature=0.7,
-            max_tokens=1000
-        )
+            max_tokens=prompt.max_tokens,
+            timeout=timeout
+        ))
+        translation_prompts.record(prompt, response.usage)
         
         content = response.choices[0].message.content.strip()
         
-        # Parse JSON response
-        try:
-            tasks_data = json.loads(content)
-        except json.JSONDecodeError:
-            # Sometimes GPT returns markdown-formatted JSON, try to extract it
-            if "```json" in content:
-                json_start = content.find("```json") + 7
-                json_end = content.find("```", json_start)
-                content = content[json_start:json_end].strip()
-                tasks_data = json.loads(content)
-            elif "```" in content:
-                json_start = content.find("```") + 3
-                json_end = content.find("```", json_start)
-                content = content[json_start:json_end].strip()
-                tasks_data = json.loads(content)
-            else:
-                # Fallback: treat as plain text, split by lines
-                tasks_data = [{"task": line.strip()} for line in content.split("\n") if line.strip()]
-        
-        # Extract task strings from the response
-        if isinstance(tasks_data, list):
-            tasks = [item.get("task", str(item)) if isinstance(item, dict) else str(item) 
-                    for item in tasks_data]
-        elif isinstance(tasks_data, dict):
-            # Single task
-            tasks = [tasks_data.get("task", str(tasks_data))]
-        else:
-            tasks = [str(tasks_data)]
-        
-        # Filter out empty tasks
-        tasks = [task.strip() for task in tasks if task.strip()]
+        # Fenced JSON, a bare array, a lone object, truncated output or prose
+        parser = TaskStreamParser()
+        parsed = parser.feed(content) + parser.finish()
+        tasks = [task["task"].strip() for task in parsed]
         
         if not tasks:
             raise ValueError("No tasks generated from feedback")
         
+        # Recovered output is served but not cached
+        if parser.complete and not parser.salvaged:
+            await translation_cache.set(cache_key, tasks)
         return tasks
         
-    except Exception as e:
-        # Fallback: return a basic task if AI fails
-        return [f"Review and refine: {feedback_text.strip()}"]
-        # In production, you might want to log this error
-        # raise Exception(f"Translation service error: {str(e)}")
+    except CircuitOpenError:
+        # Upstream is failing: answer at once instead of waiting out the deadline
+        logger.warning("Model circuit open, returning fallback task")
+        return _fallback_tasks(feedback_text)
+    except Exception:
+        logger.exception("Translation failed, returning fallback task")
+        return _fallback_tasks(feedback_text)
+
+
+def _fallback_tasks(feedback_text: str) -> list[str]:
+    """
+    Placeholder task used when the model cannot produce one
+    """
+    return [f"Review and refine: {feedback_text.strip()}"]
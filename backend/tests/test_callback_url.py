@@ -0,0 +1,59 @@
+"""
+Test callback URL vetting
+"""
+import pytest
+
+from app.services.callback_url import UnsafeCallbackURL, check_callback_url
+
+
+def resolver(*addresses):
+    async def resolve(host, port):
+        return list(addresses)
+    return resolve
+
+
+async def unresolvable(host, port):
+    raise OSError("Name or service not known")
+
+
+async def test_public_https_url_is_accepted():
+    target = await check_callback_url(
+        "https://client.example:8443/hooks", resolve=resolver("93.184.216.34", "2606:2800:220:1::248")
+    )
+    assert target.hostname == "client.example"
+    assert target.address == "93.184.216.34"
+
+
+@pytest.mark.parametrize("url,addresses", [
+    ("http://client.example/hooks", ["93.184.216.34"]),
+    ("ftp://client.example/hooks", ["93.184.216.34"]),
+    ("https:///hooks", ["93.184.216.34"]),
+    ("https://client.example/" + "x" * 2048, ["93.184.216.34"]),
+    ("https://client.example:99999/hooks", ["93.184.216.34"]),
+    ("https://127.0.0.1/hooks", ["127.0.0.1"]),
+    ("https://localhost/hooks", ["::1"]),
+    ("https://10.0.0.5/hooks", ["10.0.0.5"]),
+    ("https://internal.example/hooks", ["192.168.1.20"]),
+    ("https://metadata.example/latest", ["169.254.169.254"]),
+    ("https://cgnat.example/hooks", ["100.64.0.1"]),
+    ("https://unspecified.example/hooks", ["0.0.0.0"]),
+    ("https://mapped.example/hooks", ["::ffff:127.0.0.1"]),
+    ("https://ula.example/hooks", ["fd00::1"]),
+    ("https://mixed.example/hooks", ["93.184.216.34", "10.0.0.5"]),
+    ("https://empty.example/hooks", []),
+])
+async def test_unsafe_urls_are_rejected(url, addresses):
+    with pytest.raises(UnsafeCallbackURL):
+        await check_callback_url(url, resolve=resolver(*addresses))
+
+
+async def test_unresolvable_host_is_rejected():
+    with pytest.raises(UnsafeCallbackURL):
+        await check_callback_url("https://nowhere.example/hooks", resolve=unresolvable)
+
+
+async def test_local_receivers_are_allowed_in_development():
+    target = await check_callback_url(
+        "http://localhost:9000/hooks", allow_local=True, resolve=resolver("127.0.0.1")
+    )
+    assert target.address == "127.0.0.1"
@@ -0,0 +1,65 @@
+"""
+Test the authenticated-user row cache
+"""
+from sqlalchemy import Column, Integer, String, create_engine, event
+from sqlalchemy.orm import Session, declarative_base
+
+from app.database.entity_cache import EntityCache
+
+Base = declarative_base()
+
+
+class Account(Base):
+    __tablename__ = "accounts"
+
+    id = Column(Integer, primary_key=True)
+    subscription_status = Column(String, nullable=False)
+
+
+def _engine_with_counter():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Account(id=1, subscription_status="inactive"))
+        session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return engine, statements
+
+
+def test_hit_is_attached_without_a_query():
+    """A cached row joins the new session without a SELECT and can still be updated."""
+    engine, statements = _engine_with_counter()
+    cache = EntityCache(Account, ttl_seconds=30)
+
+    with Session(engine) as session:
+        cache.set("user-1", session.get(Account, 1))
+    statements.clear()
+
+    with Session(engine) as session:
+        account = cache.get("user-1", session)
+        assert account.subscription_status == "inactive"
+        assert account in session
+        assert not session.dirty
+        assert statements == []
+
+        account.subscription_status = "active"
+        session.commit()
+
+    with Session(engine) as session:
+        assert session.get(Account, 1).subscription_status == "active"
+
+
+def test_invalidate_forces_reload():
+    """After invalidate the next lookup misses and goes back to the database."""
+    engine, _ = _engine_with_counter()
+    cache = EntityCache(Account, ttl_seconds=30)
+
+    with Session(engine) as session:
+        cache.set("user-1", session.get(Account, 1))
+    cache.invalidate("user-1")
+
+    with Session(engine) as session:
+        assert cache.get("user-1", session) is None
+    assert cache.stats()["misses"] == 1
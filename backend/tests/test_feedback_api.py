@@ -0,0 +1,282 @@
+"""
+Test the feedback translation endpoints against the test database
+"""
+import io
+import json
+
+import pytest
+from openai.types.chat import ChatCompletion
+from sqlalchemy import select
+
+from app.api.v1.endpoints import feedback
+from app.core.config import settings
+from app.models.feedback import FeedbackInput, GeneratedTask
+from app.services import translator_service
+from app.services.screenshot_service import screenshot_processor
+from app.services.translator_service import TranslatorService
+from tests.conftest import TestSessionLocal
+from tests.test_image_processing import mock_screenshot
+from tests.test_translator_service import completion
+
+
+@pytest.fixture(autouse=True)
+def persist_with_test_sessions(monkeypatch):
+    """Rows written after a response (streaming) go to the test database."""
+    monkeypatch.setattr(feedback, "AsyncSessionLocal", TestSessionLocal)
+
+
+def stub_stream(monkeypatch, chunks, error=None):
+    """Answer stream_chat_completion with the given content deltas, then raise error if set."""
+    async def stream_chat_completion(messages, model, **kwargs):
+        for chunk in chunks:
+            yield chunk
+        if error is not None:
+            raise error
+
+    monkeypatch.setattr(translator_service.llm_client, "stream_chat_completion", stream_chat_completion)
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def saved_tasks(db_session, feedback_id):
+    result = await db_session.scalars(select(GeneratedTask).where(GeneratedTask.input_id == feedback_id))
+    return sorted(task.task_description for task in result.all())
+
+
+async def test_stream_sends_one_line_per_task_and_saves_after(api_client, db_session, project, monkeypatch):
+    reply = json.dumps({"tasks": [
+        {"task": "Increase headline contrast", "estimated_time_minutes": 10, "difficulty_level": "easy"},
+        {"task": "Add a drop shadow to the CTA", "estimated_time_minutes": 5, "difficulty_level": "easy"},
+    ]})
+    stub_stream(monkeypatch, [reply[i:i + 7] for i in range(0, len(reply), 7)])
+
+    response = await api_client.post("/api/v1/feedback/translate/stream", json={
+        "project_id": str(project.id),
+        "input_text": "make the hero pop",
+        "bypass_cache": True,
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = ndjson(response)
+    assert [event["type"] for event in events] == ["feedback", "task", "task", "done"]
+    assert [event["task"]["task_description"] for event in events[1:3]] == [
+        "Increase headline contrast", "Add a drop shadow to the CTA"
+    ]
+    assert events[-1]["task_count"] == 2
+
+    feedback_id = events[0]["feedback_id"]
+    assert await db_session.get(FeedbackInput, feedback_id) is not None
+    assert await saved_tasks(db_session, feedback_id) == [
+        "Add a drop shadow to the CTA", "Increase headline contrast"
+    ]
+
+
+async def test_stream_error_falls_back_to_generic_tasks(api_client, db_session, project, monkeypatch):
+    stub_stream(monkeypatch, [], error=RuntimeError("connection reset"))
+
+    response = await api_client.post("/api/v1/feedback/translate/stream", json={
+        "project_id": str(project.id),
+        "input_text": "something feels off",
+        "bypass_cache": True,
+    })
+
+    events = ndjson(response)
+    tasks = [event["task"]["task_description"] for event in events if event["type"] == "task"]
+    assert len(tasks) == 3
+    assert "something feels off" in tasks[0]
+    assert await saved_tasks(db_session, events[0]["feedback_id"]) == sorted(tasks)
+
+
+def stub_completions(monkeypatch, respond):
+    """Answer chat_completion with respond(messages) and record every call's messages."""
+    calls = []
+
+    async def chat_completion(messages, model, **kwargs):
+        calls.append(messages)
+        return ChatCompletion.model_validate(completion(respond(messages)))
+
+    monkeypatch.setattr(translator_service.llm_client, "chat_completion", chat_completion)
+    return calls
+
+
+async def test_batch_packs_short_comments_and_saves_every_item(api_client, db_session, project, monkeypatch):
+    long_comment = "The hero section feels cluttered and " + "the colours fight each other " * 12
+
+    def respond(messages):
+        if messages[0]["content"] == TranslatorService.PACKED_SYSTEM_PROMPT:
+            return json.dumps({"tasks": [
+                {"item": 1, "task": "Scale the logo to 120%"},
+                {"item": 0, "task": "Increase headline contrast"},
+            ]})
+        return json.dumps({"tasks": [{"task": "Reduce the hero to one accent colour"}]})
+
+    calls = stub_completions(monkeypatch, respond)
+
+    response = await api_client.post("/api/v1/feedback/translate/batch", json={
+        "project_id": str(project.id),
+        "items": [{"input_text": "make it pop"}, {"input_text": long_comment}, {"input_text": "logo bigger"}],
+        "bypass_cache": True,
+    })
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [[task["task_description"] for task in result["tasks"]] for result in results] == [
+        ["Increase headline contrast"], ["Reduce the hero to one accent colour"], ["Scale the logo to 120%"]
+    ]
+    # The two short comments share one call; the long one goes alone
+    assert len(calls) == 2
+    packed = [messages for messages in calls if messages[0]["content"] == TranslatorService.PACKED_SYSTEM_PROMPT]
+    assert json.loads(packed[0][-1]["content"]) == ["make it pop", "logo bigger"]
+
+    for result in results:
+        assert await db_session.get(FeedbackInput, result["feedback_id"]) is not None
+        assert await saved_tasks(db_session, result["feedback_id"]) == [
+            task["task_description"] for task in result["tasks"]
+        ]
+
+
+async def test_batch_rejects_more_items_than_allowed(api_client, project, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_TRANSLATE_MAX_ITEMS", 2)
+
+    response = await api_client.post("/api/v1/feedback/translate/batch", json={
+        "project_id": str(project.id),
+        "items": [{"input_text": "make it pop"}] * 3,
+    })
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("callback_url", [
+    "http://client.example/hooks",
+    "https://127.0.0.1/hooks",
+    "https://169.254.169.254/latest/meta-data",
+    "https://[::1]/hooks",
+])
+async def test_callback_urls_to_internal_addresses_are_rejected(api_client, project, monkeypatch, callback_url):
+    monkeypatch.setattr(settings, "TRANSLATION_JOB_ALLOW_PRIVATE_CALLBACKS", False)
+    response = await api_client.post("/api/v1/feedback/translate", json={
+        "project_id": str(project.id),
+        "input_text": "make it pop",
+        "callback_url": callback_url,
+    })
+
+    assert response.status_code == 400
+    assert "callback_url" in response.json()["detail"]
+
+
+@pytest.fixture
+def screenshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SCREENSHOT_UPLOAD_DIR", str(tmp_path))
+    yield tmp_path
+    screenshot_processor.close()
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    mock_screenshot(1200, 800).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def stored_screenshots(directory):
+    return sorted(path.name for path in directory.rglob("*.webp"))
+
+
+async def upload(api_client, project, body, comment="the hero needs more punch"):
+    return await api_client.post(
+        "/api/v1/feedback/screenshots",
+        params={"project_id": str(project.id), "comment": comment},
+        content=body,
+        headers={"Content-Type": "image/png"},
+    )
+
+
+async def test_screenshot_is_stored_translated_and_deduplicated(api_client, db_session, project, screenshot_dir, monkeypatch):
+    calls = stub_completions(monkeypatch, lambda messages: json.dumps({"tasks": [{"task": "Raise hero contrast"}]}))
+    body = png_bytes()
+
+    first = await upload(api_client, project, body)
+
+    assert first.status_code == 200
+    result = first.json()
+    assert [task["task_description"] for task in result["tasks"]] == ["Raise hero contrast"]
+    assert (result["screenshot"]["width"], result["screenshot"]["height"]) == (1200, 800)
+    assert stored_screenshots(screenshot_dir) == [f"{result['feedback_id']}.webp"]
+    assert list((screenshot_dir / "incoming").iterdir()) == []
+    saved = await db_session.get(FeedbackInput, result["feedback_id"])
+    assert saved.input_metadata["screenshot"]["phash"] == result["screenshot"]["phash"]
+
+    # Same picture and comment again: the earlier tasks and file are reused
+    second = await upload(api_client, project, body, comment="The hero needs more punch!")
+
+    assert second.status_code == 200
+    assert second.json()["duplicate_of"] == result["feedback_id"]
+    assert second.json()["screenshot"]["path"] == result["screenshot"]["path"]
+    assert [task["task_description"] for task in second.json()["tasks"]] == ["Raise hero contrast"]
+    assert stored_screenshots(screenshot_dir) == [f"{result['feedback_id']}.webp"]
+    assert len(calls) == 1
+
+
+async def test_non_image_upload_is_refused(api_client, project, screenshot_dir):
+    response = await upload(api_client, project, b"%PDF-1.7\n" + b"\x00" * 4096)
+
+    assert response.status_code == 415
+    assert stored_screenshots(screenshot_dir) == []
+    assert list((screenshot_dir / "incoming").iterdir()) == []
+
+
+async def test_screenshot_is_removed_when_saving_fails(api_client, project, screenshot_dir, monkeypatch):
+    stub_completions(monkeypatch, lambda messages: json.dumps({"tasks": [{"task": "Raise hero contrast"}]}))
+
+    async def save_feedback_with_tasks(db, feedback_rows, task_rows):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(feedback, "save_feedback_with_tasks", save_feedback_with_tasks)
+
+    with pytest.raises(RuntimeError):
+        await upload(api_client, project, png_bytes(), comment="make the footer calmer")
+
+    assert stored_screenshots(screenshot_dir) == []
+
+
+async def test_screenshot_is_removed_when_the_duplicate_lookup_fails(api_client, project, screenshot_dir, monkeypatch):
+    async def find_duplicate_screenshot(db, project_id, phash, comment):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(feedback, "find_duplicate_screenshot", find_duplicate_screenshot)
+
+    with pytest.raises(RuntimeError):
+        await upload(api_client, project, png_bytes())
+
+    assert stored_screenshots(screenshot_dir) == []
+
+
+async def test_batch_reports_failed_items_without_saving_them(api_client, db_session, project, monkeypatch):
+    long_comment = "The footer feels heavy and " + "the links crowd each other " * 12
+
+    def respond(messages):
+        if messages[0]["content"] == TranslatorService.PACKED_SYSTEM_PROMPT:
+            return json.dumps({"tasks": [
+                {"item": 0, "task": "Increase headline contrast"},
+                {"item": 1, "task": "Scale the logo to 120%"},
+            ]})
+        raise RuntimeError("upstream exploded")
+
+    stub_completions(monkeypatch, respond)
+
+    response = await api_client.post("/api/v1/feedback/translate/batch", json={
+        "project_id": str(project.id),
+        "items": [{"input_text": "make it pop"}, {"input_text": "logo bigger"}, {"input_text": long_comment}],
+        "bypass_cache": True,
+    })
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["error"] is None for result in results] == [True, True, False]
+    assert "upstream exploded" in results[2]["error"]
+    assert results[2]["feedback_id"] is None and results[2]["tasks"] == []
+    saved = await db_session.scalars(select(FeedbackInput.original_text).where(FeedbackInput.project_id == project.id))
+    assert sorted(saved.all()) == ["logo bigger", "make it pop"]
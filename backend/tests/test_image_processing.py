@@ -0,0 +1,133 @@
+"""
+Test screenshot preprocessing and perceptual hashing
+"""
+import asyncio
+import io
+import random
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.image_processing import (
+    ScreenshotError,
+    ScreenshotProcessor,
+    hamming_distance,
+    perceptual_hash,
+    process_screenshot,
+    sniff_image_type,
+)
+
+
+def mock_screenshot(width=2400, height=1600, seed=1, mode="RGB"):
+    """A page-like image: header bar, cards and lines of 'text'."""
+    rng = random.Random(seed)
+    image = Image.new(mode, (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, height // 10), fill=(30, 60, 140))
+    for _ in range(12):
+        x, y = rng.randrange(width - 400), rng.randrange(height // 8, height - 300)
+        draw.rectangle((x, y, x + rng.randint(150, 400), y + rng.randint(80, 300)), fill=tuple(rng.choices(range(256), k=3)))
+    for row in range(height // 8, height, 40):
+        draw.line((60, row, rng.randint(200, width - 60), row), fill=(40, 40, 40), width=6)
+    return image
+
+
+def test_screenshot_is_downscaled_and_stored_as_webp(tmp_path):
+    source = tmp_path / "shot.png"
+    mock_screenshot().save(source)
+
+    result = process_screenshot(str(source), str(tmp_path / "out.webp"), max_dimension=1200)
+
+    assert (result["original_width"], result["original_height"]) == (2400, 1600)
+    assert (result["width"], result["height"]) == (1200, 800)
+    assert result["original_format"] == "PNG"
+    with Image.open(tmp_path / "out.webp") as stored:
+        assert stored.format == "WEBP"
+        assert stored.size == (1200, 800)
+
+
+def test_transparent_screenshot_is_flattened_onto_white(tmp_path):
+    source = tmp_path / "shot.png"
+    Image.new("RGBA", (400, 300), (0, 0, 0, 0)).save(source)
+
+    process_screenshot(str(source), str(tmp_path / "out.webp"))
+
+    with Image.open(tmp_path / "out.webp") as stored:
+        assert stored.convert("RGB").getpixel((10, 10)) == (255, 255, 255)
+
+
+def test_hash_survives_rescaling_and_recompression():
+    shot = mock_screenshot(seed=1)
+    jpeg = io.BytesIO()
+    shot.resize((1200, 800)).save(jpeg, "JPEG", quality=60)
+    jpeg.seek(0)
+
+    assert hamming_distance(perceptual_hash(shot), perceptual_hash(Image.open(jpeg))) <= 4
+    assert hamming_distance(perceptual_hash(shot), perceptual_hash(mock_screenshot(seed=2))) > 10
+
+
+def test_oversized_and_non_images_are_rejected(tmp_path):
+    source = tmp_path / "shot.png"
+    mock_screenshot(1000, 1000).save(source)
+    with pytest.raises(ScreenshotError):
+        process_screenshot(str(source), str(tmp_path / "out.webp"), max_pixels=999_999)
+
+    garbage = tmp_path / "notes.png"
+    garbage.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 64)
+    with pytest.raises(ScreenshotError):
+        process_screenshot(str(garbage), str(tmp_path / "out.webp"))
+
+    assert sniff_image_type(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR") == "image/png"
+    assert sniff_image_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff_image_type(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n") is None
+
+
+async def test_processor_runs_in_worker_processes(tmp_path):
+    source = tmp_path / "shot.png"
+    mock_screenshot().save(source)
+    processor = ScreenshotProcessor(workers=1, max_dimension=800)
+    try:
+        result = await processor.process(str(source), str(tmp_path / "out.webp"))
+        with pytest.raises(ScreenshotError):
+            await processor.process(str(tmp_path / "missing.png"), str(tmp_path / "out2.webp"))
+    finally:
+        processor.close()
+
+    assert result["width"] == 800
+    assert processor.stats()["processed"] == 1
+    assert processor.stats()["rejected"] == 1
+
+
+class BrokenExecutor(Executor):
+    """A pool whose worker has died: every job fails and shutdown is recorded."""
+
+    def __init__(self):
+        self.shutdowns = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdowns.append(wait)
+
+
+async def test_broken_pool_is_shut_down_and_replaced(tmp_path):
+    """The dead pool's remaining workers are reaped once, not leaked."""
+    processor = ScreenshotProcessor(workers=1)
+    broken = BrokenExecutor()
+    processor._executor = broken
+
+    results = await asyncio.gather(
+        processor.process(str(tmp_path / "a.png"), str(tmp_path / "a.webp")),
+        processor.process(str(tmp_path / "b.png"), str(tmp_path / "b.webp")),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, BrokenProcessPool) for result in results)
+    assert broken.shutdowns == [False]
+    assert processor._executor is None
+    assert processor.stats()["errors"] == 2
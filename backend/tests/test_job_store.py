@@ -0,0 +1,44 @@
+"""
+Test the Postgres translation job queue
+"""
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.models.translation_job import JobStatus, TranslationJob
+from app.services.job_store import PostgresJobStore, enqueue_job
+from tests.conftest import TestSessionLocal
+
+
+async def test_retry_requeues_the_job_after_the_delay(db_session, user, project):
+    store = PostgresJobStore(TestSessionLocal)
+    await enqueue_job(db_session, user.id, project.id, "make it pop")
+    [job] = await store.claim("worker-a", 5, lease_seconds=60)
+
+    assert await store.retry(job, "worker-a", "RuntimeError: boom", delay_seconds=30)
+
+    assert job.status == JobStatus.QUEUED
+    assert job.worker_id is None
+    assert job.error == "RuntimeError: boom"
+    # Not due yet, and the old owner can no longer settle it
+    assert await store.claim("worker-b", 5, lease_seconds=60) == []
+    assert not await store.fail(job, "worker-a", "too late")
+
+    async with TestSessionLocal() as session:
+        await session.execute(
+            update(TranslationJob).values(run_after=datetime.utcnow())
+        )
+        await session.commit()
+    [again] = await store.claim("worker-b", 5, lease_seconds=60)
+    assert again.id == job.id
+    assert again.attempts == 2
+
+
+async def test_only_the_lease_holder_settles_a_job(db_session, user, project):
+    store = PostgresJobStore(TestSessionLocal)
+    await enqueue_job(db_session, user.id, project.id, "make it pop")
+    [job] = await store.claim("worker-a", 5, lease_seconds=60)
+
+    assert not await store.fail(job, "worker-b", "not mine")
+    assert await store.fail(job, "worker-a", "RuntimeError: boom")
+    assert job.status == JobStatus.FAILED
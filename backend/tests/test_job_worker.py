@@ -0,0 +1,225 @@
+"""
+Test the background translation job worker
+"""
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+
+from app.models.translation_job import JobStatus
+from app.services import job_worker
+from app.services.job_worker import SIGNATURE_HEADER, TranslationJobWorker, sign_callback, translate_job
+from tests.test_translator_service import make_translator
+
+
+def make_job(attempts=1, callback_url=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        project_id=uuid.uuid4(),
+        input_text="make it pop",
+        bypass_cache=False,
+        callback_url=callback_url,
+        status=JobStatus.RUNNING,
+        attempts=attempts,
+        feedback_id=None,
+        error=None,
+        created_at=datetime.utcnow(),
+        finished_at=None,
+    )
+
+
+class FakeStore:
+    """In-memory stand-in for PostgresJobStore."""
+
+    def __init__(self, jobs=(), owned=True):
+        self.queue = list(jobs)
+        self.owned = owned
+        self.completed = []
+        self.retried = []
+        self.failed = []
+        self.callbacks = []
+
+    async def claim(self, worker_id, limit, lease_seconds):
+        claimed, self.queue = self.queue[:limit], self.queue[limit:]
+        return claimed
+
+    async def extend(self, job, worker_id, lease_seconds):
+        return self.owned
+
+    async def complete(self, job, worker_id, tasks_data):
+        if not self.owned:
+            return None
+        self.completed.append((job.id, tasks_data))
+        job.status = JobStatus.SUCCEEDED
+        job.feedback_id = uuid.uuid4()
+        return []
+
+    async def retry(self, job, worker_id, error, delay_seconds):
+        self.retried.append((job.id, delay_seconds))
+        job.status = JobStatus.QUEUED
+        return True
+
+    async def fail(self, job, worker_id, error):
+        self.failed.append((job.id, error))
+        job.status = JobStatus.FAILED
+        job.error = error
+        return True
+
+    async def mark_callback_sent(self, job_id):
+        self.callbacks.append(job_id)
+
+
+async def resolve_public(host, port):
+    return ["93.184.216.34"]
+
+
+async def run_until_idle(worker, store):
+    worker.start()
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if not store.queue and not worker.stats()["running"]:
+            break
+    await worker.close()
+
+
+async def test_jobs_are_translated_and_written():
+    """Claimed jobs go through translate and are completed with its tasks."""
+    jobs = [make_job() for _ in range(3)]
+    store = FakeStore(jobs)
+
+    async def translate(job):
+        return [{"task": f"Task for {job.input_text}"}]
+
+    worker = TranslationJobWorker(store, translate, concurrency=2, poll_interval_seconds=0.01)
+    await run_until_idle(worker, store)
+
+    assert sorted(job_id for job_id, _ in store.completed) == sorted(job.id for job in jobs)
+    assert worker.stats()["succeeded"] == 3
+
+
+async def test_failures_back_off_then_fail_for_good():
+    """A raising job is requeued with growing delays until max_attempts."""
+    early, last = make_job(attempts=2), make_job(attempts=3)
+    store = FakeStore([early, last])
+
+    async def translate(job):
+        raise RuntimeError("database went away")
+
+    worker = TranslationJobWorker(
+        store, translate, concurrency=2, poll_interval_seconds=0.01,
+        max_attempts=3, retry_base_seconds=5
+    )
+    await run_until_idle(worker, store)
+
+    assert store.retried == [(early.id, 10)]
+    assert [job_id for job_id, _ in store.failed] == [last.id]
+    assert "database went away" in store.failed[0][1]
+
+
+async def test_model_failures_requeue_instead_of_completing(monkeypatch):
+    """Upstream errors and an open circuit reach the retry path, not the fallback tasks."""
+    translator, requests = make_translator(
+        lambda body: httpx.Response(500, json={"error": {"message": "boom", "type": "server_error"}})
+    )
+    monkeypatch.setattr(job_worker, "TranslatorService", lambda **kwargs: translator)
+    upstream_error, circuit_open = make_job(), make_job()
+
+    try:
+        store = FakeStore([upstream_error])
+        worker = TranslationJobWorker(store, translate_job, poll_interval_seconds=0.01, max_attempts=3)
+        await run_until_idle(worker, store)
+        assert len(requests) == 1
+
+        while not translator.caller.breaker.rejecting:
+            translator.caller.breaker.record_failure()
+        store = FakeStore([circuit_open])
+        worker = TranslationJobWorker(store, translate_job, poll_interval_seconds=0.01, max_attempts=3)
+        await run_until_idle(worker, store)
+    finally:
+        await translator.client.aclose()
+
+    assert store.completed == []
+    assert [job_id for job_id, _ in store.retried] == [circuit_open.id]
+    assert upstream_error.status == circuit_open.status == JobStatus.QUEUED
+    assert len(requests) == 1
+
+
+async def test_callback_is_signed_and_skipped_when_the_lease_was_lost():
+    """The settled result is POSTed with an HMAC; a job taken over sends nothing."""
+    received = []
+
+    def handler(request):
+        received.append(request)
+        return httpx.Response(204)
+
+    async def translate(job):
+        return [{"task": "Increase contrast"}]
+
+    job = make_job(callback_url="https://client.example/hooks/freedback")
+    store = FakeStore([job])
+    worker = TranslationJobWorker(
+        store, translate, poll_interval_seconds=0.01,
+        callback_secret="s3cret", resolve=resolve_public, transport=httpx.MockTransport(handler)
+    )
+    await run_until_idle(worker, store)
+
+    assert len(received) == 1
+    # Sent to the vetted address, still addressed to the client's host
+    assert received[0].url.host == "93.184.216.34"
+    assert received[0].headers["host"] == "client.example"
+    assert received[0].extensions["sni_hostname"] == "client.example"
+    body = received[0].content
+    assert received[0].headers[SIGNATURE_HEADER] == sign_callback("s3cret", body)
+    assert json.loads(body)["status"] == "succeeded"
+    assert store.callbacks == [job.id]
+
+    lost = FakeStore([make_job(callback_url="https://client.example/hooks/freedback")], owned=False)
+    worker = TranslationJobWorker(
+        lost, translate, poll_interval_seconds=0.01, resolve=resolve_public,
+        transport=httpx.MockTransport(handler)
+    )
+    await run_until_idle(worker, lost)
+
+    assert len(received) == 1
+    assert worker.stats()["lost_leases"] == 1
+
+
+async def test_callback_is_not_sent_to_internal_addresses_or_redirected():
+    """The host is vetted again at send time, and a redirect is not followed."""
+    received = []
+
+    def handler(request):
+        received.append(request)
+        return httpx.Response(302, headers={"Location": "http://169.254.169.254/latest/meta-data"})
+
+    async def translate(job):
+        return [{"task": "Increase contrast"}]
+
+    async def rebound(host, port):
+        # Public when the job was accepted, loopback by the time it is sent
+        return ["127.0.0.1"]
+
+    store = FakeStore([make_job(callback_url="https://client.example/hooks/freedback")])
+    worker = TranslationJobWorker(
+        store, translate, poll_interval_seconds=0.01, resolve=rebound,
+        transport=httpx.MockTransport(handler)
+    )
+    await run_until_idle(worker, store)
+
+    assert received == []
+    assert worker.stats()["callbacks_refused"] == 1
+
+    store = FakeStore([make_job(callback_url="https://client.example/hooks/freedback")])
+    worker = TranslationJobWorker(
+        store, translate, poll_interval_seconds=0.01, resolve=resolve_public,
+        transport=httpx.MockTransport(handler)
+    )
+    await run_until_idle(worker, store)
+
+    assert [request.url.host for request in received] == ["93.184.216.34"]
+    assert store.callbacks == []
+    assert worker.stats()["callback_errors"] == 1
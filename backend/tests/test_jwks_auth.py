@@ -0,0 +1,109 @@
+"""
+Test local Clerk token verification against a stub JWKS server
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from app.services.jwks import ClerkTokenVerifier, JWKSCache, TokenVerificationError
+
+
+class StubJWKSServer:
+    """Serves a mutable JWKS document on localhost, standing in for Clerk."""
+
+    def __init__(self):
+        self.keys = {}
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                body = json.dumps({"keys": [
+                    {**json.loads(RSAAlgorithm.to_jwk(key.public_key())), "kid": kid, "alg": "RS256"}
+                    for kid, key in stub.keys.items()
+                ]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1/jwks"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add_key(self, kid):
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return self.keys[kid]
+
+    def sign(self, kid, **claims):
+        payload = {"sub": "user_123", "exp": int(time.time()) + 60, **claims}
+        return jwt.encode(payload, self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def jwks_server():
+    server = StubJWKSServer()
+    yield server
+    server.server.shutdown()
+
+
+async def test_verifies_locally_and_caches_claims(jwks_server):
+    """The JWKS is fetched once; repeated tokens skip signature checks."""
+    jwks_server.add_key("key-1")
+    jwks = JWKSCache(jwks_server.url)
+    verifier = ClerkTokenVerifier(jwks)
+    token = jwks_server.sign("key-1")
+
+    for _ in range(5):
+        claims = await verifier.verify(token)
+        assert claims["sub"] == "user_123"
+    assert await verifier.verify(jwks_server.sign("key-1", sid="other")) is not None
+
+    assert jwks_server.requests == 1
+    assert verifier.verified.stats()["hits"] == 4
+    await jwks.aclose()
+
+
+async def test_refreshes_on_key_rotation(jwks_server):
+    """A token signed with a new kid triggers one refresh."""
+    jwks_server.add_key("key-1")
+    jwks = JWKSCache(jwks_server.url, min_refresh_interval=0)
+    verifier = ClerkTokenVerifier(jwks)
+    await verifier.verify(jwks_server.sign("key-1"))
+
+    jwks_server.add_key("key-2")
+    claims = await verifier.verify(jwks_server.sign("key-2"))
+    assert claims["sub"] == "user_123"
+    assert jwks_server.requests == 2
+    await jwks.aclose()
+
+
+async def test_rejects_bad_tokens(jwks_server):
+    """Expired, forged and wrong-issuer tokens are rejected."""
+    jwks_server.add_key("key-1")
+    jwks = JWKSCache(jwks_server.url)
+    verifier = ClerkTokenVerifier(jwks, issuer="https://clerk.example.com", leeway_seconds=0)
+
+    expired = jwks_server.sign("key-1", iss="https://clerk.example.com", exp=int(time.time()) - 10)
+    forged = jwt.encode(
+        {"sub": "user_123", "exp": int(time.time()) + 60, "iss": "https://clerk.example.com"},
+        rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+    wrong_issuer = jwks_server.sign("key-1", iss="https://evil.example.com")
+
+    for token in (expired, forged, wrong_issuer):
+        with pytest.raises(TokenVerificationError):
+            await verifier.verify(token)
+    await jwks.aclose()
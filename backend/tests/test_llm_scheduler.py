@@ -0,0 +1,82 @@
+"""
+Test the fair-share model call scheduler
+"""
+import asyncio
+
+from app.services.llm_scheduler import BATCH, INTERACTIVE, LLMScheduler, ModelBudget
+
+BUDGETS = [ModelBudget("primary", 1_000_000), ModelBudget("fallback", 1_000_000)]
+
+
+async def _run_in_admission_order(scheduler, calls):
+    """Queue every call behind one blocker, release it, and return the admission order."""
+    admitted = []
+    blocker = await scheduler.acquire("blocker", 1)
+
+    async def call(name, user, lane):
+        async with scheduler.slot(user, 1, lane):
+            admitted.append(name)
+
+    tasks = [asyncio.create_task(call(*c)) for c in calls]
+    await asyncio.sleep(0)
+    scheduler.release(blocker)
+    await asyncio.gather(*tasks)
+    return admitted
+
+
+async def test_users_take_turns_within_a_lane():
+    """A user with many queued calls does not hold up a user with one."""
+    scheduler = LLMScheduler(BUDGETS, max_concurrency=1)
+    calls = [(f"bulk-{i}", "bulk", BATCH) for i in range(5)] + [("small", "small", BATCH)]
+
+    admitted = await _run_in_admission_order(scheduler, calls)
+
+    assert admitted.index("small") == 1
+
+
+async def test_interactive_lane_is_weighted_but_batch_still_progresses():
+    """Interactive calls get most turns; batch gets one in every weight+1."""
+    scheduler = LLMScheduler(BUDGETS, max_concurrency=1, lane_weights={INTERACTIVE: 2, BATCH: 1})
+    calls = [(f"b{i}", "bulk", BATCH) for i in range(3)] + [(f"i{i}", "user", INTERACTIVE) for i in range(4)]
+
+    admitted = await _run_in_admission_order(scheduler, calls)
+
+    lanes = [name[0] for name in admitted]
+    assert lanes[:3].count("b") == 1
+    assert lanes[3:6].count("b") == 1
+    assert scheduler.stats()["lanes"][BATCH]["queued"] == 0
+
+
+async def test_routes_to_fallback_once_primary_budget_is_spent():
+    """No rate limit error needed: the estimate alone moves calls to the fallback."""
+    scheduler = LLMScheduler(
+        [ModelBudget("primary", 1000), ModelBudget("fallback", 100000)],
+        max_concurrency=4
+    )
+    first = await scheduler.acquire("user", 800)
+    second = await scheduler.acquire("user", 800)
+    assert (first.model, second.model) == ("primary", "fallback")
+
+    # Unused estimate is refunded to the primary's budget
+    first.tokens_used = 100
+    scheduler.release(first)
+    third = await scheduler.acquire("user", 800)
+    assert third.model == "primary"
+    assert scheduler.stats()["dispatched"] == {"primary": 2, "fallback": 1}
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    """A caller that gives up while queued neither holds a slot nor blocks others."""
+    scheduler = LLMScheduler(BUDGETS, max_concurrency=1)
+    blocker = await scheduler.acquire("a", 1)
+    waiter = asyncio.create_task(scheduler.acquire("b", 1))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["lanes"][INTERACTIVE]["queued"] == 1
+
+    waiter.cancel()
+    await asyncio.sleep(0)
+    scheduler.release(blocker)
+
+    assert scheduler.stats()["in_flight"] == 0
+    grant = await asyncio.wait_for(scheduler.acquire("c", 1), timeout=1)
+    assert grant.model == "primary"
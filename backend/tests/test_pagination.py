@@ -0,0 +1,22 @@
+"""
+Test keyset pagination cursors
+"""
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """A cursor decodes back to the row's (created_at, id)."""
+    created_at, row_id = datetime(2024, 5, 1, 12, 30, 15, 123456), uuid4()
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "YWJj"])
+def test_malformed_cursor_is_rejected(cursor):
+    """Garbage cursors raise ValueError instead of reaching the query."""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
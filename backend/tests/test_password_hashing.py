@@ -0,0 +1,40 @@
+"""
+Test password hashing on the worker pool
+"""
+import threading
+
+from passlib.context import CryptContext
+
+import auth
+
+
+async def test_verify_runs_off_the_event_loop(monkeypatch):
+    """Verification happens on a hashing thread, not the event loop thread."""
+    threads = []
+    original_verify = auth.pwd_context.verify
+
+    def recording_verify(*args):
+        threads.append(threading.current_thread().name)
+        return original_verify(*args)
+
+    hashed = await auth.get_password_hash("hunter22")
+    monkeypatch.setattr(auth.pwd_context, "verify", recording_verify)
+
+    assert await auth.verify_password("hunter22", hashed)
+    assert not await auth.verify_password("wrong", hashed)
+    assert all(name.startswith("bcrypt") for name in threads)
+
+
+async def test_login_rehashes_when_cost_changes():
+    """A hash made with another bcrypt cost is replaced on successful verification."""
+    old_cost = 4 if auth.BCRYPT_ROUNDS != 4 else 5
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=old_cost).hash("hunter22")
+
+    valid, new_hash = await auth.verify_and_update_password("hunter22", old_hash)
+    assert valid
+    assert new_hash is not None
+    assert f"${auth.BCRYPT_ROUNDS:02d}$" in new_hash
+
+    valid, new_hash = await auth.verify_and_update_password("wrong", old_hash)
+    assert not valid
+    assert new_hash is None
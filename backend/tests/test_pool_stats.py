@@ -0,0 +1,30 @@
+"""
+Test connection pool occupancy metrics
+"""
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.database.pool_stats import PoolStats
+
+
+def test_records_checkouts_and_long_holds(tmp_path):
+    """A connection held past the threshold is counted as a long hold."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool)
+    stats = PoolStats(long_hold_seconds=0.05)
+    stats.attach(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert stats.snapshot()["long_holds"] == 0
+
+    with engine.connect() as conn:
+        assert stats.snapshot()["checked_out"] == 1
+        time.sleep(0.06)
+
+    snapshot = stats.snapshot()
+    assert snapshot["checked_out"] == 0
+    assert snapshot["checkouts"] == 2
+    assert snapshot["long_holds"] == 1
+    assert snapshot["max_hold_ms"] >= 50
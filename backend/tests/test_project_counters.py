@@ -0,0 +1,81 @@
+"""
+Test the denormalized per-project counters
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.project import Project
+from app.services.feedback_service import build_feedback_row, build_task_row, save_feedback_with_tasks
+from app.services.project_counters import record_completions, record_feedback, reconcile_project_counters
+
+
+async def counters(db_session, project):
+    await db_session.refresh(project)
+    return (project.feedback_count, project.task_count, project.completed_task_count, project.last_feedback_at)
+
+
+async def test_record_feedback_adds_inputs_tasks_and_latest_time(db_session, user, project):
+    other = Project(user_id=user.id, name="Other")
+    db_session.add(other)
+    await db_session.commit()
+    earlier, later = datetime(2024, 5, 1), datetime(2024, 5, 2)
+    feedback_rows = [
+        build_feedback_row(project.id, "make it pop", created_at=later),
+        build_feedback_row(project.id, "logo feels lost", created_at=earlier),
+        build_feedback_row(other.id, "too busy", created_at=earlier),
+    ]
+    task_rows = [build_task_row(feedback_rows[0], {"task": "A"}), build_task_row(feedback_rows[0], {"task": "B"})]
+    task_rows += [build_task_row(feedback_rows[1], {"task": "C"}), build_task_row(feedback_rows[2], {"task": "D"})]
+
+    await record_feedback(db_session, feedback_rows, task_rows)
+    await db_session.commit()
+
+    assert await counters(db_session, project) == (2, 3, 0, later)
+    assert await counters(db_session, other) == (1, 1, 0, earlier)
+
+    # An older input does not move last_feedback_at back
+    await record_feedback(db_session, [build_feedback_row(project.id, "x", created_at=earlier)], [])
+    await db_session.commit()
+    assert await counters(db_session, project) == (3, 3, 0, later)
+
+
+async def test_completions_move_both_ways_but_never_below_zero(db_session, project):
+    await record_completions(db_session, {project.id: 2})
+    await db_session.commit()
+    assert (await counters(db_session, project))[2] == 2
+
+    await record_completions(db_session, {project.id: -1})
+    await db_session.commit()
+    assert (await counters(db_session, project))[2] == 1
+
+    # Reopening more tasks than the (drifted) counter holds clamps at zero
+    await record_completions(db_session, {project.id: -5})
+    await db_session.commit()
+    assert (await counters(db_session, project))[2] == 0
+
+
+async def test_reconcile_repairs_drift(db_session, user, project):
+    created_at = datetime(2024, 5, 1)
+    feedback_rows = [
+        build_feedback_row(project.id, "make it pop", created_at=created_at),
+        build_feedback_row(project.id, "logo feels lost", created_at=created_at + timedelta(hours=1)),
+    ]
+    task_rows = [build_task_row(row, {"task": task}) for row in feedback_rows for task in ("A", "B")]
+    task_rows[0]["is_completed"] = True
+    await save_feedback_with_tasks(db_session, feedback_rows, task_rows)
+
+    other = Project(user_id=user.id, name="Other", feedback_count=7)
+    db_session.add(other)
+    await db_session.execute(
+        update(Project).where(Project.id == project.id).values(
+            feedback_count=40, task_count=0, completed_task_count=9, last_feedback_at=None
+        )
+    )
+    await db_session.commit()
+
+    assert await reconcile_project_counters(db_session, [project.id]) == 1
+
+    assert await counters(db_session, project) == (2, 4, 1, created_at + timedelta(hours=1))
+    # Projects not asked for are left alone
+    assert (await counters(db_session, other))[0] == 7
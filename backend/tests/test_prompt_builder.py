@@ -0,0 +1,53 @@
+"""
+Test prompt assembly and token budgeting
+"""
+from types import SimpleNamespace
+
+from app.services.prompt_builder import PromptBuilder, count_tokens
+
+SYSTEM_PROMPT = "You translate vague feedback into design tasks. " * 20
+
+
+def test_system_prefix_is_identical_across_calls():
+    """Only the user message changes between prompts."""
+    builder = PromptBuilder(SYSTEM_PROMPT, "gpt-4")
+    first = builder.build("make it pop")
+    second = builder.build("the logo should be bigger")
+
+    assert first.messages[0] == second.messages[0] == {"role": "system", "content": SYSTEM_PROMPT}
+    assert first.messages[1] == {"role": "user", "content": "make it pop"}
+    assert first.prompt_tokens == builder.prefix_tokens + 3 + count_tokens("make it pop", "gpt-4")
+
+
+def test_max_tokens_grows_with_input_up_to_max_tasks():
+    """Short feedback gets the minimum budget; long feedback is capped."""
+    builder = PromptBuilder(SYSTEM_PROMPT, "gpt-4", tokens_per_task=100, min_tasks=3, max_tasks=5)
+
+    short = builder.build("make it pop")
+    medium = builder.build("word " * 60)
+    long = builder.build("word " * 2000)
+
+    assert short.max_tokens == builder.overhead_tokens + 300
+    assert short.max_tokens < medium.max_tokens <= long.max_tokens
+    assert long.max_tokens == builder.overhead_tokens + 500
+    assert long.reserved_tokens == long.prompt_tokens + long.max_tokens
+
+
+def test_usage_is_recorded_from_objects_and_stream_dicts():
+    """Completion usage is accounted whichever shape it arrives in."""
+    builder = PromptBuilder(SYSTEM_PROMPT, "gpt-4")
+    prompt = builder.build("make it pop")
+
+    builder.record(prompt, SimpleNamespace(
+        prompt_tokens=200,
+        completion_tokens=prompt.max_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=128),
+    ))
+    builder.record(prompt, {"prompt_tokens": 200, "completion_tokens": 50})
+    builder.record(prompt, None)
+
+    stats = builder.stats()
+    assert stats["calls"] == 2
+    assert stats["prompt_tokens_avg"] == 200
+    assert stats["cached_prompt_ratio"] == 0.32
+    assert stats["hit_limit"] == 1
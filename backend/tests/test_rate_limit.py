@@ -0,0 +1,82 @@
+"""
+Test the token-bucket rate limiter
+"""
+import pytest
+
+from app.core.rate_limit import TokenBucketLimiter
+from app.services.rate_limit_store import PostgresRateLimitStore
+from tests.conftest import TestSessionLocal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_then_refill_at_rate():
+    """A full bucket allows `burst` requests, then one more per 1/rate seconds."""
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(clock=clock)
+
+    assert [limiter.acquire("user", rate=0.5, burst=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("user", rate=0.5, burst=3) == 2.0
+
+    clock.now += 1
+    assert limiter.acquire("user", rate=0.5, burst=3) == 1.0
+    clock.now += 1
+    assert limiter.acquire("user", rate=0.5, burst=3) == 0.0
+
+    clock.now += 3600
+    assert [limiter.acquire("user", rate=0.5, burst=3) for _ in range(4)][-1] > 0
+    assert limiter.stats()["limited"] == 3
+
+
+def test_keys_are_isolated_and_bounded():
+    """One key's flood does not limit another; old keys are evicted and start full."""
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(max_keys=2, clock=clock)
+
+    assert limiter.acquire("a", rate=1, burst=1) == 0.0
+    assert limiter.acquire("a", rate=1, burst=1) > 0
+    assert limiter.acquire("b", rate=1, burst=1) == 0.0
+
+    limiter.acquire("c", rate=1, burst=1)
+    assert len(limiter) == 2
+    assert limiter.acquire("a", rate=1, burst=1) == 0.0
+
+
+def test_cost_above_burst_drains_the_bucket():
+    """A batch larger than the burst is let through once instead of never."""
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(clock=clock)
+
+    assert limiter.acquire("user", rate=1, burst=5, cost=50) == 0.0
+    assert limiter.acquire("user", rate=1, burst=5) == 1.0
+
+
+def test_debt_charges_the_full_cost_of_an_oversized_batch():
+    """With allow_debt a batch above the burst is let through once and paid off after."""
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(clock=clock)
+
+    assert limiter.acquire("user", rate=1, burst=5, cost=50, allow_debt=True) == 0.0
+    # 45 tokens in debt plus the one this request needs
+    assert limiter.acquire("user", rate=1, burst=5) == 46.0
+    assert limiter.acquire("user", rate=1, burst=5, cost=50, allow_debt=True) == 50.0
+
+    clock.now += 46
+    assert limiter.acquire("user", rate=1, burst=5) == 0.0
+
+
+async def test_shared_store_carries_debt(db_session):
+    """The Postgres buckets charge oversized batches the same way as the local ones."""
+    store = PostgresRateLimitStore(TestSessionLocal)
+
+    assert await store.acquire("clamped", rate=1, burst=5, cost=50) == 0.0
+    assert await store.acquire("clamped", rate=1, burst=5) == pytest.approx(1.0, abs=0.1)
+
+    assert await store.acquire("debt", rate=1, burst=5, cost=50, allow_debt=True) == 0.0
+    assert await store.acquire("debt", rate=1, burst=5) == pytest.approx(46.0, abs=0.1)
@@ -0,0 +1,156 @@
+"""
+Test deadlines, retries, hedging and the circuit breaker around model calls
+"""
+import asyncio
+import json
+
+import httpx
+import openai
+import pytest
+
+from app.services.llm_client import LLMClient
+from app.services.resilience import CircuitBreaker, CircuitOpenError, ResilientCall
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": json.dumps({"tasks": []})},
+    }],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _flaky(failures, error=ConnectionError, delay=0.0):
+    calls = []
+
+    async def call(timeout):
+        calls.append(timeout)
+        await asyncio.sleep(delay)
+        if len(calls) <= failures:
+            raise error("upstream down")
+        return "ok"
+
+    return call, calls
+
+
+async def test_retries_transient_errors_with_jittered_backoff():
+    """Retryable errors are retried with random delays; success resets the breaker."""
+    delays = iter([0.5, 0.25])
+    caller = ResilientCall(retryable=(ConnectionError,), base_delay_seconds=0.01, rng=lambda: next(delays))
+    call, calls = _flaky(failures=2)
+
+    assert await caller(call) == "ok"
+    assert len(calls) == 3
+    assert caller.retries == 2
+    assert caller.breaker.state == "closed"
+
+
+async def test_non_retryable_errors_pass_through_without_tripping():
+    """A 4xx-style error is the caller's problem, not an upstream outage."""
+    caller = ResilientCall(retryable=(ConnectionError,), breaker=CircuitBreaker(failure_threshold=1))
+    call, calls = _flaky(failures=5, error=ValueError)
+
+    with pytest.raises(ValueError):
+        await caller(call)
+    assert len(calls) == 1
+    assert caller.breaker.state == "closed"
+
+
+async def test_deadline_bounds_total_time():
+    """A hanging upstream costs at most the deadline, not attempts x timeout."""
+    caller = ResilientCall(deadline_seconds=0.1, attempts=5, base_delay_seconds=0.01)
+
+    async def hang(timeout):
+        await asyncio.sleep(10)
+
+    started = asyncio.get_running_loop().time()
+    with pytest.raises(asyncio.TimeoutError):
+        await caller(hang)
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert caller.deadlines_exceeded == 1
+
+
+async def test_breaker_opens_then_probes_after_reset():
+    """Repeated failures open the circuit; one probe is allowed after the reset period."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=clock)
+    caller = ResilientCall(breaker=breaker, retryable=(ConnectionError,), attempts=1)
+    call, calls = _flaky(failures=2)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await caller(call)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        await caller(call)
+    assert len(calls) == 2
+
+    clock.now += 30
+    assert not breaker.rejecting
+    assert await caller(call) == "ok"
+    assert breaker.state == "closed"
+
+
+async def test_hedged_request_beats_a_slow_first_attempt():
+    """Once latency history exists, a slow attempt gets a second request that wins."""
+    caller = ResilientCall(hedge_percentile=0.95, hedge_min_samples=1)
+    caller.latencies.add(0.01)
+    delays = iter([1.0, 0.0])
+    cancelled = []
+
+    async def call(timeout):
+        delay = next(delays)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    assert await caller(call) == 0.0
+    await asyncio.sleep(0)
+    assert caller.hedges == 1
+    assert caller.hedge_wins == 1
+    assert cancelled == [1.0]
+
+
+async def test_recovers_from_server_errors_of_a_local_fake_openai():
+    """The OpenAI SDK's 5xx errors are retried against a fake server; the breaker stays closed."""
+    responses = [httpx.Response(500, json={"error": {"message": "boom"}})] * 2
+    responses.append(httpx.Response(200, json=COMPLETION))
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(handler))
+    caller = ResilientCall(
+        retryable=(openai.APIConnectionError, openai.InternalServerError),
+        base_delay_seconds=0.01
+    )
+    try:
+        response = await caller(lambda timeout: client.chat_completion(
+            [{"role": "user", "content": "make it pop"}],
+            model="gpt-4",
+            timeout=timeout
+        ))
+    finally:
+        await client.aclose()
+
+    assert response.usage.total_tokens == 15
+    assert len(requests) == 3
+    assert caller.breaker.state == "closed"
@@ -0,0 +1,102 @@
+"""
+Test screenshot upload staging and deduplication
+"""
+import hashlib
+
+import pytest
+
+from app.models.feedback import SourceType
+from app.services.feedback_service import build_feedback_row, build_task_row, save_feedback_with_tasks
+from app.services.image_processing import ScreenshotError
+from app.services.screenshot_service import UploadTooLarge, find_duplicate_screenshot, stage_upload
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+
+
+class Body:
+    """An upload arriving in chunks; records how many were read."""
+
+    def __init__(self, *chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+async def test_upload_is_staged_with_size_and_digest(tmp_path):
+    chunks = [PNG_HEADER, b"\x00" * 1000, b"\x01" * 500]
+
+    staged = await stage_upload(Body(*chunks), str(tmp_path), max_bytes=2000)
+
+    assert staged.content_type == "image/png"
+    assert staged.size == 1516
+    assert staged.sha256 == hashlib.sha256(b"".join(chunks)).hexdigest()
+    with open(staged.path, "rb") as f:
+        assert f.read() == b"".join(chunks)
+
+
+async def test_upload_over_the_limit_is_rejected_and_removed(tmp_path):
+    body = Body(PNG_HEADER, b"\x00" * 1000, b"\x00" * 1000, b"\x00" * 1000)
+
+    with pytest.raises(UploadTooLarge):
+        await stage_upload(body, str(tmp_path), max_bytes=2000)
+
+    assert body.read == 3
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_non_image_is_rejected_from_its_first_bytes(tmp_path):
+    """A PDF is refused before the rest of it is read."""
+    body = Body(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n1 0 obj", b"\x00" * 1000, b"\x00" * 1000)
+
+    with pytest.raises(ScreenshotError):
+        await stage_upload(body, str(tmp_path), max_bytes=10_000)
+
+    assert body.read == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_tiny_non_image_is_rejected(tmp_path):
+    with pytest.raises(ScreenshotError):
+        await stage_upload(Body(b"hi"), str(tmp_path), max_bytes=10_000)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+async def save_screenshot_feedback(db_session, project, comment, phash, tasks=("Increase contrast",)):
+    feedback_row = build_feedback_row(
+        project.id, comment, SourceType.SCREENSHOT,
+        input_metadata={"screenshot": {"path": "shot.webp", "phash": phash}}
+    )
+    task_rows = [build_task_row(feedback_row, {"task": task}) for task in tasks]
+    await save_feedback_with_tasks(db_session, [feedback_row], task_rows)
+    return feedback_row["id"]
+
+
+async def test_duplicate_needs_a_close_hash_and_the_same_comment(db_session, project):
+    await save_screenshot_feedback(db_session, project, "Make it pop!", "ff00ff00ff00ff03", ["A", "B"])
+    nearest = await save_screenshot_feedback(db_session, project, "make it pop", "ff00ff00ff00ff01", ["C"])
+    await save_screenshot_feedback(db_session, project, "Logo bigger", "ff00ff00ff00ff00")
+
+    duplicate = await find_duplicate_screenshot(db_session, project.id, "ff00ff00ff00ff00", "MAKE IT POP.")
+
+    assert duplicate is not None
+    feedback_id, screenshot, tasks = duplicate
+    assert feedback_id == nearest
+    assert screenshot["phash"] == "ff00ff00ff00ff01"
+    assert [task["task"] for task in tasks] == ["C"]
+
+    # Same comment, but the image is too different
+    assert await find_duplicate_screenshot(db_session, project.id, "00ff00ff00ff00ff", "make it pop") is None
+    # Same image, different comment
+    assert await find_duplicate_screenshot(db_session, project.id, "ff00ff00ff00ff00", "Use the brand blue") is None
+
+
+async def test_text_feedback_is_not_a_duplicate(db_session, project):
+    feedback_row = build_feedback_row(project.id, "make it pop")
+    await save_feedback_with_tasks(db_session, [feedback_row], [build_task_row(feedback_row, {"task": "A"})])
+
+    assert await find_duplicate_screenshot(db_session, project.id, "ff00ff00ff00ff00", "make it pop") is None
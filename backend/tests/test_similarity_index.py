@@ -0,0 +1,90 @@
+"""
+Test the near-duplicate feedback index
+"""
+from app.core.config import Settings, settings
+from app.models.project import Project
+from app.services import feedback_index
+from app.services.feedback_service import build_feedback_row, build_task_row, save_feedback_with_tasks
+from app.services.similarity_index import SimilarityIndex, jaccard, tokenize
+
+
+def test_finds_paraphrase_for_same_owner_only():
+    """Matches are scoped to the owner that stored the input."""
+    index = SimilarityIndex()
+    index.add("a", "Make the logo bigger and bolder on the homepage hero", owner="alice")
+    index.add("b", "The footer feels cramped, add more breathing room", owner="alice")
+
+    match = index.query("make the logo bigger and bolder on the homepage hero!", owner="alice")
+    assert match is not None and match[0] == "a"
+    assert index.query("make the logo bigger and bolder on the homepage hero", owner="bob") is None
+
+
+def test_unrelated_text_is_not_matched():
+    """Nothing above the threshold returns None."""
+    index = SimilarityIndex()
+    index.add("a", "Make the logo bigger and bolder", owner="alice")
+    assert index.query("switch the palette to warmer tones", threshold=0.5, owner="alice") is None
+
+
+def test_lookups_span_merged_and_pending_rows():
+    """Rows are found both before and after the tail is merged."""
+    index = SimilarityIndex(merge_threshold=8)
+    texts = [f"increase heading size {i} and tighten spacing grid {i}" for i in range(20)]
+    for i, text in enumerate(texts):
+        index.add(i, text)
+
+    assert len(index) == 20
+    for i in (0, 7, 15, 19):
+        match = index.query(texts[i], threshold=0.99)
+        assert match is not None and match[0] == i
+
+
+def test_negation_and_word_order_change_the_shingles():
+    """Word pairs, not a bag of words: the same words in another sense are far apart."""
+    same = set(tokenize("Make the logo bigger!"))
+    assert jaccard(same, set(tokenize("make the logo bigger"))) == 1.0
+    assert jaccard(same, set(tokenize("don't make the logo bigger"))) < 0.9
+    assert jaccard(set(tokenize("logo bigger, header smaller")), set(tokenize("header bigger, logo smaller"))) < 0.5
+
+    index = SimilarityIndex()
+    index.add("a", "make the logo bigger", owner="project")
+    assert index.query("don't make the logo bigger", threshold=0.9, owner="project") is None
+
+
+class FixedIndex:
+    """Nominates one input as if the MinHash estimate were a perfect match."""
+
+    def __init__(self, input_id):
+        self.input_id = input_id
+
+    def query(self, text, threshold, owner):
+        return self.input_id, 1.0
+
+
+async def save_feedback(db_session, project, text):
+    feedback_row = build_feedback_row(project.id, text)
+    await save_feedback_with_tasks(db_session, [feedback_row], [build_task_row(feedback_row, {"task": "Scale logo"})])
+    return feedback_row["id"]
+
+
+async def test_tasks_are_reused_only_after_an_exact_check_in_the_same_project(db_session, user, project, monkeypatch):
+    monkeypatch.setattr(settings, "SIMILARITY_INDEX_ENABLED", True)
+    monkeypatch.setattr(settings, "SIMILARITY_THRESHOLD", 0.9)
+    other_project = Project(user_id=user.id, name="Another client")
+    db_session.add(other_project)
+    await db_session.commit()
+    input_id = await save_feedback(db_session, project, "make the logo bigger")
+
+    monkeypatch.setattr(feedback_index, "feedback_index", FixedIndex(input_id))
+
+    tasks = await feedback_index.find_similar_tasks(db_session, "Make the logo bigger!", project.id)
+    assert [task["task"] for task in tasks] == ["Scale logo"]
+    # The estimate nominated it, but the texts are not actually that close
+    assert await feedback_index.find_similar_tasks(db_session, "don't make the logo bigger", project.id) is None
+    # Another project of the same user never shares tasks
+    assert await feedback_index.find_similar_tasks(db_session, "make the logo bigger", other_project.id) is None
+
+
+async def test_reuse_is_off_by_default(db_session, project):
+    assert Settings.model_fields["SIMILARITY_INDEX_ENABLED"].default is False
+    assert await feedback_index.find_similar_tasks(db_session, "make the logo bigger", project.id) is None
@@ -0,0 +1,91 @@
+"""
+Test bulk task completion
+"""
+import uuid
+
+from app.api.v1.endpoints import tasks as tasks_endpoint
+from app.core.config import settings
+from app.models.feedback import GeneratedTask
+from app.models.project import Project
+from app.models.user import User
+from app.services.feedback_service import build_feedback_row, build_task_row, save_feedback_with_tasks
+
+
+async def seed_tasks(db_session, project, count):
+    feedback_row = build_feedback_row(project.id, "make it pop")
+    task_rows = [build_task_row(feedback_row, {"task": f"Task {i}"}) for i in range(count)]
+    await save_feedback_with_tasks(db_session, [feedback_row], task_rows)
+    return feedback_row["id"], [row["id"] for row in task_rows]
+
+
+def spy_on_deltas(monkeypatch):
+    deltas = []
+    record_completions = tasks_endpoint.record_completions
+
+    async def spy(db, project_deltas):
+        deltas.append(dict(project_deltas))
+        await record_completions(db, project_deltas)
+
+    monkeypatch.setattr(tasks_endpoint, "record_completions", spy)
+    return deltas
+
+
+async def test_only_the_callers_tasks_are_completed(api_client, db_session, project, monkeypatch):
+    stranger = User(email="stranger@example.com", clerk_user_id="user_stranger")
+    db_session.add(stranger)
+    await db_session.commit()
+    their_project = Project(user_id=stranger.id, name="Not yours")
+    db_session.add(their_project)
+    await db_session.commit()
+
+    _, own_ids = await seed_tasks(db_session, project, 3)
+    _, their_ids = await seed_tasks(db_session, their_project, 2)
+    deltas = spy_on_deltas(monkeypatch)
+
+    response = await api_client.post("/api/v1/tasks/complete", json={
+        "task_ids": [str(task_id) for task_id in own_ids[:2] + their_ids]
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert body["projects"] == [
+        {"project_id": str(project.id), "task_count": 3, "completed_task_count": 2}
+    ]
+    assert deltas == [{project.id: 2}]
+    for task_id in their_ids:
+        task = await db_session.get(GeneratedTask, task_id)
+        await db_session.refresh(task)
+        assert task.is_completed is False
+
+
+async def test_reopening_a_feedback_passes_negative_deltas(api_client, db_session, project, monkeypatch):
+    feedback_id, task_ids = await seed_tasks(db_session, project, 3)
+    await api_client.post("/api/v1/tasks/complete", json={"feedback_id": str(feedback_id)})
+    deltas = spy_on_deltas(monkeypatch)
+
+    response = await api_client.post("/api/v1/tasks/complete", json={
+        "task_ids": [str(task_ids[0])], "completed": False
+    })
+
+    assert response.json()["updated"] == 1
+    assert deltas == [{project.id: -1}]
+    assert response.json()["projects"][0]["completed_task_count"] == 2
+
+    # Already in the requested state: nothing changes, nothing is recorded
+    response = await api_client.post("/api/v1/tasks/complete", json={
+        "task_ids": [str(task_ids[0])], "completed": False
+    })
+    assert response.json() == {"updated": 0, "projects": []}
+    assert deltas[-1] == {}
+
+
+async def test_request_size_is_capped(api_client, monkeypatch):
+    monkeypatch.setattr(settings, "TASK_BULK_UPDATE_MAX_ITEMS", 2)
+
+    response = await api_client.post("/api/v1/tasks/complete", json={
+        "task_ids": [str(uuid.uuid4()) for _ in range(3)]
+    })
+
+    assert response.status_code == 400
+    assert "At most 2 tasks" in response.json()["detail"]
@@ -0,0 +1,109 @@
+"""
+Test the incremental task parser
+"""
+import pytest
+
+from app.services.task_parser import TaskStreamParser
+
+
+def feed_in_chunks(document, size):
+    parser = TaskStreamParser()
+    emitted = []
+    for start in range(0, len(document), size):
+        emitted.append(parser.feed(document[start:start + size]))
+    return emitted
+
+
+def test_tasks_are_emitted_as_soon_as_they_close():
+    """The first task is available before the document is complete."""
+    document = '{"tasks": [{"task": "Increase contrast"}, {"task": "Add shadow"}]}'
+    first_close = document.index("}") + 1
+    parser = TaskStreamParser()
+
+    assert parser.feed(document[:first_close]) == [{"task": "Increase contrast"}]
+    assert parser.feed(document[first_close:]) == [{"task": "Add shadow"}]
+
+
+def test_braces_and_quotes_inside_strings_are_ignored():
+    """Structural characters inside task text do not confuse the scanner."""
+    document = '{"tasks": [{"task": "Wrap the \\"CTA\\" in {braces} and [brackets]"}]}'
+    tasks = [task for chunk in feed_in_chunks(document, 3) for task in chunk]
+    assert tasks == [{"task": 'Wrap the "CTA" in {braces} and [brackets]'}]
+
+
+def test_bare_array_is_supported():
+    """A bare array of task objects works too."""
+    tasks = [task for chunk in feed_in_chunks('[{"task": "A"}, {"task": "B"}]', 5) for task in chunk]
+    assert [task["task"] for task in tasks] == ["A", "B"]
+
+
+def parse(document, size):
+    parser = TaskStreamParser()
+    tasks = []
+    for start in range(0, len(document), size):
+        tasks += parser.feed(document[start:start + size])
+    return [task["task"] for task in tasks + parser.finish()], parser
+
+
+WRAPPED = '{"tasks": [{"task": "A", "estimated_time_minutes": 15}, {"task": "B", "difficulty_level": "easy"}]}'
+
+# Response shapes seen from the model, with what should come out of each
+CORPUS = [
+    ("wrapped", WRAPPED, ["A", "B"], True),
+    ("fenced_with_prose", f"Here are the tasks:\n```json\n{WRAPPED}\n```\nLet me know!", ["A", "B"], True),
+    ("bare_array", '[{"task": "A"}, {"task": "B"}]', ["A", "B"], True),
+    ("string_array", '{"tasks": ["A", "B"]}', ["A", "B"], True),
+    ("bare_string_array", '["A", "B"]', ["A", "B"], True),
+    ("strings_outside_tasks", '{"tasks": [{"task": "A", "tags": ["x"]}], "notes": ["do not cache"]}', ["A"], True),
+    ("lone_object", '{"task": "A", "estimated_time_minutes": 5}', ["A"], True),
+    ("nested_values", '[{"task": "A", "tags": ["x", {"y": 1}]}, {"task": "B"}]', ["A", "B"], True),
+    ("escapes", r'[{"task": "Quote \"CTA\" and C:\\path\\"}]', ['Quote "CTA" and C:\\path\\'], True),
+    ("truncated_after_field", '{"tasks": [{"task": "A"}, {"task": "B", "estimated_time_mi', ["A", "B"], False),
+    ("truncated_after_value", '{"tasks": [{"task": "A"}, {"task": "B", "difficulty_level": "easy"', ["A", "B"], False),
+    ("truncated_mid_task", '{"tasks": [{"task": "A"}, {"task": "Incre', ["A"], False),
+    ("prose_list", "1. Increase contrast\n2. Add a drop shadow\n- Scale the logo", [
+        "Increase contrast", "Add a drop shadow", "Scale the logo"
+    ], False),
+    ("prose_with_preamble", "Sure! Here are the tasks:\n\n- Increase contrast\n- Add a drop shadow", [
+        "Increase contrast", "Add a drop shadow"
+    ], False),
+    ("prose_with_heading", "Tasks:\nIncrease contrast\nAdd a drop shadow", [
+        "Increase contrast", "Add a drop shadow"
+    ], False),
+]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+@pytest.mark.parametrize("name,document,expected,cacheable", CORPUS, ids=[case[0] for case in CORPUS])
+def test_corpus_is_parsed_at_any_chunk_size(name, document, expected, cacheable, size):
+    """Chunk boundaries (even inside escapes) never change the result."""
+    tasks, parser = parse(document, size)
+    assert tasks == expected
+    assert (parser.complete and not parser.salvaged) == cacheable
+
+
+def test_objects_without_a_task_are_skipped():
+    """Objects that are not tasks, and empty tasks, are not emitted."""
+    tasks, parser = parse('{"tasks": [{"note": "x"}, {"task": "  "}, {"task": "A"}]}', 4)
+    assert tasks == ["A"]
+    assert parser.salvaged
+
+
+@pytest.mark.parametrize("document", [
+    '{"tasks": [{"task": "A"}, {"task": 42}]}',
+    '{"tasks": [{"task": "A"}, {"task": ["B", "C"]}]}',
+    '{"tasks": [{"task": "A"}, {"task": null}]}',
+    '{"tasks": ["A", ""]}',
+])
+def test_dropped_items_mark_the_result_as_salvaged(document):
+    """A reply with unusable items is served but not reported as clean (so not cached)."""
+    tasks, parser = parse(document, 3)
+    assert tasks == ["A"]
+    assert parser.complete and parser.salvaged
+
+
+def test_text_after_json_is_not_treated_as_prose():
+    """Once JSON has been seen, trailing chatter is ignored."""
+    tasks, parser = parse('[{"task": "A"}]\nHope this helps', 3)
+    assert tasks == ["A"]
+    assert not parser.salvaged
@@ -0,0 +1,60 @@
+"""
+Test the micro-batching window
+"""
+import asyncio
+
+import pytest
+
+from app.services.translation_batcher import MicroBatcher
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, key, items):
+        self.batches.append((key, items))
+        return [f"{key}:{item}" for item in items]
+
+
+async def test_items_in_one_window_share_a_batch():
+    """Concurrent submissions for a key are run together, each getting its own result."""
+    run = Recorder()
+    batcher = MicroBatcher(run, window_seconds=0.01, max_items=8)
+
+    results = await asyncio.gather(
+        batcher.submit("p1", "a"),
+        batcher.submit("p1", "b"),
+        batcher.submit("p2", "c"),
+    )
+
+    assert results == ["p1:a", "p1:b", "p2:c"]
+    assert sorted(run.batches) == [("p1", ["a", "b"]), ("p2", ["c"])]
+    assert batcher.stats()["items_per_batch"] == 1.5
+
+
+async def test_full_batch_runs_without_waiting_for_the_window():
+    """Reaching max_items flushes at once."""
+    run = Recorder()
+    batcher = MicroBatcher(run, window_seconds=60, max_items=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit("p", "a"), batcher.submit("p", "b")),
+        timeout=1
+    )
+
+    assert results == ["p:a", "p:b"]
+
+
+async def test_failure_reaches_every_caller_and_cancelled_callers_are_skipped():
+    """A failing batch raises for each caller; a caller that left is not run."""
+    async def fail(key, items):
+        raise RuntimeError(f"upstream down for {items}")
+
+    batcher = MicroBatcher(fail, window_seconds=0.01, max_items=8)
+    gone = asyncio.ensure_future(batcher.submit("p", "gone"))
+    await asyncio.sleep(0)
+    gone.cancel()
+
+    with pytest.raises(RuntimeError, match=r"\['kept'\]"):
+        await batcher.submit("p", "kept")
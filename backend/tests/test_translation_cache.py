@@ -0,0 +1,68 @@
+"""
+Test the translation cache
+"""
+from app.core.lru import TTLCache
+from app.services.translation_cache import (
+    TranslationCache,
+    normalize_feedback,
+    translation_cache_key,
+)
+
+
+def test_key_ignores_case_whitespace_and_edge_punctuation():
+    """Trivially different phrasings share a cache key."""
+    assert normalize_feedback("  Make it   POP! ") == "make it pop"
+    assert translation_cache_key("Make it pop!", "gpt-4", "v1") == \
+        translation_cache_key("make  it pop", "gpt-4", "v1")
+
+
+def test_key_includes_model_and_prompt_version():
+    """A new model or prompt must not reuse old translations."""
+    key = translation_cache_key("make it pop", "gpt-4", "v1")
+    assert key != translation_cache_key("make it pop", "gpt-3.5-turbo", "v1")
+    assert key != translation_cache_key("make it pop", "gpt-4", "v2")
+
+
+def test_lru_evicts_least_recently_used():
+    """Size-based eviction drops the oldest unused entry."""
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_expires_entries():
+    """Entries past their TTL are misses."""
+    cache = TTLCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+class FakeSharedBackend:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.values[key] = value
+
+
+async def test_shared_tier_hit_populates_local_tier():
+    """A hit in the shared tier is promoted to the in-process LRU."""
+    shared = FakeSharedBackend()
+    shared.values["k"] = [{"task": "Increase contrast"}]
+    cache = TranslationCache(shared=shared)
+
+    assert await cache.get("k") == [{"task": "Increase contrast"}]
+    assert await cache.get("k") == [{"task": "Increase contrast"}]
+    stats = cache.stats()
+    assert stats["shared_hits"] == 1
+    assert stats["local_hits"] == 1
+    assert stats["misses"] == 0
@@ -0,0 +1,239 @@
+"""
+Test the translator service against a mocked OpenAI endpoint
+"""
+import json
+
+import httpx
+import openai
+
+from app.core.config import settings
+from app.services.llm_client import LLMClient
+from app.services.llm_scheduler import LLMScheduler, ModelBudget
+from app.services.resilience import ResilientCall
+from app.services.translation_cache import TranslationCache, translation_cache_key
+from app.services.translator_service import TranslatorService
+
+PRIMARY = settings.OPENAI_MODEL
+FALLBACK = settings.OPENAI_FALLBACK_MODEL
+
+
+def completion(content, model=PRIMARY, finish_reason="stop"):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "finish_reason": finish_reason,
+            "message": {"role": "assistant", "content": content},
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def tasks_reply(*tasks):
+    return json.dumps({"tasks": [{"task": task} for task in tasks]})
+
+
+def make_translator(handler):
+    """A TranslatorService whose model calls are answered by handler(request_json)."""
+    requests = []
+
+    def respond(request):
+        body = json.loads(request.content)
+        requests.append(body)
+        return handler(body)
+
+    translator = TranslatorService(
+        client=LLMClient(api_key="test", transport=httpx.MockTransport(respond)),
+        cache=TranslationCache(max_entries=100),
+        scheduler=LLMScheduler([ModelBudget(PRIMARY, 10**9), ModelBudget(FALLBACK, 10**9)]),
+        caller=ResilientCall(
+            retryable=(openai.APIConnectionError, openai.InternalServerError),
+            attempts=1
+        ),
+    )
+    return translator, requests
+
+
+def cached_key(text):
+    return translation_cache_key(text, PRIMARY, TranslatorService.PROMPT_VERSION)
+
+
+async def test_primary_answers_are_cached():
+    """A complete reply from the primary model is served from cache next time."""
+    translator, requests = make_translator(lambda body: httpx.Response(200, json=completion(tasks_reply("A", "B"))))
+    try:
+        first = await translator.translate_feedback("make it pop")
+        second = await translator.translate_feedback("Make it pop!")
+    finally:
+        await translator.client.aclose()
+
+    assert [task["task"] for task in first] == ["A", "B"]
+    assert second == first
+    assert len(requests) == 1
+
+
+async def test_fallback_model_answers_are_not_cached():
+    """The cache key names the primary model, so the fallback's output must not land under it."""
+    def handler(body):
+        if body["model"] == PRIMARY:
+            return httpx.Response(429, json={"error": {"message": "slow down", "type": "rate_limit"}})
+        return httpx.Response(200, json=completion(tasks_reply("From fallback"), model=FALLBACK))
+
+    translator, requests = make_translator(handler)
+    try:
+        tasks = await translator.translate_feedback("make it pop")
+    finally:
+        await translator.client.aclose()
+
+    assert [task["task"] for task in tasks] == ["From fallback"]
+    assert [body["model"] for body in requests] == [PRIMARY, FALLBACK]
+    assert await translator.cache.get(cached_key("make it pop")) is None
+
+
+def packed_reply(*pairs):
+    return json.dumps({"tasks": [{"item": item, "task": task} for item, task in pairs]})
+
+
+def is_packed(body):
+    return body["messages"][0]["content"] == TranslatorService.PACKED_SYSTEM_PROMPT
+
+
+def single_reply(body):
+    """Answer a one-comment call with a task naming the comment."""
+    return httpx.Response(200, json=completion(tasks_reply(f"Alone: {body['messages'][-1]['content']}")))
+
+
+COMMENTS = ["make it pop", "logo bigger", "more whitespace"]
+
+
+async def test_packed_reply_is_regrouped_by_item():
+    """Tasks go to the comment their "item" names, in any order, as an int or digit string."""
+    reply = packed_reply(
+        (2, "C1"), (0, "A1"), ("1", "B1"), (0, "A2"),
+        (7, "Out of range"), (-1, "Negative"), (True, "Boolean"), ("one", "Not a number"),
+    )
+    translator, requests = make_translator(lambda body: httpx.Response(200, json=completion(reply)))
+    try:
+        results = await translator.translate_many(COMMENTS)
+    finally:
+        await translator.client.aclose()
+
+    assert [[task["task"] for task in tasks] for tasks in results] == [["A1", "A2"], ["B1"], ["C1"]]
+    assert all("item" not in task for tasks in results for task in tasks)
+    assert len(requests) == 1 and is_packed(requests[0])
+    assert json.loads(requests[0]["messages"][-1]["content"]) == COMMENTS
+
+
+async def test_comments_missing_from_packed_reply_are_retried_alone():
+    def handler(body):
+        if is_packed(body):
+            return httpx.Response(200, json=completion(packed_reply((0, "A1"), (2, "C1"))))
+        return single_reply(body)
+
+    translator, requests = make_translator(handler)
+    try:
+        results = await translator.translate_many(COMMENTS)
+    finally:
+        await translator.client.aclose()
+
+    assert [[task["task"] for task in tasks] for tasks in results] == [["A1"], ["Alone: logo bigger"], ["C1"]]
+    assert [is_packed(body) for body in requests] == [True, False]
+
+
+async def test_truncated_packed_reply_drops_the_comment_being_written():
+    """The last comment in a cut-off reply may be missing tasks, so it is retried alone."""
+    reply = '{"tasks": [{"item": 0, "task": "A1"}, {"item": 1, "task": "B1"}, {"item": 1, "task": "B2 is cut'
+
+    def handler(body):
+        if is_packed(body):
+            return httpx.Response(200, json=completion(reply, finish_reason="length"))
+        return single_reply(body)
+
+    translator, requests = make_translator(handler)
+    try:
+        results = await translator.translate_many(COMMENTS)
+    finally:
+        await translator.client.aclose()
+
+    assert [[task["task"] for task in tasks] for tasks in results] == [
+        ["A1"], ["Alone: logo bigger"], ["Alone: more whitespace"]
+    ]
+    assert len(requests) == 3
+    # Nothing from an incomplete reply is cached
+    assert await translator.cache.get(cached_key("make it pop")) is None
+
+
+async def test_packed_results_are_cached_per_comment():
+    reply = packed_reply((0, "A1"), (1, "B1"), (2, "C1"))
+    translator, requests = make_translator(lambda body: httpx.Response(200, json=completion(reply)))
+    try:
+        first = await translator.translate_many(COMMENTS)
+        # Each comment is cached on its own, so it is found again alone or in another batch
+        alone = await translator.translate_feedback("Logo bigger!")
+        second = await translator.translate_many(list(reversed(COMMENTS)))
+    finally:
+        await translator.client.aclose()
+
+    assert await translator.cache.get(cached_key("more whitespace")) == [{"task": "C1"}]
+    assert alone == first[1]
+    assert second == list(reversed(first))
+    assert len(requests) == 1
+
+
+async def test_failed_pack_call_returns_fallback_tasks():
+    translator, requests = make_translator(
+        lambda body: httpx.Response(500, json={"error": {"message": "boom", "type": "server_error"}})
+    )
+    try:
+        results = await translator.translate_many(COMMENTS)
+    finally:
+        await translator.client.aclose()
+
+    assert len(requests) == 1
+    for comment, tasks in zip(COMMENTS, results):
+        assert tasks == translator._fallback_tasks(comment)
+    assert await translator.cache.get(cached_key("make it pop")) is None
+
+
+async def test_failures_are_returned_per_comment_when_asked():
+    """With return_exceptions a failed call yields its error, not placeholder tasks."""
+    long_comment = "The hero section feels cluttered and " + "the colours fight each other " * 12
+
+    def handler(body):
+        if is_packed(body):
+            return httpx.Response(200, json=completion(packed_reply((0, "A1"), (1, "B1"))))
+        return httpx.Response(500, json={"error": {"message": "boom", "type": "server_error"}})
+
+    translator, _ = make_translator(handler)
+    try:
+        results = await translator.translate_many(["make it pop", "logo bigger", long_comment], return_exceptions=True)
+    finally:
+        await translator.client.aclose()
+
+    assert results[:2] == [[{"task": "A1"}], [{"task": "B1"}]]
+    assert isinstance(results[2], openai.InternalServerError)
+
+    translator, _ = make_translator(
+        lambda body: httpx.Response(500, json={"error": {"message": "boom", "type": "server_error"}})
+    )
+    try:
+        results = await translator.translate_many(COMMENTS, return_exceptions=True)
+    finally:
+        await translator.client.aclose()
+
+    assert all(isinstance(result, openai.InternalServerError) for result in results)
+
+
+async def test_reply_with_dropped_items_is_not_cached():
+    reply = json.dumps({"tasks": [{"task": "A"}, {"task": 42}]})
+    translator, _ = make_translator(lambda body: httpx.Response(200, json=completion(reply)))
+    try:
+        tasks = await translator.translate_feedback("make it pop")
+    finally:
+        await translator.client.aclose()
+
+    assert [task["task"] for task in tasks] == ["A"]
+    assert await translator.cache.get(cached_key("make it pop")) is None
@@ -0,0 +1,101 @@
+"""
+Test the write-behind usage meter
+"""
+import asyncio
+import uuid
+from datetime import datetime
+
+from app.services.usage_meter import UsageMeter, bucket_start, estimate_cost_cents, rollup_rows
+
+
+class RecordingSink:
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.batches = []
+
+    async def __call__(self, rows):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+async def test_no_usage_lost_on_graceful_shutdown():
+    """Everything recorded before close is written, in batches no larger than batch_size."""
+    sink = RecordingSink(delay=0.01)
+    meter = UsageMeter(sink, max_queue_size=50, batch_size=8, flush_interval_seconds=60)
+    meter.start()
+
+    user_id = uuid.uuid4()
+    await asyncio.gather(*(
+        meter.record(user_id, "/feedback/translate", "gpt-4", 400, 100)
+        for _ in range(120)
+    ))
+    await meter.close()
+
+    assert len(sink.rows) == 120
+    assert len({row["id"] for row in sink.rows}) == 120
+    assert all(len(batch) <= 8 for batch in sink.batches)
+    assert meter.stats()["queued"] == 0
+    assert meter.stats()["lost"] == 0
+
+
+async def test_full_queue_applies_backpressure_until_sink_recovers():
+    """While the sink fails, record() waits on the full queue; nothing is dropped."""
+    sink = RecordingSink(failures=2)
+    meter = UsageMeter(sink, max_queue_size=3, batch_size=3, flush_interval_seconds=0.01)
+    user_id = uuid.uuid4()
+    for _ in range(3):
+        await meter.record(user_id, "/feedback/translate", "gpt-4", 10, 10)
+
+    blocked = asyncio.create_task(meter.record(user_id, "/feedback/translate", "gpt-4", 10, 10))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    meter.start()
+    await asyncio.wait_for(blocked, timeout=1)
+    await meter.close()
+
+    assert len(sink.rows) == 4
+    assert meter.stats()["flush_errors"] == 2
+
+
+def test_cost_is_rounded_up_to_whole_cents():
+    """Known models are priced per 1K tokens; unknown models have no cost."""
+    assert estimate_cost_cents("gpt-4", 400, 100) == 2
+    assert estimate_cost_cents("some-new-model", 400, 100) is None
+
+
+def test_rollups_sum_rows_per_period_bucket_and_endpoint():
+    """Each row lands in one hour, one day and one month bucket; nulls count as zero."""
+    user_id = uuid.uuid4()
+    rows = [
+        {"user_id": user_id, "endpoint": "/feedback/translate", "tokens_used": 100,
+         "cost_cents": 1, "created_at": datetime(2026, 3, 9, 10, 15)},
+        {"user_id": user_id, "endpoint": "/feedback/translate", "tokens_used": 50,
+         "cost_cents": None, "created_at": datetime(2026, 3, 9, 10, 45)},
+        {"user_id": user_id, "endpoint": "/feedback/translate", "tokens_used": 25,
+         "cost_cents": 2, "created_at": datetime(2026, 3, 9, 11, 5)},
+    ]
+    rollups = {(r["period"], r["bucket_start"]): r for r in rollup_rows(rows)}
+
+    assert len(rollups) == 4
+    assert rollups[("hour", datetime(2026, 3, 9, 10))]["tokens_used"] == 150
+    assert rollups[("hour", datetime(2026, 3, 9, 10))]["cost_cents"] == 1
+    assert rollups[("hour", datetime(2026, 3, 9, 11))]["request_count"] == 1
+    assert rollups[("day", datetime(2026, 3, 9))]["request_count"] == 3
+    assert rollups[("month", datetime(2026, 3, 1))]["tokens_used"] == 175
+
+
+def test_bucket_start_truncates_to_period():
+    """Buckets start on the hour, at midnight and on the first of the month."""
+    timestamp = datetime(2026, 3, 9, 10, 15, 42, 7)
+    assert bucket_start(timestamp, "hour") == datetime(2026, 3, 9, 10)
+    assert bucket_start(timestamp, "day") == datetime(2026, 3, 9)
+    assert bucket_start(timestamp, "month") == datetime(2026, 3, 1)
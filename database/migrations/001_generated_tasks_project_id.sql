@@ -0,0 +1,36 @@
+-- Copy each task's project onto generated_tasks and index it for project task listings
+-- Applies to databases created from either schema.sql before generated_tasks.project_id existed.
+--
+-- Run with psql outside a transaction (CREATE INDEX CONCURRENTLY cannot run inside one):
+--   psql "$DATABASE_URL" -f database/migrations/001_generated_tasks_project_id.sql
+
+ALTER TABLE generated_tasks
+    ADD COLUMN IF NOT EXISTS project_id UUID REFERENCES projects(id) ON DELETE CASCADE;
+
+-- Backfill in batches so no single statement locks every task row
+DO $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    LOOP
+        UPDATE generated_tasks t
+        SET project_id = f.project_id
+        FROM feedback_inputs f
+        WHERE t.id IN (
+            SELECT id FROM generated_tasks WHERE project_id IS NULL LIMIT 10000
+        )
+        AND f.id = t.input_id;
+        GET DIAGNOSTICS updated = ROW_COUNT;
+        EXIT WHEN updated = 0;
+        COMMIT;
+    END LOOP;
+END
+$$;
+
+ALTER TABLE generated_tasks ALTER COLUMN project_id SET NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_generated_tasks_project_created
+    ON generated_tasks(project_id, created_at, id);
+
+-- Listings no longer go through feedback_inputs, so this index is unused
+DROP INDEX CONCURRENTLY IF EXISTS idx_generated_tasks_input_created;
@@ -20,6 +20,11 @@ CREATE TABLE IF NOT EXISTS projects (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     name VARCHAR(255) NOT NULL,
+    -- Denormalized counters kept current by the API
+    feedback_count INTEGER NOT NULL DEFAULT 0,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    completed_task_count INTEGER NOT NULL DEFAULT 0,
+    last_feedback_at TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -40,6 +45,8 @@ CREATE INDEX idx_feedback_inputs_project_id ON feedback_inputs(project_id);
 CREATE TABLE IF NOT EXISTS generated_tasks (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     input_id UUID NOT NULL REFERENCES feedback_inputs(id) ON DELETE CASCADE,
+    -- Copied from the feedback input so project-wide task listings need no join
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
     task_description TEXT NOT NULL,
     is_completed BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -48,6 +55,7 @@ CREATE TABLE IF NOT EXISTS generated_tasks (
 
 CREATE INDEX idx_generated_tasks_input_id ON generated_tasks(input_id);
 CREATE INDEX idx_generated_tasks_completed ON generated_tasks(is_completed);
+CREATE INDEX idx_generated_tasks_project_created ON generated_tasks(project_id, created_at, id);
 
 -- Updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
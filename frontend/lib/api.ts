@@ -47,6 +47,11 @@ export interface Project {
   id: string;
   name: string;
   created_at: string;
+  feedback_count?: number;
+  task_count?: number;
+  completed_task_count?: number;
+  completion_percentage?: number;
+  last_feedback_at?: string | null;
 }
 
 export interface Task {
@@ -113,10 +118,18 @@ export const translateFeedback = async (
   return response.data;
 };
 
-// Tasks endpoint
+// Tasks endpoint (paginated: follow X-Next-Cursor until the last page)
 export const getProjectTasks = async (projectId: string): Promise<Task[]> => {
-  const response = await api.get(`/api/projects/${projectId}/tasks`);
-  return response.data;
+  const tasks: Task[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get(`/api/projects/${projectId}/tasks`, {
+      params: { limit: 500, cursor },
+    });
+    tasks.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return tasks;
 };
 
 // Stripe endpoint